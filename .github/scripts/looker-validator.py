@@ -7,26 +7,20 @@ Validates LookML syntax and project structure
 import json
 import sys
 import argparse
-import configparser
 import requests
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
 import time
 
+from looker_api_client import LookerAPIClient
+
 
 class LookerValidator:
-    def __init__(self, config_file: str = 'looker.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file)
-        
-        # Looker connection details
-        self.base_url = self.config['Looker']['base_url'].rstrip('/')
-        self.client_id = self.config['Looker']['client_id']
-        self.client_secret = self.config['Looker']['client_secret']
-        self.api_version = self.config.get('Looker', 'api_version', fallback='4.0')
-        
-        self.api_url = f"{self.base_url}/api/{self.api_version}"
-        self.session = requests.Session()
+    def __init__(self, config_file: str = 'looker.ini', client: Optional[LookerAPIClient] = None):
+        # Shared authenticated session (pooled, rate limited, token reused across the job)
+        self.client = client or LookerAPIClient(config_file)
+        self.api_url = self.client.api_url
+        self.session = self.client.session
         self.access_token = None
         self.validation_results = {
             'errors': [],
@@ -37,36 +31,12 @@ class LookerValidator:
     
     def authenticate(self) -> bool:
         """Authenticate with Looker API and get access token"""
-        login_url = f"{self.api_url}/login"
-        
-        login_data = {
-            'client_id': self.client_id,
-            'client_secret': self.client_secret
-        }
-        
-        try:
-            response = self.session.post(login_url, data=login_data)
-            response.raise_for_status()
-            
-            auth_data = response.json()
-            self.access_token = auth_data.get('access_token')
-            
-            if not self.access_token:
-                print("Failed to obtain access token")
-                return False
-                
-            # Set authorization header for future requests
-            self.session.headers.update({
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/json'
-            })
-            
-            print("Successfully authenticated with Looker API")
-            return True
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Authentication failed: {e}")
+        if not self.client.authenticate():
             return False
+        self.access_token = self.client.access_token
+        
+        print("Successfully authenticated with Looker API")
+        return True
     
     def validate_project(self, project_name: str) -> Dict[str, Any]:
         """Validate LookML project using Looker API"""
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Shared Looker API Client
+One authenticated, rate-limited session with a pooled keep-alive transport,
+gzip and transport-level retries. The access token is cached on disk with its
+expiry so every script in a CI job reuses a single login. An asyncio front end
+issues independent calls concurrently; every request's latency is recorded.
+"""
+
+import asyncio
+import configparser
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from looker_rate_limiter import RateLimitedSession, shared_limiter
+
+
+# Directory for the token cache; defaults to $RUNNER_TEMP (per job) or the system temp dir.
+# Never point this at a directory that is uploaded or cached between jobs.
+TOKEN_CACHE_DIR_ENV = 'LOOKER_TOKEN_CACHE_DIR'
+
+# Tokens are treated as expired this many seconds early
+TOKEN_EXPIRY_MARGIN = 60
+
+DEFAULT_POOL_SIZE = 16
+
+
+def token_cache_path(base_url: str, client_id: str) -> str:
+    """Per-instance, per-client token file (the client secret is never written)"""
+    cache_dir = (os.environ.get(TOKEN_CACHE_DIR_ENV)
+                 or os.environ.get('RUNNER_TEMP')
+                 or tempfile.gettempdir())
+    key = hashlib.sha256(f"{base_url}\0{client_id}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"looker-token-{key}.json")
+
+
+class LookerSession(RateLimitedSession):
+    """
+    Rate-limited session that answers GETs from responses prefetched
+    concurrently. Each prefetched response is handed out once, and any other
+    method drops them all, since it may change what a GET would return.
+    A 401 triggers `reauthenticate` once and the call is replayed through the
+    same rate-limited path with the new token.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefetched: Dict[str, requests.Response] = {}
+        self.reauthenticate: Optional[Callable[[], bool]] = None
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET':
+            self.prefetched.clear()
+        elif not args and not kwargs.get('params'):
+            response = self.prefetched.pop(url, None)
+            if response is not None:
+                return response
+        response = super().request(method, url, *args, **kwargs)
+        if response.status_code != 401 or self.reauthenticate is None or url.endswith('/login'):
+            return response
+
+        # A cached token may have been revoked: drain the 401 so its pooled
+        # connection can be reused, log in again once and replay the call
+        response.content
+        response.close()
+        if not self.reauthenticate():
+            return response
+        return super().request(method, url, *args, **kwargs)
+
+
+class LookerAPIClient:
+    """Looker API 4.0 session shared by the validation scripts"""
+
+    def __init__(self, config_file: str = 'looker.ini', pool_size: int = DEFAULT_POOL_SIZE):
+        self.config = configparser.ConfigParser()
+        self.config.read(config_file)
+
+        # Looker connection details
+        self.base_url = self.config['Looker']['base_url'].rstrip('/')
+        self.client_id = self.config['Looker']['client_id']
+        self.client_secret = self.config['Looker']['client_secret']
+        self.api_version = self.config.get('Looker', 'api_version', fallback='4.0')
+        self.api_url = f"{self.base_url}/api/{self.api_version}"
+
+        self.session = LookerSession(shared_limiter())
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+
+        # Connection errors and 502/504 on idempotent calls are retried by the
+        # transport; 429/503 are left to the rate limiter so it can back off
+        retries = Retry(total=3, connect=3, read=2, backoff_factor=0.5,
+                        status_forcelist=(502, 504), allowed_methods=frozenset(['GET', 'HEAD']),
+                        respect_retry_after_header=False, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.hooks['response'].append(self._record_latency)
+        self.session.reauthenticate = self.reauthenticate
+        self.pool_size = pool_size
+
+        self.access_token: Optional[str] = None
+        self.token_expires_at = 0.0
+        self.token_cache_path = token_cache_path(self.base_url, self.client_id)
+        self.logins = 0
+
+        # One entry per HTTP round trip: method, path, status, seconds
+        self.latencies: List[Dict[str, Any]] = []
+        self.latency_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+
+    def authenticate(self) -> bool:
+        """Ensure the session carries a valid token, logging in only if no cached one is usable"""
+        if self.access_token and time.time() < self.token_expires_at - TOKEN_EXPIRY_MARGIN:
+            return True
+        if self.load_cached_token():
+            print("Reusing cached Looker API token")
+            return True
+        return self.login()
+
+    def login(self) -> bool:
+        try:
+            # Drop the session's JSON content type and any stale bearer token:
+            # /login takes a form-encoded body and no Authorization header
+            response = self.session.post(f"{self.api_url}/login", data={
+                'client_id': self.client_id,
+                'client_secret': self.client_secret
+            }, headers={'Content-Type': None, 'Authorization': None})
+            response.raise_for_status()
+            auth_data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Authentication failed: {e}")
+            return False
+
+        access_token = auth_data.get('access_token')
+        if not access_token:
+            print("Failed to obtain access token")
+            return False
+
+        self.logins += 1
+        self.set_token(access_token, time.time() + float(auth_data.get('expires_in', 3600)))
+        self.save_cached_token()
+        return True
+
+    def set_token(self, access_token: str, expires_at: float) -> None:
+        self.access_token = access_token
+        self.token_expires_at = expires_at
+        self.session.headers.update({
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        })
+
+    def load_cached_token(self) -> bool:
+        try:
+            with open(self.token_cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('api_url') != self.api_url or not cached.get('access_token'):
+            return False
+        if time.time() >= cached.get('expires_at', 0) - TOKEN_EXPIRY_MARGIN:
+            return False
+        self.set_token(cached['access_token'], cached['expires_at'])
+        return True
+
+    def save_cached_token(self) -> None:
+        payload = json.dumps({
+            'api_url': self.api_url,
+            'access_token': self.access_token,
+            'expires_at': self.token_expires_at
+        }).encode('utf-8')
+        directory = os.path.dirname(self.token_cache_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')  # created 0600
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.token_cache_path)
+        except OSError as e:
+            print(f"Could not cache Looker API token: {e}")
+
+    def discard_cached_token(self) -> None:
+        try:
+            os.remove(self.token_cache_path)
+        except OSError:
+            pass
+
+    def reauthenticate(self) -> bool:
+        """Replace a token the API rejected with a fresh login"""
+        self.discard_cached_token()
+        self.access_token = None
+        return self.login()
+
+    # ------------------------------------------------------------------
+    # Latency and concurrent calls
+    # ------------------------------------------------------------------
+
+    def _record_latency(self, response: requests.Response, *args, **kwargs):
+        entry = {
+            'method': response.request.method,
+            'path': urlsplit(response.url).path,
+            'status_code': response.status_code,
+            'seconds': round(response.elapsed.total_seconds(), 4)
+        }
+        with self.latency_lock:
+            self.latencies.append(entry)
+        return response
+
+    def latency_summary(self) -> Dict[str, Any]:
+        """Request count, median/p95/max latency and the slowest endpoints"""
+        with self.latency_lock:
+            entries = list(self.latencies)
+        if not entries:
+            return {'requests': 0}
+        seconds = sorted(e['seconds'] for e in entries)
+        by_path: Dict[str, List[float]] = {}
+        for e in entries:
+            by_path.setdefault(f"{e['method']} {e['path']}", []).append(e['seconds'])
+        slowest = sorted(by_path.items(), key=lambda item: max(item[1]), reverse=True)[:5]
+        return {
+            'requests': len(entries),
+            'median_seconds': seconds[len(seconds) // 2],
+            'p95_seconds': seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))],
+            'max_seconds': seconds[-1],
+            'slowest_endpoints': [{'endpoint': k, 'calls': len(v), 'max_seconds': max(v)} for k, v in slowest]
+        }
+
+    def get_many(self, paths: List[str]) -> Dict[str, Union[requests.Response, Exception]]:
+        """Synchronous facade: GET several API paths concurrently"""
+        unique = list(dict.fromkeys(paths))
+        results = asyncio.run(AsyncLookerAPI(self).gather_get(unique))
+        return dict(zip(unique, results))
+
+    def prefetch(self, paths: List[str]) -> None:
+        """
+        GET independent endpoints concurrently so later blocking calls for the
+        same URLs are answered immediately. Failed calls are simply re-issued.
+        """
+        for path, response in self.get_many(paths).items():
+            if isinstance(response, requests.Response) and response.status_code < 500:
+                response.content  # read the body now, inside the worker
+                self.session.prefetched[f"{self.api_url}{path}"] = response
+
+
+class AsyncLookerAPI:
+    """
+    asyncio front end for a LookerAPIClient. Calls run on the client's pooled,
+    rate-limited session in worker threads, so they share its token, retries
+    and latency log.
+    """
+
+    def __init__(self, client: LookerAPIClient, max_concurrency: Optional[int] = None):
+        self.client = client
+        self.max_concurrency = max_concurrency or client.pool_size
+
+    async def request(self, executor: ThreadPoolExecutor, method: str, path: str, **kwargs) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.client.session.request, method, f"{self.client.api_url}{path}", **kwargs)
+        return await loop.run_in_executor(executor, call)
+
+    async def gather_get(self, paths: List[str]) -> List[Union[requests.Response, Exception]]:
+        """GET every path concurrently; exceptions are returned in place of responses"""
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return await asyncio.gather(*(self.request(executor, 'GET', path) for path in paths),
+                                        return_exceptions=True)
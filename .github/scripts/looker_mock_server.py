@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Offline Looker API Stand-in
+Local HTTP server implementing the API 4.0 endpoints used by the validator
+scripts, with configurable latency, deterministic error/429 injection and
+payload sizes, for benchmarking concurrency and retry behavior.
+
+Usage:
+  python looker_mock_server.py --port 8765 --latency 0.2 --throttle-rate 0.05 --write-config looker-mock.ini
+  python sql-execution-validator.py --config-file looker-mock.ini --files "views/a.view.lkml"
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+API_PREFIX = '/api/4.0'
+
+# SQL Runner behavior is driven by markers in the submitted SQL
+SYNTAX_ERROR_MARKER = 'syntax_error'
+MISSING_TABLE_MARKER = 'missing_table'
+ZERO_ROW_RE = re.compile(r'\bLIMIT 0\s*$|\bTOP 0\b|\bWHERE 1 = 0\s*$', re.IGNORECASE)
+
+
+class MockLookerState:
+    """Configuration plus counters shared by all request handler threads"""
+
+    def __init__(self, project: str = 'bi_sandbox', latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 rows: int = 100, row_bytes: int = 32, models: int = 3, explores: int = 10,
+                 tests: int = 5, validation_errors: int = 0, content_errors: int = 2,
+                 max_connections: int = 4, token_ttl: int = 3600, seed: int = 0):
+        self.project = project
+        self.latency = latency                  # base seconds added to every response
+        self.jitter = jitter                    # extra 0..jitter seconds, deterministic per call
+        self.error_rate = error_rate            # fraction of calls answered with 500
+        self.throttle_rate = throttle_rate      # fraction of calls answered with 429 + Retry-After
+        self.retry_after = retry_after
+        self.rows = rows                        # rows returned by /sql_queries/{slug}/run/json
+        self.row_bytes = row_bytes              # size of the padding column in each row
+        self.models = models
+        self.explores = explores                # explores per model
+        self.tests = tests
+        self.validation_errors = validation_errors
+        self.content_errors = content_errors
+        self.max_connections = max_connections
+        self.token_ttl = token_ttl
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.tokens = set()
+        self.sql_queries: Dict[str, str] = {}
+        self.calls: Dict[str, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.injected = {'errors': 0, 'throttled': 0}
+
+    def next_call(self, endpoint: str) -> int:
+        with self.lock:
+            n = self.calls.get(endpoint, 0)
+            self.calls[endpoint] = n + 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return n
+
+    def done(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+    def roll(self, kind: str, endpoint: str, n: int) -> float:
+        """Deterministic pseudo-random number in [0, 1) for the n-th call of an endpoint"""
+        digest = hashlib.sha256(f"{self.seed}:{kind}:{endpoint}:{n}".encode('utf-8')).hexdigest()
+        return int(digest[:8], 16) / 2 ** 32
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'total_calls': sum(self.calls.values()),
+                'peak_in_flight': self.peak_in_flight,
+                'injected': dict(self.injected),
+                'logins': self.calls.get('POST /login', 0)
+            }
+
+
+class MockLookerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockLookerState = None  # set by make_server()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    # ------------------------------------------------------------------
+
+    def dispatch(self, method: str) -> None:
+        path = urlsplit(self.path).path
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        if path == '/__mock__/stats':
+            self.send_json(200, self.state.stats())
+            return
+        if not path.startswith(API_PREFIX):
+            self.send_json(404, {'message': 'Not found'})
+            return
+        path = path[len(API_PREFIX):]
+
+        endpoint = f"{method} {self.endpoint_name(path)}"
+        state = self.state
+        n = state.next_call(endpoint)
+        try:
+            delay = state.latency + state.jitter * state.roll('latency', endpoint, n)
+            if delay:
+                time.sleep(delay)
+
+            if endpoint != 'POST /login':
+                if state.roll('throttle', endpoint, n) < state.throttle_rate:
+                    with state.lock:
+                        state.injected['throttled'] += 1
+                    self.send_json(429, {'message': 'Too many requests'},
+                                   headers={'Retry-After': f"{state.retry_after:g}"})
+                    return
+                if state.roll('error', endpoint, n) < state.error_rate:
+                    with state.lock:
+                        state.injected['errors'] += 1
+                    self.send_json(500, {'message': 'Injected server error'})
+                    return
+                if not self.authorized():
+                    self.send_json(401, {'message': 'Requires authentication.'})
+                    return
+
+            status, payload = self.route(method, path, body)
+            if status == 204:
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self.send_json(status, payload)
+        finally:
+            state.done()
+
+    @staticmethod
+    def endpoint_name(path: str) -> str:
+        """Collapse ids so counters and fault rolls are per endpoint, not per URL"""
+        path = re.sub(r'^/sql_queries/[^/]+/run/', '/sql_queries/{slug}/run/', path)
+        path = re.sub(r'^/lookml_models/[^/]+/explores/[^/]+$', '/lookml_models/{model}/explores/{explore}', path)
+        path = re.sub(r'^/lookml_models/[^/]+$', '/lookml_models/{model}', path)
+        path = re.sub(r'^/projects/[^/]+/', '/projects/{project}/', path)
+        return path
+
+    def authorized(self) -> bool:
+        token = self.headers.get('Authorization', '').replace('Bearer ', '', 1)
+        with self.state.lock:
+            return token in self.state.tokens
+
+    def send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        state = self.state
+        project = state.project
+
+        if method == 'POST' and path == '/login':
+            token = hashlib.sha256(f"{time.time()}:{id(body)}".encode('utf-8')).hexdigest()[:32]
+            with state.lock:
+                state.tokens.add(token)
+            return 200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': state.token_ttl}
+
+        if method == 'GET' and path == '/user':
+            return 200, {'id': '1', 'display_name': 'Mock User', 'email': 'mock@example.com'}
+
+        if method == 'GET' and path == '/connections':
+            return 200, [
+                {'name': 'badal_internal_projects', 'dialect': {'name': 'bigquery_standard_sql'},
+                 'database': 'looker_demo', 'host': 'mock-project', 'max_connections': state.max_connections},
+                {'name': 'mock_snowflake', 'dialect': {'name': 'snowflake'},
+                 'database': 'ANALYTICS', 'host': 'mock.snowflakecomputing.com', 'max_connections': state.max_connections}
+            ]
+
+        if method == 'POST' and path == '/sql_queries':
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'message': 'Invalid JSON body'}
+            slug = hashlib.sha256(body).hexdigest()[:12]
+            with state.lock:
+                state.sql_queries[slug] = payload.get('sql', '')
+            return 200, {'slug': slug, 'connection_name': payload.get('connection_name')}
+
+        m = re.match(r'^/sql_queries/([^/]+)/run/(\w+)$', path)
+        if method == 'POST' and m:
+            return self.run_sql(m.group(1))
+
+        if method == 'GET' and path == '/projects':
+            return 200, [{'name': project}, {'name': 'other_project'}]
+
+        if method == 'GET' and path == f'/projects/{project}/validate':
+            if not state.validation_errors:
+                return 204, None
+            return 200, {'errors': [
+                {'message': f"Unknown or inaccessible field 'view_{i}.missing'", 'file_path': f"views/view_{i}.view.lkml",
+                 'line_number': i + 1, 'severity': 'error'} for i in range(state.validation_errors)
+            ], 'warnings': []}
+
+        if method == 'GET' and path == f'/projects/{project}/lookml_tests':
+            return 200, [{'name': f"test_{i}", 'model_name': f"model_{i % max(1, state.models)}",
+                          'explore_name': f"explore_{i % max(1, state.explores)}",
+                          'file': 'data_tests/tests.lkml', 'line_number': i + 1} for i in range(state.tests)]
+
+        if method == 'GET' and path == '/lookml_models':
+            return 200, [{'name': f"model_{i}", 'project_name': project} for i in range(state.models)]
+
+        m = re.match(r'^/lookml_models/([^/]+)$', path)
+        if method == 'GET' and m:
+            if not self.known_model(m.group(1)):
+                return 404, {'message': 'Not found'}
+            return 200, {'name': m.group(1), 'errors': [],
+                         'explores': [{'name': f"explore_{j}"} for j in range(state.explores)]}
+
+        m = re.match(r'^/lookml_models/([^/]+)/explores/([^/]+)$', path)
+        if method == 'GET' and m:
+            explore = re.match(r'^explore_(\d+)$', m.group(2))
+            if not self.known_model(m.group(1)) or not explore or int(explore.group(1)) >= state.explores:
+                return 404, {'message': 'Not found'}
+            return 200, {'name': m.group(2), 'model_name': m.group(1), 'errors': []}
+
+        if method == 'GET' and path == '/content_validation':
+            return 200, self.content_validation()
+
+        return 404, {'message': f"Mock has no route for {method} {path}"}
+
+    def known_model(self, name: str) -> bool:
+        m = re.match(r'^model_(\d+)$', name)
+        return bool(m) and int(m.group(1)) < self.state.models
+
+    def run_sql(self, slug: str) -> Tuple[int, Any]:
+        state = self.state
+        with state.lock:
+            sql = state.sql_queries.get(slug)
+        if sql is None:
+            return 404, {'message': f"SQL query {slug} not found"}
+        if SYNTAX_ERROR_MARKER in sql.lower():
+            return 400, {'message': 'Syntax error: Unexpected identifier "syntax_error" at [1:8]'}
+        if MISSING_TABLE_MARKER in sql.lower():
+            return 404, {'message': 'Not found: Table mock-project:looker_demo.missing_table was not found'}
+        if sql.upper().startswith('EXPLAIN'):
+            return 200, [{'step': None, 'operation': 'GlobalStats', 'bytesAssigned': 1048576 * state.rows}]
+
+        rows = 0 if ZERO_ROW_RE.search(sql.strip()) else state.rows
+        padding = 'x' * state.row_bytes
+        return 200, [{'id': i, 'name': f"row_{i}", 'payload': padding} for i in range(rows)]
+
+    def content_validation(self) -> Dict[str, Any]:
+        state = self.state
+        items = []
+        for i in range(state.content_errors):
+            folder = 'BI Sandbox' if i % 2 == 0 else 'Shared'
+            items.append({
+                'dashboard': {'id': str(i), 'title': f"Dashboard {i}", 'folder': {'name': folder}},
+                'errors': [{'message': f"Unknown field 'view_{i}.missing'", 'model_name': 'model_0'}]
+            })
+        return {
+            'computation_time': 0.5,
+            'total_looks_validated': 10,
+            'total_dashboard_elements_validated': 50,
+            'total_dashboard_filters_validated': 20,
+            'total_scheduled_plans_validated': 0,
+            'total_alerts_validated': 0,
+            'total_explores_validated': state.models * state.explores,
+            'content_with_errors': items
+        }
+
+
+def make_server(state: MockLookerState, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Create (but do not start) a server bound to host:port; port 0 picks a free port"""
+    handler = type('BoundMockLookerHandler', (MockLookerHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(state: MockLookerState, host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve in a background thread; returns the server and its base URL"""
+    server = make_server(state, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def write_config(path: str, base_url: str) -> None:
+    """looker.ini pointing the validator scripts at the mock"""
+    with open(path, 'w') as f:
+        f.write(f"[Looker]\nbase_url = {base_url}\nclient_id = mock\nclient_secret = mock\napi_version = 4.0\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline Looker API stand-in for benchmarking the validators')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765, 0 = any free port)')
+    parser.add_argument('--project', default='bi_sandbox', help='Project name served by /projects')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra 0..N seconds per response (deterministic)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--rows', type=int, default=100, help='Rows returned per SQL Runner query')
+    parser.add_argument('--row-bytes', type=int, default=32, help='Padding bytes per returned row')
+    parser.add_argument('--models', type=int, default=3, help='Number of models in the project')
+    parser.add_argument('--explores', type=int, default=10, help='Explores per model')
+    parser.add_argument('--tests', type=int, default=5, help='Number of LookML tests')
+    parser.add_argument('--validation-errors', type=int, default=0, help='Errors returned by project validation')
+    parser.add_argument('--content-errors', type=int, default=2, help='Content items with errors')
+    parser.add_argument('--max-connections', type=int, default=4, help='max_connections reported per connection')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency jitter and fault injection')
+    parser.add_argument('--write-config', help='Write a looker.ini pointing at this server')
+
+    args = parser.parse_args()
+
+    state = MockLookerState(
+        project=args.project, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        rows=args.rows, row_bytes=args.row_bytes, models=args.models, explores=args.explores,
+        tests=args.tests, validation_errors=args.validation_errors, content_errors=args.content_errors,
+        max_connections=args.max_connections, seed=args.seed
+    )
+    server = make_server(state, args.host, args.port)
+    base_url = f"http://{args.host}:{server.server_address[1]}"
+    if args.write_config:
+        write_config(args.write_config, base_url)
+        print(f"Wrote {args.write_config}")
+
+    print(f"Mock Looker API listening on {base_url}{API_PREFIX} (stats: {base_url}/__mock__/stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
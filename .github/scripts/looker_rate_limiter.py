@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Adaptive Looker API Rate Limiter
+Token bucket shared by every API-calling script: the refill rate creeps up
+while responses are fast and is cut back on 429/503, honoring Retry-After
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+
+
+# Responses that mean "slow down" and are safe to retry after waiting
+THROTTLE_STATUSES = {429, 503}
+
+# A 503 may arrive after the server did the work, so only idempotent methods
+# retry on it; every method retries on 429, which is rejected before any work
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+REJECTED_STATUSES = {429}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket whose rate adapts to API latency and throttling"""
+
+    def __init__(self, rate: float = 10.0, min_rate: float = 0.5, max_rate: float = 25.0,
+                 burst: int = 10, target_latency: float = 1.0, backoff_seconds: float = 1.0):
+        self.rate = rate                      # tokens (requests) per second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency  # responses faster than this raise the rate
+        self.backoff_seconds = backoff_seconds  # pause on 429/503 without Retry-After
+
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+        # Reporting
+        self.requests = 0
+        self.throttled_responses = 0
+        self.throttled_seconds = 0.0  # waiting out a 429/503 backoff
+        self.paced_seconds = 0.0      # waiting for a token at the current rate
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting"""
+        throttled = paced = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self.blocked_until - now
+                blocked = delay > 0
+                if not blocked:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.requests += 1
+                        self.throttled_seconds += throttled
+                        self.paced_seconds += paced
+                        return throttled + paced
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            # Only the backoff after a 429/503 counts as throttling; the rest is normal pacing
+            if blocked:
+                throttled += delay
+            else:
+                paced += delay
+
+    def record(self, latency: float, status_code: int, retry_after: Optional[float] = None) -> None:
+        """Feed back one response so the rate can adapt"""
+        with self.lock:
+            if status_code in THROTTLE_STATUSES:
+                self.throttled_responses += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                pause = retry_after if retry_after is not None else self.backoff_seconds
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+                self.tokens = 0.0
+            elif latency <= self.target_latency:
+                self.rate = min(self.max_rate, self.rate + 1.0)
+            elif latency > 2 * self.target_latency:
+                self.rate = max(self.min_rate, self.rate * 0.8)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'api_requests': self.requests,
+            'throttled_responses': self.throttled_responses,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'paced_seconds': round(self.paced_seconds, 3),
+            'final_rate_per_second': round(self.rate, 2)
+        }
+
+    def summary(self) -> str:
+        return (f"API rate limiter: {self.requests} request(s), "
+                f"{self.throttled_seconds:.2f}s throttled after 429/503 and "
+                f"{self.paced_seconds:.2f}s paced (summed over threads), "
+                f"{self.throttled_responses} 429/503 response(s), "
+                f"rate now {self.rate:.1f} req/s")
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that paces every call through an AdaptiveRateLimiter"""
+
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = 3):
+        super().__init__()
+        self.limiter = limiter or shared_limiter()
+        self.max_retries = max_retries
+
+    def request(self, method, url, *args, **kwargs):
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            start = time.monotonic()
+            response = super().request(method, url, *args, **kwargs)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.limiter.record(time.monotonic() - start, response.status_code, retry_after)
+
+            retryable = THROTTLE_STATUSES if method.upper() in IDEMPOTENT_METHODS else REJECTED_STATUSES
+            if response.status_code not in retryable or attempt >= self.max_retries:
+                return response
+            response.close()  # hand the pooled connection back before waiting out the backoff
+            attempt += 1
+            print(f"Looker API returned {response.status_code} for {method} {url}, "
+                  f"retrying ({attempt}/{self.max_retries})")
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+
+
+def shared_limiter() -> AdaptiveRateLimiter:
+    """Process-wide limiter, so scripts run together by lookml-pipeline.py share one budget"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = AdaptiveRateLimiter()
+    return _shared_limiter
@@ -2,45 +2,192 @@
 """
 LookML Dashboard Query Limit Checker (YAML Format)
 Checks that dashboards don't exceed the maximum allowed queries (default: 5)
+and estimates the warehouse load behind each one: the distinct queries left
+once mergeable tiles are grouped, the queries each filter change re-runs, and
+the tiles that select fields across fan-out joins
 """
-import re
 import sys
 import os
-import glob
 import argparse
 import json
 
-import yaml
+from lookml_index import discover_project_files, project_index
+from lookml_parser import parse_file, prefetch_parsed
 
-def _get_query_counts_yaml(dashboard_body, verbose=False):
+FANOUT_RELATIONSHIPS = ('one_to_many', 'many_to_many')
+
+
+def _get_query_counts_yaml(dashboard, verbose=False):
     counts = {
         'named_queries': 0,
         'inline_queries': 0,
         'total_elements': 0,
         'total_executions': 0
     }
-    try:
-        data = yaml.safe_load(dashboard_body)
-        elements = data.get('elements', [])
-        counts['total_elements'] = len(elements)
-        for element in elements:
-            if 'query' in element:
-                counts['named_queries'] += 1
-            elif any(k in element for k in ['model', 'explore', 'fields']):
-                counts['inline_queries'] += 1
-        counts['total_executions'] = counts['named_queries'] + counts['inline_queries']
-    except Exception as e:
-        if verbose:
-            print(f"YAML parsing error: {e}")
+    elements = dashboard.get('elements') or []
+    counts['total_elements'] = len(elements)
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        if 'query' in element:
+            counts['named_queries'] += 1
+        elif any(k in element for k in ['model', 'explore', 'fields']):
+            counts['inline_queries'] += 1
+    counts['total_executions'] = counts['named_queries'] + counts['inline_queries']
     return counts
 
 
-def count_dashboard_queries(files, max_queries=5, verbose=False):
+def _get_query_counts_lookml(dashboard_node):
+    counts = {
+        'named_queries': 0,
+        'inline_queries': 0,
+        'total_elements': 0,
+        'total_executions': 0
+    }
+    elements = dashboard_node.blocks('element')
+    counts['total_elements'] = len(elements)
+    for element in elements:
+        if element.param('query') or element.first('query'):
+            counts['named_queries'] += 1
+        elif any(element.param(k) for k in ['model', 'explore', 'fields']):
+            counts['inline_queries'] += 1
+    counts['total_executions'] = counts['named_queries'] + counts['inline_queries']
+    return counts
+
+
+def _lookml_element(element):
+    """The query parameters of a LookML-format element, shaped like a YAML element"""
+    def block_params(name):
+        block = element.first(name)
+        return {p.name: p.value for p in block.params} if block else {}
+
+    return {
+        'name': element.name,
+        'title': element.get('title'),
+        'query': element.get('query'),
+        'model': element.get('model'),
+        'explore': element.get('explore'),
+        'fields': [item for p in element.all('fields') for item in p.items],
+        'pivots': [item for p in element.all('pivots') for item in p.items],
+        'sorts': [item for p in element.all('sorts') for item in p.items],
+        'limit': element.get('limit'),
+        'filters': block_params('filters'),
+        'listen': block_params('listen')
+    }
+
+
+def _is_dimension(index, views, field):
+    """
+    True for fields that set a query's grain. Unprefixed names are custom
+    fields or table calculations and never group; prefixed fields the index
+    cannot resolve count as dimensions so they are never merged by mistake.
+    """
+    alias, _, name = field.partition('.')
+    if not name:
+        return False
+    view = views.get(alias, alias)
+    symbol = index.field(view, name)
+    if symbol is None and '_' in name:
+        symbol = index.field(view, name.rsplit('_', 1)[0])  # dimension_group timeframe
+    return symbol is None or symbol['kind'] != 'measure'
+
+
+def analyze_dashboard_load(dashboard, elements, index):
+    """
+    Estimate the warehouse queries one dashboard run issues.
+
+    Tiles on the same model and explore with the same filters and listen
+    mapping can only differ in the fields they select; those that also group
+    by the same dimensions and pivots, and keep the same rows (sorts and
+    limit), are served by one query (their measures are unioned). Each
+    remaining group is one distinct query, and a dashboard filter change
+    re-runs every distinct query listening to that filter.
+    Tiles reaching a view joined one_to_many or many_to_many are flagged:
+    the join multiplies rows and forces symmetric aggregates.
+    """
+    groups = {}
+    fanout_tiles = []
+    for position, element in enumerate(elements, 1):
+        if not isinstance(element, dict):
+            continue
+        title = element.get('title') or element.get('name') or f"element {position}"
+        if element.get('query'):
+            groups.setdefault(('query', element['query']), {}).setdefault((), []).append(title)
+            continue
+        if not any(element.get(k) for k in ('model', 'explore', 'fields')):
+            continue
+
+        explore_name = element.get('explore')
+        explore = index.explore(explore_name, element.get('model')) if explore_name else None
+        views = {explore_name: explore['base_view']} if explore else {}
+        fanout = {}
+        for join in explore['joins'] if explore else []:
+            views[join['name']] = join['view']
+            if join['relationship'] in FANOUT_RELATIONSHIPS:
+                fanout[join['name']] = join['relationship']
+
+        fields = list(element.get('fields') or [])
+        pivots = list(element.get('pivots') or [])
+        filters = element.get('filters') or {}
+        listen = element.get('listen') or {}
+        filter_key = tuple(sorted((str(k), str(v)) for k, v in filters.items()))
+        listen_key = tuple(sorted((str(k), str(v)) for k, v in listen.items()))
+        dimensions = tuple(sorted(f for f in fields if _is_dimension(index, views, f)))
+        rows = (tuple(element.get('sorts') or []), element.get('limit')) if dimensions or pivots else ()
+        grain = (dimensions, tuple(pivots), rows)
+        key = (element.get('model'), explore_name, filter_key, listen_key)
+        groups.setdefault(key, {}).setdefault(grain, []).append(title)
+
+        touched = fields + pivots + [str(k) for k in filters] + [str(v) for v in listen.values()]
+        joins = sorted({f.split('.', 1)[0] for f in touched if '.' in f} & set(fanout))
+        if joins:
+            fanout_tiles.append({
+                'tile': title,
+                'explore': explore_name,
+                'joins': [{'join': j, 'relationship': fanout[j]} for j in joins]
+            })
+
+    query_tiles = sum(len(titles) for grains in groups.values() for titles in grains.values())
+    distinct_queries = sum(len(grains) for grains in groups.values())
+
+    merged_queries = [
+        {'explore': key[1], 'tiles': titles}
+        for key, grains in groups.items() for titles in grains.values() if len(titles) > 1
+    ]
+
+    queries_per_filter = {}
+    for dashboard_filter in dashboard.get('filters') or []:
+        if not isinstance(dashboard_filter, dict):
+            continue
+        name = dashboard_filter.get('name') or dashboard_filter.get('title')
+        queries_per_filter[name] = sum(
+            len(grains) for key, grains in groups.items()
+            if key[0] != 'query' and any(k == name for k, _ in key[3])
+        )
+
+    return {
+        'query_tiles': query_tiles,
+        'distinct_queries': distinct_queries,
+        'merged_queries': merged_queries,
+        'queries_per_filter_change': queries_per_filter,
+        'max_queries_per_filter_change': max(queries_per_filter.values(), default=0),
+        'fanout_tiles': fanout_tiles
+    }
+
+
+def count_dashboard_queries(files, max_queries=5, verbose=False, index=None):
     """
     Iterates through files, extracts dashboards, and calls the core counting function.
+    Also returns the load estimate of every dashboard; explores and their join
+    relationships come from the project symbol index (default: current directory).
+    Files that can't be read or parsed are returned as errors, since their
+    dashboards could not be checked.
     """
+    index = index or project_index()
     violations = []
     dashboards_checked = 0
+    loads = []
+    errors = []
 
     if verbose:
         print(f"\n{'='*70}")
@@ -48,121 +195,72 @@ def count_dashboard_queries(files, max_queries=5, verbose=False):
         print(f"{'='*70}")
         print(f"Maximum allowed queries per dashboard: {max_queries}\n")
 
-    for file_path in files:
+    for file_path in prefetch_parsed(files):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            parsed = parse_file(file_path)
 
             if verbose:
                 print(f"\n Processing: {file_path}")
 
-            # Check if it's a YAML file (starts with ---)
-            is_yaml = content.strip().startswith('---')
-
-            if is_yaml:
+            if parsed.is_yaml:
                 # YAML format: - dashboard: name
-                dashboard_pattern = r'-\s*dashboard:\s*(\w+)'
-                matches = list(re.finditer(dashboard_pattern, content))
-
+                if parsed.yaml_error:
+                    errors.append({'file': file_path, 'error': f"YAML parsing error: {parsed.yaml_error}"})
+                    continue
                 if verbose:
-                    print(f"   Found {len(matches)} YAML dashboard(s)")
-
-                for dashboard_match in matches:
-                    dashboard_name = dashboard_match.group(1)
-                    dashboards_checked += 1
-
-                    # For YAML, the whole file is typically one dashboard
-                    # Extract from the dashboard declaration to the end
-                    dashboard_body = content[dashboard_match.start():]
-
-                    query_count = _get_query_counts_yaml(dashboard_body, verbose=verbose)
-
-                    if verbose:
-                        print(f"   \n Dashboard: '{dashboard_name}'")
-                        print(f"       \n Actual query EXECUTIONS: {query_count['total_executions']}")
-
-                    # Check if exceeds limit
-                    if query_count['total_executions'] > max_queries:
-                        violations.append({
-                            'file': file_path,
-                            'dashboard': dashboard_name,
-                            'query_executions': query_count['total_executions'],
-                            'max_allowed': max_queries,
-                            'breakdown': query_count
-                        })
-
-                        if verbose:
-                            print(f"       \n VIOLATION: {query_count['total_executions']} exceeds {max_queries}")
-                    elif verbose:
-                        print(f"       \n OK: Within limit")
+                    print(f"   Found {len(parsed.dashboards)} YAML dashboard(s)")
 
+                dashboards = [
+                    (d.get('dashboard', 'Unknown'), _get_query_counts_yaml(d, verbose=verbose),
+                     analyze_dashboard_load(d, d.get('elements') or [], index))
+                    for d in parsed.dashboards
+                ]
             else:
                 # LookML format: dashboard: name {
-                dashboard_pattern = r'dashboard:\s*(\w+)\s*\{'
-                matches = list(re.finditer(dashboard_pattern, content))
+                dashboard_nodes = parsed.blocks('dashboard')
 
                 if verbose:
-                    print(f"   Found {len(matches)} LookML dashboard(s)")
+                    print(f"   Found {len(dashboard_nodes)} LookML dashboard(s)")
 
-                for dashboard_match in matches:
-                    dashboard_name = dashboard_match.group(1)
-                    dashboards_checked += 1
+                dashboards = [
+                    (node.name, _get_query_counts_lookml(node),
+                     analyze_dashboard_load(
+                         {'filters': [{'name': f.name} for f in node.blocks('filter')]},
+                         [_lookml_element(e) for e in node.blocks('element')], index))
+                    for node in dashboard_nodes
+                ]
 
-                    # Find matching closing brace
-                    dashboard_end = find_matching_brace(content, dashboard_match.end() - 1)
+            for dashboard_name, query_count, load in dashboards:
+                dashboards_checked += 1
+                loads.append(dict(load, file=file_path, dashboard=dashboard_name))
 
-                    if dashboard_end == -1:
-                        if verbose:
-                            print(f"   \n  Warning: Could not find closing brace for '{dashboard_name}'")
-                        continue
-
-                    dashboard_body = content[dashboard_match.end():dashboard_end]
-                    query_count = _get_query_counts_yaml(dashboard_body, verbose=verbose)
+                if verbose:
+                    print(f"   \n Dashboard: '{dashboard_name}'")
+                    print(f"       \n Actual query EXECUTIONS: {query_count['total_executions']}")
+                    print(f"       Estimated distinct queries: {load['distinct_queries']}")
+
+                # Check if exceeds limit
+                if query_count['total_executions'] > max_queries:
+                    violations.append({
+                        'file': file_path,
+                        'dashboard': dashboard_name,
+                        'query_executions': query_count['total_executions'],
+                        'max_allowed': max_queries,
+                        'breakdown': query_count
+                    })
 
                     if verbose:
-                        print(f"   \n Dashboard: '{dashboard_name}'")
-                        print(f"       \n Actual query EXECUTIONS: {query_count['total_executions']}")
-
-                    if query_count['total_executions'] > max_queries:
-                        violations.append({
-                            'file': file_path,
-                            'dashboard': dashboard_name,
-                            'query_executions': query_count['total_executions'],
-                            'max_allowed': max_queries,
-                            'breakdown': query_count
-                        })
-
-                        if verbose:
-                            print(f"       \n VIOLATION: {query_count['total_executions']} exceeds {max_queries}")
-                    elif verbose:
-                        print(f"       \n OK: Within limit")
-
-        except Exception as e:
+                        print(f"       \n VIOLATION: {query_count['total_executions']} exceeds {max_queries}")
+                elif verbose:
+                    print(f"       \n OK: Within limit")
+
+        except (OSError, ValueError) as e:
+            # Unreadable or not valid UTF-8
+            errors.append({'file': file_path, 'error': str(e)})
             if verbose:
                 print(f"\n Error processing file {file_path}: {e}")
-            continue
-
-    return violations, dashboards_checked
-
 
-def find_matching_brace(text, start_pos):
-    """
-    Find the position of the matching closing brace.
-    """
-    brace_count = 1
-    pos = start_pos + 1
-
-    while pos < len(text) and brace_count > 0:
-        if text[pos] == '{':
-            brace_count += 1
-        elif text[pos] == '}':
-            brace_count -= 1
-        pos += 1
-
-    if brace_count == 0:
-        return pos - 1
-    else:
-        return -1
+    return violations, dashboards_checked, loads, errors
 
 
 def main():
@@ -183,11 +281,13 @@ def main():
         files_to_audit = args.files.split()
     else:
         project_root = args.project_name
-        patterns = ['**/*.dashboard.lookml', '**/*.dashboard.lkml', '**/dashboard*.lkml', '**/dashboards/*.lkml']
-        for pattern in patterns:
-            for filename in glob.iglob(os.path.join(project_root, pattern), recursive=True):
-                if filename not in files_to_audit:
-                    files_to_audit.append(filename)
+        for filename in discover_project_files(project_root):
+            name = os.path.basename(filename)
+            parent = os.path.basename(os.path.dirname(filename))
+            if (filename.endswith(('.dashboard.lookml', '.dashboard.lkml'))
+                    or (name.startswith('dashboard') and name.endswith('.lkml'))
+                    or (parent == 'dashboards' and name.endswith('.lkml'))):
+                files_to_audit.append(filename)
 
     if not files_to_audit:
         print("\n  No dashboard files found to audit.")
@@ -199,23 +299,53 @@ def main():
             print(f"  - {f}")
 
     # RUN AUDIT
-    violations, dashboards_checked = count_dashboard_queries(
+    index = project_index(args.project_name)
+    violations, dashboards_checked, loads, errors = count_dashboard_queries(
         files_to_audit,
         max_queries=args.max_queries,
-        verbose=args.verbose
+        verbose=args.verbose,
+        index=index
     )
-    
+    index.save()
+
     # Write summary JSON
     summary = {
         "dashboards_exceeding_query_limit": len(violations),
         "total_dashboards_checked": dashboards_checked,
-        "violations": violations
+        "violations": violations,
+        "estimated_distinct_queries": sum(load['distinct_queries'] for load in loads),
+        "tiles_on_fanout_joins": sum(len(load['fanout_tiles']) for load in loads),
+        "dashboard_load": loads,
+        "errors": errors
     }
     output_path = args.output_json or "query_limit_results.json"
     with open(output_path, "w") as f:
         json.dump(summary, f, indent=2)
-        
+
+    # LOAD ESTIMATE (informational, does not change the exit code)
+    print(f"\n{'='*70}")
+    print("\n Dashboard Query Load Estimate")
+    print(f"{'='*70}")
+    for load in loads:
+        print(f"\n {load['file']}")
+        print(f"      Dashboard: {load['dashboard']}")
+        print(f"      Query tiles: {load['query_tiles']} -> distinct queries: {load['distinct_queries']}")
+        for merged in load['merged_queries']:
+            print(f"         - One query on '{merged['explore']}' serves: {', '.join(merged['tiles'])}")
+        for name, count in load['queries_per_filter_change'].items():
+            print(f"      Filter '{name}' change re-runs {count} quer{'y' if count == 1 else 'ies'}")
+        for tile in load['fanout_tiles']:
+            joins = ', '.join(f"{j['join']} ({j['relationship']})" for j in tile['joins'])
+            message = f"Dashboard '{load['dashboard']}' tile '{tile['tile']}' on explore '{tile['explore']}' selects fields across fan-out join(s): {joins}"
+            print(f"::warning file={load['file']},title=Dashboard Tile On Fan-out Join::{message}")
+
     # REPORTING
+    for error in errors:
+        message = error['error'].replace('\n', '%0A')  # workflow commands are single-line
+        print(f"::error file={error['file']},title=Unreadable Dashboard::{message}")
+    if errors:
+        print(f"\n {len(errors)} dashboard file(s) could not be checked")
+
     if violations:
         print(f"\n{'='*70}")
         print("\n Dashboard Query Limit Audit Failed")
@@ -246,13 +376,13 @@ def main():
         sys.exit(1)
     else:
         print(f"\n{'='*70}")
-        print("\n Dashboard Query Limit Audit Passed")
+        print(f"\n Dashboard Query Limit Audit {'Failed' if errors else 'Passed'}")
         print(f"{'='*70}")
         print(f"\n Total dashboards checked: {dashboards_checked}")
         print(f"All dashboards have ≤ {args.max_queries} queries.")
         print(f"{'='*70}\n")
         
-        sys.exit(0)
+        sys.exit(1 if errors else 0)
 
 
 if __name__ == '__main__':
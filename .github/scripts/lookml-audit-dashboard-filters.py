@@ -7,11 +7,12 @@ Checks that YAML dashboards have at least one filter defined
 import re
 import sys
 import os
-import glob
 import argparse
-import yaml
 import json  # <-- ADDED
 
+from lookml_index import discover_project_files
+from lookml_parser import parse_file, prefetch_parsed
+
 def check_dashboard_has_filters(files, verbose=False):
     """
     Checks that YAML dashboard files have at least one filter defined.
@@ -25,53 +26,30 @@ def check_dashboard_has_filters(files, verbose=False):
         print("🔍 Starting Dashboard Filter Validation")
         print(f"{'='*70}\n")
     
-    for file_path in files:
+    for file_path in prefetch_parsed(files):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            parsed = parse_file(file_path)
+            content = parsed.text
             
             if verbose:
                 print(f"📄 Processing: {file_path}")
             
-            # Check if it's a YAML file (starts with ---)
-            is_yaml = content.strip().startswith('---')
-            
-            if not is_yaml:
+            # Check if it's a YAML dashboard file
+            if not parsed.is_yaml:
                 if verbose:
                     print(f"   ⏭️  Skipping: Not a YAML dashboard file")
                 continue
             
-            # Parse YAML content
-            try:
-                # Remove the --- prefix if present
-                yaml_content = content.strip()
-                if yaml_content.startswith('---'):
-                    yaml_content = yaml_content[3:].strip()
-                
-                # Parse YAML
-                dashboard_data = yaml.safe_load(yaml_content)
+            if not parsed.yaml_error:
+                dashboards = parsed.dashboards
                 
-                if not dashboard_data:
+                if not dashboards:
                     if verbose:
                         print(f"   ⚠️  Warning: Could not parse YAML content")
                     continue
                 
-                # Handle both list format and dict format
-                if isinstance(dashboard_data, list):
-                    dashboards = dashboard_data
-                elif isinstance(dashboard_data, dict):
-                    # Single dashboard in dict format
-                    dashboards = [dashboard_data]
-                else:
-                    if verbose:
-                        print(f"   ⚠️  Warning: Unexpected YAML structure")
-                    continue
-                
                 # Check each dashboard
                 for dashboard in dashboards:
-                    if not isinstance(dashboard, dict):
-                        continue
-                    
                     # Get dashboard name
                     dashboard_name = dashboard.get('dashboard', 'Unknown')
                     dashboards_checked += 1
@@ -102,9 +80,9 @@ def check_dashboard_has_filters(files, verbose=False):
                             for fname in filter_names:
                                 print(f"         - {fname}")
             
-            except yaml.YAMLError as e:
+            else:
                 if verbose:
-                    print(f"   ⚠️  Warning: YAML parsing error: {e}")
+                    print(f"   ⚠️  Warning: YAML parsing error: {parsed.yaml_error}")
                 
                 # Fallback to regex-based detection
                 if verbose:
@@ -189,16 +167,13 @@ def main():
         # Find all .dashboard.lookml files recursively
         project_root = args.project_name
         
-        patterns = [
-            '**/*.dashboard.lookml',
-            '**/dashboards/*.lookml',
-            'Dashboards/*.lookml'
-        ]
-        
-        for pattern in patterns:
-            for filename in glob.iglob(os.path.join(project_root, pattern), recursive=True):
-                if filename not in files_to_audit:
-                    files_to_audit.append(filename)
+        top_dashboards = os.path.join(project_root, 'Dashboards')
+        for filename in discover_project_files(project_root, ('.lookml',)):
+            parent = os.path.dirname(filename)
+            if (filename.endswith('.dashboard.lookml')
+                    or os.path.basename(parent) == 'dashboards'
+                    or os.path.normpath(parent) == os.path.normpath(top_dashboards)):
+                files_to_audit.append(filename)
     
     # --- ADDED: Always write a valid JSON file, even if no files found ---
     if not files_to_audit:
@@ -8,12 +8,14 @@ import json
 import sys
 import argparse
 import os
-import re
 from typing import Dict, List, Set
 
+from lookml_index import ProjectIndex, project_index
+
 
 class OrphanedViewsChecker:
-    def __init__(self):
+    def __init__(self, index: ProjectIndex = None):
+        self.index = index or project_index()
         self.results = {
             'orphaned_views': [],
             'files_processed': []
@@ -31,59 +33,50 @@ class OrphanedViewsChecker:
         print(f"🔍 Processing: {file_path}")
        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            entry = self.index.file_symbols(file_path)
+            if entry.get('failed'):
+                print(f"⚠️ Warning processing {file_path}: {entry['failed']}")
+                return
            
             # Collect views
-            self.collect_views(file_path, content)
+            self.collect_views(file_path, entry)
            
             # Collect explores
-            self.collect_explores(file_path, content)
+            self.collect_explores(file_path, entry)
            
         except Exception as e:
             print(f"⚠️ Warning processing {file_path}: {str(e)}")
    
-    def collect_views(self, file_path: str, content: str) -> None:
+    def collect_views(self, file_path: str, entry: Dict) -> None:
         """Collect all view definitions"""
-        # Pattern to match: view: view_name {
-        view_pattern = r'view:\s*(\w+)\s*\{'
-        view_matches = re.finditer(view_pattern, content)
-       
-        for match in view_matches:
-            view_name = match.group(1)
+        for view in entry['views']:
+            view_name = view['name']
             self.views[view_name] = file_path
             print(f"   📋 Found view: {view_name}")
    
-    def collect_explores(self, file_path: str, content: str) -> None:
+    def collect_explores(self, file_path: str, entry: Dict) -> None:
         """Collect all explore definitions and their referenced views"""
-        # Pattern to match: explore: explore_name {
-        explore_pattern = r'explore:\s*(\w+)\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}'
-        explore_matches = re.finditer(explore_pattern, content, re.DOTALL)
-       
-        for match in explore_matches:
-            explore_name = match.group(1)
-            explore_content = match.group(2)
+        for explore in entry['explores']:
+            explore_name = explore['name']
            
             print(f"   🔎 Found explore: {explore_name}")
            
             # The base view is typically the explore name itself
             base_view = explore_name
            
-            # Also check for explicit from: parameter
-            from_match = re.search(r'from:\s*(\w+)', explore_content)
-            if from_match:
-                base_view = from_match.group(1)
+            # Also check for explicit from: / view_name: parameter
+            explicit_view = explore['explicit_view']
+            if explicit_view:
+                base_view = explicit_view
                 print(f"      → Base view (from:): {base_view}")
             else:
                 print(f"      → Base view (implicit): {base_view}")
            
-            # Find all joins in this explore
+            # Find all joins in this explore (a join's from: names the real view)
             joins = []
-            join_pattern = r'join:\s*(\w+)\s*\{'
-            join_matches = re.finditer(join_pattern, explore_content)
            
-            for join_match in join_matches:
-                join_view = join_match.group(1)
+            for join in explore['joins']:
+                join_view = join['view']
                 joins.append(join_view)
                 print(f"      → Joined view: {join_view}")
            
@@ -202,6 +195,11 @@ def main():
         default='orphaned_views.json',
         help='Output file for results (default: orphaned_views.json)'
     )
+    parser.add_argument(
+        '--project-root',
+        default='.',
+        help='Project root the symbol index is built for (default: current directory)'
+    )
    
     args = parser.parse_args()
    
@@ -212,7 +210,7 @@ def main():
     print(f"{'='*70}")
     print(f"Files to process: {len(files_to_check)}\n")
    
-    checker = OrphanedViewsChecker()
+    checker = OrphanedViewsChecker(project_index(args.project_root))
    
     # Process all files
     valid_extensions = ('.view.lkml', '.model.lkml', '.explore.lkml',
@@ -232,6 +230,7 @@ def main():
    
     # Save results
     checker.save_results(args.output_file)
+    checker.index.save()
 
     # ===> ADD THE SUMMARY PART HERE <===
     summary = {
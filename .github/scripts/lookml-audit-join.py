@@ -5,28 +5,21 @@ Checks that all join relationships are 'many_to_one'
 Flags 'one_to_one', 'one_to_many', 'many_to_many', and MISSING as violations
 """
 
-import re
 import sys
-import os
-import glob
 import argparse
 import json  # <-- ADDED
 
-def test_only_many_to_one_joins(files, verbose=False):
+from lookml_cache import default_cache
+from lookml_index import discover_project_files, project_index
+from lookml_parser import PARSER_VERSION
+
+def test_only_many_to_one_joins(files, verbose=False, index=None):
     """
     Checks that all join relationships in explores are 'many_to_one'.
     Flags 'one_to_one', 'one_to_many', 'many_to_many', and MISSING as violations.
+    Joins are read from the project symbol index (default: current directory).
     """
-    # Pattern to find explore blocks (handles nested braces)
-    pattern_explore = r'explore:\s*(\w+)\s*\{'
-    
-    # Pattern to find join blocks within explores
-    pattern_join = r'join:\s*(\w+)\s*\{'
-    
-    # Improved relationship pattern - more flexible with whitespace
-    # Matches: relationship: one_to_one, relationship:one_to_one, etc.
-    relationship_pattern = r'relationship:\s*(\w+)'
-    
+    index = index or project_index()
     violations = []
     total_joins_checked = 0
 
@@ -37,77 +30,35 @@ def test_only_many_to_one_joins(files, verbose=False):
 
     for file_path in files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            entry = index.file_symbols(file_path)
+            if entry.get('failed'):
+                print(f"⚠️ Warning processing file {file_path}: {entry['failed']}")
+                continue
             
             if verbose:
                 print(f"📄 Processing: {file_path}")
-            
-            # Find all explore blocks
-            explore_positions = []
-            for explore_match in re.finditer(pattern_explore, content):
-                explore_name = explore_match.group(1)
-                explore_start = explore_match.start()
-                
-                # Find the matching closing brace for this explore
-                explore_end = find_matching_brace(content, explore_match.end() - 1)
-                
-                if explore_end == -1:
-                    if verbose:
-                        print(f"   ⚠️  Warning: Could not find closing brace for explore '{explore_name}'")
-                    continue
-                
-                explore_body = content[explore_match.end():explore_end]
-                explore_positions.append({
-                    'name': explore_name,
-                    'body': explore_body,
-                    'start': explore_start,
-                    'end': explore_end
-                })
+                for error in entry['errors']:
+                    print(f"   ⚠️  Warning: {error}")
             
             # Process each explore
-            for explore_info in explore_positions:
-                explore_name = explore_info['name']
-                explore_body = explore_info['body']
+            for explore in entry['explores']:
+                explore_name = explore['name']
                 
                 if verbose:
                     print(f"   🔎 Explore: '{explore_name}'")
                 
-                # Find all join blocks in this explore
-                join_positions = []
-                for join_match in re.finditer(pattern_join, explore_body):
-                    join_name = join_match.group(1)
-                    join_start = join_match.start()
-                    
-                    # Find the matching closing brace for this join
-                    join_end = find_matching_brace(explore_body, join_match.end() - 1)
-                    
-                    if join_end == -1:
-                        if verbose:
-                            print(f"      ⚠️  Warning: Could not find closing brace for join '{join_name}'")
-                        continue
-                    
-                    join_body = explore_body[join_match.end():join_end]
-                    join_positions.append({
-                        'name': join_name,
-                        'body': join_body
-                    })
-                
                 # Check each join for relationship
-                for join_info in join_positions:
-                    join_name = join_info['name']
-                    join_body = join_info['body']
+                for join in explore['joins']:
+                    join_name = join['name']
                     total_joins_checked += 1
                     
                     if verbose:
                         print(f"      → Join: '{join_name}'")
                     
                     # Search for relationship declaration
-                    rel_match = re.search(relationship_pattern, join_body, re.IGNORECASE)
+                    relationship_type = join['relationship']
                     
-                    if rel_match:
-                        relationship_type = rel_match.group(1).lower()
-                        
+                    if relationship_type:
                         if verbose:
                             print(f"         Relationship: {relationship_type}")
                         
@@ -115,6 +66,7 @@ def test_only_many_to_one_joins(files, verbose=False):
                         if relationship_type != "many_to_one":
                             violations.append({
                                 'file': file_path,
+                                'line': join['line'],
                                 'explore': explore_name,
                                 'join': join_name,
                                 'relationship': relationship_type
@@ -126,6 +78,7 @@ def test_only_many_to_one_joins(files, verbose=False):
                         # Missing relationship declaration
                         violations.append({
                             'file': file_path,
+                            'line': join['line'],
                             'explore': explore_name,
                             'join': join_name,
                             'relationship': 'MISSING'
@@ -148,27 +101,6 @@ def test_only_many_to_one_joins(files, verbose=False):
     
     return violations
 
-def find_matching_brace(text, start_pos):
-    """
-    Find the position of the matching closing brace.
-    start_pos should be the position of the opening brace.
-    Returns the position of the matching closing brace, or -1 if not found.
-    """
-    brace_count = 1
-    pos = start_pos + 1
-    
-    while pos < len(text) and brace_count > 0:
-        if text[pos] == '{':
-            brace_count += 1
-        elif text[pos] == '}':
-            brace_count -= 1
-        pos += 1
-    
-    if brace_count == 0:
-        return pos - 1
-    else:
-        return -1
-
 def main():
     parser = argparse.ArgumentParser(
         description='Audit LookML joins to ensure all use many_to_one relationships'
@@ -200,12 +132,10 @@ def main():
         # Find all .model.lkml and .explore.lkml files recursively
         project_root = args.project_name
         
-        for pattern in ['**/*.model.lkml', '**/*.explore.lkml', '**/*.lkml']:
-            for filename in glob.iglob(os.path.join(project_root, pattern), recursive=True):
-                if filename not in files_to_audit:
-                    # Check if it's a model or explore file
-                    if filename.endswith(('.model.lkml', '.explore.lkml')) or 'explore' in filename.lower():
-                        files_to_audit.append(filename)
+        for filename in discover_project_files(project_root):
+            # Check if it's a model or explore file
+            if filename.endswith(('.model.lkml', '.explore.lkml')) or 'explore' in filename.lower():
+                files_to_audit.append(filename)
 
     # --- ADDED: Always write a valid JSON file, even if no files found ---
     if not files_to_audit:
@@ -226,7 +156,12 @@ def main():
             print(f"  - {f}")
     
     # RUN AUDIT
-    violations = test_only_many_to_one_joins(files_to_audit, verbose=args.verbose)
+    index = project_index(args.project_name)
+    violations = test_only_many_to_one_joins(files_to_audit, verbose=args.verbose, index=index)
+    index.save()
+    cache = default_cache(PARSER_VERSION)
+    if cache:
+        print(cache.summary())
 
     # Write summary JSON
     summary = {
@@ -248,10 +183,10 @@ def main():
             message = f"Explore '{v['explore']}', Join '{v['join']}' → Relationship: {v['relationship']}"
             
             # GitHub Actions annotation format
-            print(f"::error file={v['file']},title=Invalid Join Relationship::{message}")
+            print(f"::error file={v['file']},line={v['line']},title=Invalid Join Relationship::{message}")
             
             # Also print readable format
-            print(f"   📍 {v['file']}")
+            print(f"   📍 {v['file']}:{v['line']}")
             print(f"      Explore: {v['explore']}")
             print(f"      Join: {v['join']}")
             print(f"      Issue: Relationship is '{v['relationship']}' (must be 'many_to_one')")
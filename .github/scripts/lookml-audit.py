@@ -5,53 +5,45 @@ Find LookML Views Without Primary Keys Defined
 Usage:
   python lookml-audit.py --project-name="."
   # or: --project-name path/to/repo/root
+  # or: --files "views/a.view.lkml views/b.view.lkml"
 """
 
-import re
 import argparse
 import os
-import glob
 import sys
 import json  # <-- ADDED
 
-VIEW_BLOCK_RE = re.compile(r'view:\s*(\w+)\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}', re.DOTALL)
-PRIMARY_KEY_RE = re.compile(r'primary_key:\s*yes\b')
+from lookml_cache import default_cache
+from lookml_index import discover_project_files
+from lookml_parser import PARSER_VERSION, parse_file, prefetch_parsed
 
 def collect_lookml_files(project_root: str) -> list[str]:
-    patterns = [
-        os.path.join(project_root, "views", "**", "*.view.lkml"),
-        os.path.join(project_root, "views", "**", "*.view"),
-    ]
-    files: list[str] = []
-    for p in patterns:
-        files.extend(glob.glob(p, recursive=True))
-    # de-dupe & sort for stable output
-    return sorted(set(files))
+    # view files under <root>/views/, sorted for stable output
+    views_dir = os.path.join(project_root, "views") + os.sep
+    return [f for f in discover_project_files(project_root, (".view.lkml", ".view")) if f.startswith(views_dir)]
 
 def find_views_without_primary_keys(files: list[str]) -> list[tuple[str, str]]:
     missing_pk: list[tuple[str, str]] = []
-    for file_path in files:
+    for file_path in prefetch_parsed(files):
         if not os.path.exists(file_path):
             print(f"File not found: {file_path}")
             continue
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        for match in VIEW_BLOCK_RE.finditer(content):
-            view_name = match.group(1)
-            view_body = match.group(2)
-            if not PRIMARY_KEY_RE.search(view_body):
-                missing_pk.append((file_path, view_name))
+        parsed = parse_file(file_path)
+        for view in parsed.views:
+            if not any(node.get("primary_key") == "yes" for node in view.walk()):
+                missing_pk.append((file_path, view.name))
     return missing_pk
 
 def main():
     parser = argparse.ArgumentParser(description="Find LookML views without primary keys in a project")
     parser.add_argument("--project-name", required=True, help="Path to the Looker project root (use '.' for repo root)")
+    parser.add_argument("--files", help="Space-separated list of view files to check (skips discovery)")
     args = parser.parse_args()
 
     # If a folder named exactly as project-name doesn't exist, assume current dir
     project_root = args.project_name if os.path.isdir(args.project_name) else "."
 
-    files_to_audit = collect_lookml_files(project_root)
+    files_to_audit = args.files.split() if args.files else collect_lookml_files(project_root)
 
     # --- ADDED: Always write a valid JSON file, even if no files found ---
     if not files_to_audit:
@@ -68,6 +60,9 @@ def main():
 
     print(f"Auditing {len(files_to_audit)} LookML files in project root '{project_root}'...")
     missing_pks = find_views_without_primary_keys(files_to_audit)
+    cache = default_cache(PARSER_VERSION)
+    if cache:
+        print(cache.summary())
 
     # Write summary JSON before exit
     summary = {
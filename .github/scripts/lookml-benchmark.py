@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+LookML Audit Benchmarks
+Runs every local audit, the linter and the orchestrated pipeline against fixed
+synthetic projects (see lookml_synthetic_project.py) and records wall time, CPU
+time, peak RSS and a per-phase breakdown for each. The Looker API checks run
+against a local mock server (looker_mock_server.py) with a fixed latency and
+payload shape, and also record how many API requests they made. Every
+measurement runs in a fresh interpreter so memory and the in-process parse
+memo are not shared.
+Results can be saved as a JSON baseline; comparing against a baseline fails
+when any benchmark regresses past the threshold.
+--scaling instead parses pathological inputs (deep nesting, unterminated SQL
+and lists, stray braces, ...) at growing sizes and fails when parse time grows
+faster than linearly, i.e. when the scanner backtracks or rescans.
+
+Usage:
+  python lookml-benchmark.py --size small --save-baseline benchmark_baseline.json
+  python lookml-benchmark.py --size small --baseline benchmark_baseline.json --threshold 0.25
+  python lookml-benchmark.py --baseline .github/config/benchmark-baseline-small.json
+  python lookml-benchmark.py --scaling
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RULES_FILE = os.path.join(SCRIPTS_DIR, '..', 'config', 'linting-rules.yaml')
+
+# Fixed project shapes; changing one invalidates baselines recorded with it
+PROJECT_SIZES = {
+    'small': {'views': 500, 'explores': 100, 'joins': 4, 'dashboards': 20, 'elements': 12, 'seed': 1},
+    'medium': {'views': 5000, 'explores': 1000, 'joins': 4, 'dashboards': 200, 'elements': 12,
+               'views_per_file': 5, 'seed': 1},
+    'large': {'views': 20000, 'explores': 4000, 'joins': 6, 'dashboards': 500, 'elements': 20,
+              'views_per_file': 10, 'seed': 1},
+}
+
+# Pipeline checks that run without the Looker API, benchmarked one by one
+BENCHMARKS = ['primary_keys', 'orphaned_views', 'joins', 'dashboard_queries', 'dashboard_filters', 'linting']
+PIPELINE_BENCHMARK = 'pipeline'
+
+# Pipeline checks that call the Looker API, run against the mock server
+API_BENCHMARKS = ['syntax', 'sql_execution', 'data_tests', 'content']
+
+# Fixed mock instance shape; changing it invalidates baselines recorded with it
+MOCK_API_OPTIONS = {'project': 'synthetic', 'latency': 0.02, 'rows': 500, 'models': 5, 'explores': 20,
+                    'tests': 50, 'validation_errors': 3, 'content_errors': 10, 'seed': 1}
+
+ALL_BENCHMARKS = BENCHMARKS + [PIPELINE_BENCHMARK] + API_BENCHMARKS
+
+METRICS = ['wall_seconds', 'cpu_seconds', 'peak_rss_mb', 'api_requests']
+
+# Timing differences below this are treated as noise when comparing to a baseline
+DEFAULT_MIN_DELTA_SECONDS = 0.05
+
+RESULT_MARKER = 'LOOKML_BENCHMARK_RESULT '
+
+# Inputs that make a backtracking or rescanning parser superlinear; each builds
+# LookML text from a repeat count
+PATHOLOGICAL_INPUTS = {
+    'deep_nesting': lambda n: 'view: v {\n' + 'link: {\n' * n + '}\n' * n + '}\n',
+    'nested_dimensions': lambda n: 'view: v {\n' + 'dimension: d { link: { url: "{{ value }}" } sql: ${TABLE}.d ;; }\n' * n + '}\n',
+    'unterminated_sql': lambda n: 'view: v {\n' + 'dimension: d {\n  sql: ${TABLE}.d\n}\n' * n + '}\n',
+    'unterminated_lists': lambda n: 'explore: e {\n' + 'fields: [a, "b\n' * n + '}\n',
+    'unmatched_braces': lambda n: '}\n' * n,
+    'long_token': lambda n: 'view: v {\n' + 'a' * (n * 20) + '\n}\n',
+    'liquid_sql': lambda n: 'view: v {\n' + ('dimension: d { html: {% if value > 0 %}{{ rendered_value }}{% endif %} ;; '
+                                              'sql: {% condition f %} ${TABLE}.d {% endcondition %} ;; }\n') * n + '}\n',
+}
+SCALING_SIZES = (5000, 10000, 20000)
+
+# Growth exponent of parse time over input size: 1 is linear, 2 quadratic
+DEFAULT_MAX_EXPONENT = 1.5
+
+
+def load_pipeline():
+    """Import lookml-pipeline.py, whose check_* methods are what gets measured"""
+    spec = importlib.util.spec_from_file_location('lookml_pipeline', os.path.join(SCRIPTS_DIR, 'lookml-pipeline.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['lookml_pipeline'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return maxrss / divisor
+
+
+def ensure_project(work_dir: str, size: str) -> str:
+    """Generate the synthetic project for a size once and reuse it while its options match"""
+    from lookml_synthetic_project import generate_project
+
+    options = PROJECT_SIZES[size]
+    project_dir = os.path.join(work_dir, f"synthetic_{size}")
+    manifest = os.path.join(project_dir, 'synthetic_project.json')
+    try:
+        with open(manifest, 'r') as f:
+            if json.load(f).get('options') == options:
+                return project_dir
+    except (OSError, ValueError):
+        pass
+
+    print(f"Generating '{size}' synthetic project in {project_dir} ...")
+    stats = generate_project(project_dir, **options)
+    print(f"  {stats['files']:,} files, {stats['views']:,} views, {stats['explores']:,} explores, "
+          f"{stats['dashboards']:,} dashboards, {stats['bytes'] / 1e6:.1f} MB")
+    return project_dir
+
+
+# ----------------------------------------------------------------------
+# Worker: one measurement in a fresh interpreter
+# ----------------------------------------------------------------------
+
+def measure(name: str, project_root: str, rules_file: str, config_file: str = 'looker.ini') -> Dict[str, Any]:
+    """Run one benchmark in this process and return its metrics and phase timings"""
+    pipeline_module = load_pipeline()
+    import lookml_parser
+
+    args = argparse.Namespace(project_name=MOCK_API_OPTIONS['project'], project_root=project_root, files='',
+                              folder_name='BI Sandbox', config_file=config_file, rules_file=rules_file,
+                              lint_jobs=1, lint_diff_base='', include_unreachable=False,
+                              sql_workers=4, sql_mode='execute', sql_estimate_bytes=False,
+                              sql_max_rows=1000, sql_cache_ttl=0)
+    pipeline = pipeline_module.LookMLPipeline(args)
+    if name == PIPELINE_BENCHMARK:
+        # Stands in for the workflow's --files list, so it is not part of the measurement
+        pipeline.changed_files = [f for f in pipeline_module.discover_project_files(project_root)
+                                  if f.endswith('.lkml')]
+
+    # Attribute parsing time, per pipeline step, by wrapping the parser's single entry point
+    parse_seconds = [0.0]
+    parse_by_phase: Dict[Optional[str], float] = {}
+    original_parse_text = lookml_parser.parse_text
+
+    def timed_parse_text(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_parse_text(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            parse_seconds[0] += elapsed
+            parse_by_phase[pipeline.current_phase] = parse_by_phase.get(pipeline.current_phase, 0.0) + elapsed
+
+    lookml_parser.parse_text = timed_parse_text
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    phases: Dict[str, float] = {}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if name == PIPELINE_BENCHMARK:
+            pipeline.run(BENCHMARKS)
+            # Parsing is reported once, so each step keeps only its own work
+            phases.update({step: seconds - parse_by_phase.get(step, 0.0)
+                           for step, seconds in pipeline.phases.items()})
+            phases['parse'] = parse_seconds[0]
+            phases['other'] = max(0.0, time.perf_counter() - wall_start - sum(phases.values()))
+        else:
+            phase_start = time.perf_counter()
+            pipeline.project_files = pipeline_module.discover_project_files(project_root)
+            pipeline.audit_files = pipeline.project_files
+            pipeline.changed_files = [f for f in pipeline.project_files if f.endswith('.lkml')]
+            phases['discover'] = time.perf_counter() - phase_start
+
+            if name in API_BENCHMARKS:
+                # Logs in and issues the check's independent calls, as pipeline.run() does
+                phase_start = time.perf_counter()
+                pipeline.prefetch_api([name])
+                phases['prefetch'] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            getattr(pipeline, f'check_{name}')()
+            phases['parse'] = parse_seconds[0]
+            phases['api' if name in API_BENCHMARKS else 'audit'] = time.perf_counter() - phase_start - parse_seconds[0]
+
+    result = {
+        'wall_seconds': time.perf_counter() - wall_start,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'peak_rss_mb': peak_rss_mb(),
+        'phases': {phase: round(seconds, 4) for phase, seconds in phases.items()}
+    }
+    if pipeline.client is not None:
+        result['api_requests'] = len(pipeline.client.latencies)
+    return result
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    # Audits write their result JSON into the working directory
+    config_file = os.path.abspath(args.config_file)
+    with tempfile.TemporaryDirectory(prefix='lookml-benchmark-') as scratch:
+        os.chdir(scratch)
+        # A fresh token cache per run, so every API benchmark includes its login
+        os.environ['LOOKER_TOKEN_CACHE_DIR'] = scratch
+        result = measure(args.worker, os.path.abspath(args.project_root), os.path.abspath(args.rules_file),
+                         config_file)
+    print(RESULT_MARKER + json.dumps(result))
+
+
+@contextlib.contextmanager
+def mock_api(work_dir: str):
+    """Serve the fixed mock Looker instance for the duration of the API benchmarks; yields its config file"""
+    from looker_mock_server import MockLookerState, start_server, write_config
+
+    server, base_url = start_server(MockLookerState(**MOCK_API_OPTIONS))
+    os.makedirs(work_dir, exist_ok=True)
+    config_file = os.path.join(work_dir, 'looker-mock.ini')
+    write_config(config_file, base_url)
+    try:
+        yield config_file
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+class BenchmarkRunner:
+    def __init__(self, project_root: str, rules_file: str, repeat: int = 3, use_cache: bool = False,
+                 config_file: str = 'looker.ini'):
+        self.project_root = project_root
+        self.rules_file = rules_file
+        self.repeat = max(1, repeat)
+        self.use_cache = use_cache
+        self.config_file = config_file
+
+    def run_once(self, name: str) -> Dict[str, Any]:
+        env = dict(os.environ)
+        if not self.use_cache:
+            env.pop('LOOKML_CACHE_DIR', None)
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', name,
+             '--project-root', self.project_root, '--rules-file', self.rules_file,
+             '--config-file', self.config_file],
+            env=env, capture_output=True, text=True
+        )
+        for line in completed.stdout.splitlines():
+            if line.startswith(RESULT_MARKER):
+                return json.loads(line[len(RESULT_MARKER):])
+        raise RuntimeError(f"benchmark '{name}' produced no result (exit {completed.returncode}): "
+                           f"{completed.stderr.strip()[-500:]}")
+
+    def run(self, name: str) -> Dict[str, Any]:
+        """Median wall/CPU time and maximum peak RSS over the repeats"""
+        runs = [self.run_once(name) for _ in range(self.repeat)]
+        phase_names = list(dict.fromkeys(p for r in runs for p in r['phases']))
+        result = {
+            'wall_seconds': round(statistics.median(r['wall_seconds'] for r in runs), 4),
+            'cpu_seconds': round(statistics.median(r['cpu_seconds'] for r in runs), 4),
+            'peak_rss_mb': round(max(r['peak_rss_mb'] for r in runs), 1),
+            'phases': {p: round(statistics.median(r['phases'].get(p, 0.0) for r in runs), 4) for p in phase_names},
+            'runs': len(runs)
+        }
+        if any('api_requests' in r for r in runs):
+            result['api_requests'] = max(r.get('api_requests', 0) for r in runs)
+        return result
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float,
+            min_delta: float) -> List[Dict[str, Any]]:
+    """Benchmarks whose metrics grew past the threshold relative to the baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            if metric.endswith('_seconds') and new - old < min_delta:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append({'benchmark': name, 'metric': metric, 'baseline': old,
+                                    'current': new, 'change': round(change, 4)})
+    return regressions
+
+
+def measure_scaling(repeat: int) -> Dict[str, Dict]:
+    """Parse each pathological input at every size; best-of-repeat seconds and the growth exponent"""
+    from lookml_parser import parse_text
+
+    results = {}
+    for name, make_text in PATHOLOGICAL_INPUTS.items():
+        sizes, seconds = [], []
+        for count in SCALING_SIZES:
+            text = make_text(count)
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                parse_text(text)
+                runs.append(time.perf_counter() - start)
+            sizes.append(len(text))
+            seconds.append(max(min(runs), 1e-6))
+        exponent = math.log(seconds[-1] / seconds[0]) / math.log(sizes[-1] / sizes[0])
+        results[name] = {'bytes': sizes, 'seconds': [round(t, 4) for t in seconds], 'exponent': round(exponent, 2)}
+    return results
+
+
+def print_scaling(results: Dict[str, Dict], max_exponent: float) -> None:
+    print(f"\n{'=' * 78}")
+    print("LOOKML SCANNER SCALING (pathological inputs)")
+    print(f"{'=' * 78}")
+    print(f"  {'input':<20} {'bytes':>22}  {'seconds':>24}  exponent")
+    for name, result in results.items():
+        sizes = '/'.join(f"{b // 1000}k" for b in result['bytes'])
+        timings = '/'.join(f"{t:.3f}" for t in result['seconds'])
+        flag = '' if result['exponent'] <= max_exponent else '  <-- superlinear'
+        print(f"  {name:<20} {sizes:>22}  {timings:>24}  {result['exponent']:>8.2f}{flag}")
+
+
+def print_results(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]]) -> None:
+    print(f"\n{'=' * 78}")
+    print("LOOKML BENCHMARK RESULTS")
+    print(f"{'=' * 78}")
+    print(f"  {'benchmark':<20} {'wall':>9} {'cpu':>9} {'peak rss':>10}  phases")
+    for name, result in results.items():
+        line = (f"  {name:<20} {result['wall_seconds']:8.2f}s {result['cpu_seconds']:8.2f}s "
+                f"{result['peak_rss_mb']:8.1f}MB  ")
+        line += ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in result['phases'].items())
+        if 'api_requests' in result:
+            line += f" ({result['api_requests']} API requests)"
+        print(line)
+        base = (baseline or {}).get(name)
+        if base and base.get('wall_seconds'):
+            change = (result['wall_seconds'] - base['wall_seconds']) / base['wall_seconds']
+            print(f"  {'':<20} baseline {base['wall_seconds']:.2f}s ({change:+.0%} wall)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the LookML audits against synthetic projects')
+    parser.add_argument('--size', choices=list(PROJECT_SIZES), default='small',
+                        help='Synthetic project size (default: small)')
+    parser.add_argument('--benchmarks', help=f"Comma-separated subset to run (default: all). "
+                                             f"Available: {', '.join(ALL_BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; medians are reported (default: 3)')
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'lookml-benchmark'),
+                        help='Directory holding the generated projects (reused between runs)')
+    parser.add_argument('--project-root', help='Benchmark an existing project instead of a synthetic one')
+    parser.add_argument('--rules-file', default=DEFAULT_RULES_FILE, help='Linting rules configuration file')
+    parser.add_argument('--config-file', default='looker.ini', help=argparse.SUPPRESS)
+    parser.add_argument('--use-cache', action='store_true',
+                        help='Keep $LOOKML_CACHE_DIR set (default: measure uncached runs)')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', help='Write these results as a baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed fractional growth of any metric over the baseline (default: 0.25)')
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA_SECONDS,
+                        help=f'Ignore timing growth smaller than this many seconds (default: {DEFAULT_MIN_DELTA_SECONDS})')
+    parser.add_argument('--scaling', action='store_true',
+                        help='Benchmark the scanner on pathological inputs of growing size instead of the audits')
+    parser.add_argument('--max-exponent', type=float, default=DEFAULT_MAX_EXPONENT,
+                        help=f'With --scaling, fail when parse time grows faster than size**N (default: {DEFAULT_MAX_EXPONENT})')
+    parser.add_argument('--output-file', default='benchmark_results.json', help='Output file for results')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    if args.scaling:
+        scaling = measure_scaling(max(1, args.repeat))
+        print_scaling(scaling, args.max_exponent)
+        superlinear = [name for name, result in scaling.items() if result['exponent'] > args.max_exponent]
+        with open(args.output_file, 'w') as f:
+            json.dump({'scaling': scaling, 'max_exponent': args.max_exponent,
+                       'python': platform.python_version(), 'superlinear': superlinear}, f, indent=2)
+        print(f"\n📄 Benchmark results saved to {args.output_file}")
+        if superlinear:
+            print(f"\n❌ Parse time grows faster than size**{args.max_exponent} for: {', '.join(superlinear)}")
+            sys.exit(1)
+        print("✅ Scanner scales linearly on every pathological input")
+        return
+
+    names = ALL_BENCHMARKS
+    if args.benchmarks:
+        names = [n.strip() for n in args.benchmarks.split(',') if n.strip()]
+        unknown = [n for n in names if n not in ALL_BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    project_root = os.path.abspath(args.project_root or ensure_project(args.work_dir, args.size))
+    runner = BenchmarkRunner(project_root, os.path.abspath(args.rules_file), args.repeat, args.use_cache)
+
+    results: Dict[str, Dict] = {}
+    for name in names:
+        if name in API_BENCHMARKS:
+            continue
+        print(f"Running benchmark '{name}' ({runner.repeat} run(s)) ...")
+        results[name] = runner.run(name)
+    api_names = [name for name in names if name in API_BENCHMARKS]
+    if api_names:
+        with mock_api(args.work_dir) as config_file:
+            runner.config_file = config_file
+            for name in api_names:
+                print(f"Running benchmark '{name}' against the mock Looker API ({runner.repeat} run(s)) ...")
+                results[name] = runner.run(name)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline_file = json.load(f)
+        if baseline_file.get('project') != (args.project_root or args.size):
+            print(f"⚠️  Baseline was recorded for '{baseline_file.get('project')}', "
+                  f"not '{args.project_root or args.size}'")
+        baseline = baseline_file.get('benchmarks', {})
+
+    print_results(results, baseline)
+
+    output = {
+        'project': args.project_root or args.size,
+        'project_options': None if args.project_root else PROJECT_SIZES[args.size],
+        'mock_api_options': MOCK_API_OPTIONS,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': results
+    }
+    regressions = []
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        output['threshold'] = args.threshold
+        output['regressions'] = regressions
+
+    with open(args.output_file, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n📄 Benchmark results saved to {args.output_file}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({k: v for k, v in output.items() if k not in ('threshold', 'regressions')}, f, indent=2)
+        print(f"📄 Baseline saved to {args.save_baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) past {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['benchmark']}: {r['metric']} {r['baseline']} -> {r['current']} ({r['change']:+.0%})")
+        sys.exit(1)
+
+    print("✅ Benchmarks completed" + (" with no regressions" if baseline is not None else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,28 +7,32 @@ Adapted from run_data_tests.rtf for GitHub Actions
 import json
 import sys
 import argparse
-import configparser
 import requests
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
+from looker_api_client import DEFAULT_POOL_SIZE, LookerAPIClient
+
 
 class LookerDataTestRunner:
-    def __init__(self, config_file: str = 'looker.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file)
-        
-        # Looker connection details
-        self.base_url = self.config['Looker']['base_url'].rstrip('/')
-        self.client_id = self.config['Looker']['client_id']
-        self.client_secret = self.config['Looker']['client_secret']
-        self.api_version = self.config.get('Looker', 'api_version', fallback='4.0')
-        
-        self.api_url = f"{self.base_url}/api/{self.api_version}"
-        self.session = requests.Session()
+    def __init__(self, config_file: str = 'looker.ini', client: Optional[LookerAPIClient] = None, max_workers: int = 8):
+        # Shared authenticated session (pooled, rate limited, token reused across the job)
+        self.client = client or LookerAPIClient(config_file, pool_size=max(DEFAULT_POOL_SIZE, max_workers))
+        self.api_url = self.client.api_url
+        self.session = self.client.session
         self.access_token = None
         
+        # Model/explore metadata is fetched concurrently and each path only once
+        # per run, shared by model validation and LookML test validation
+        self.max_workers = max(1, max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.metadata_cache: Dict[str, Future] = {}
+        self.metadata_lock = threading.Lock()
+        self.metadata_cache_hits = 0  # LookML test lookups answered without a new request
+        
         self.test_results = {
             'model_validation': [],
             'data_tests': [],
@@ -39,37 +43,20 @@ class LookerDataTestRunner:
                 'total_tests': 0,
                 'passed_tests': 0,
                 'failed_tests': 0,
-                'warnings': 0
+                'warnings': 0,
+                'metadata_requests': 0,
+                'metadata_cache_hits': 0
             },
             'timestamp': datetime.now().isoformat()
         }
     
     def authenticate(self) -> bool:
         """Authenticate with Looker API and get access token"""
-        login_url = f"{self.api_url}/login"
-        
-        login_data = {
-            'client_id': self.client_id,
-            'client_secret': self.client_secret
-        }
+        if not self.client.authenticate():
+            return False
+        self.access_token = self.client.access_token
         
         try:
-            response = self.session.post(login_url, data=login_data)
-            response.raise_for_status()
-            
-            auth_data = response.json()
-            self.access_token = auth_data.get('access_token')
-            
-            if not self.access_token:
-                print("Failed to obtain access token")
-                return False
-                
-            # Set authorization header for future requests
-            self.session.headers.update({
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/json'
-            })
-            
             # Test connection
             me_response = self.session.get(f"{self.api_url}/user")
             if me_response.status_code == 200:
@@ -84,6 +71,44 @@ class LookerDataTestRunner:
             print(f"Authentication failed: {e}")
             return False
     
+    def _fetch_metadata(self, path: str) -> Dict[str, Any]:
+        """GET an API path; returns status_code, parsed data and an error message"""
+        entry = {'status_code': None, 'data': None, 'error': None}
+        try:
+            response = self.session.get(f"{self.api_url}{path}")
+            entry['status_code'] = response.status_code
+            response.raise_for_status()
+            entry['data'] = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            entry['error'] = str(e)
+        return entry
+    
+    def fetch_metadata(self, path: str) -> Future:
+        """Start (or join) the request for an API path; every path is requested once per run"""
+        with self.metadata_lock:
+            future = self.metadata_cache.get(path)
+            if future is None:
+                future = self.executor.submit(self._fetch_metadata, path)
+                self.metadata_cache[path] = future
+        return future
+    
+    def get_model(self, model_name: str) -> Future:
+        return self.fetch_metadata(f"/lookml_models/{model_name}")
+    
+    def get_explore(self, model_name: str, explore_name: str) -> Future:
+        return self.fetch_metadata(self.explore_path(model_name, explore_name))
+    
+    @staticmethod
+    def explore_path(model_name: str, explore_name: str) -> str:
+        return f"/lookml_models/{model_name}/explores/{explore_name}"
+    
+    def request_explore(self, model_name: str, explore_name: str) -> None:
+        """Request an explore as soon as its model lookup succeeds; unknown models cost no explore call"""
+        def on_model(future: Future) -> None:
+            if future.result()['status_code'] == 200:
+                self.get_explore(model_name, explore_name)
+        self.get_model(model_name).add_done_callback(on_model)
+    
     def run_model_validation(self, project_name: str) -> List[Dict[str, Any]]:
         """Run validation for all models in the project"""
         try:
@@ -102,15 +127,23 @@ class LookerDataTestRunner:
             
             validation_results = []
             
-            for model in project_models:
-                model_name = model.get('name')
+            # Request every model up front, then every explore as soon as its
+            # model is known; results are still reported in project order
+            model_futures = [(model.get('name'), self.get_model(model.get('name'))) for model in project_models]
+            for model_name, model_future in model_futures:
+                model_details = model_future.result()['data'] or {}
+                for explore in model_details.get('explores', []):
+                    self.get_explore(model_name, explore.get('name'))
+            
+            for model_name, model_future in model_futures:
                 print(f"\nValidating model: {model_name}")
                 
                 try:
                     # Get model details
-                    model_response = self.session.get(f"{self.api_url}/lookml_models/{model_name}")
-                    model_response.raise_for_status()
-                    model_details = model_response.json()
+                    model_entry = model_future.result()
+                    if model_entry['error']:
+                        raise Exception(model_entry['error'])
+                    model_details = model_entry['data']
                     
                     # Check if model has any errors
                     model_errors = model_details.get('errors', [])
@@ -142,11 +175,10 @@ class LookerDataTestRunner:
                         for explore in explores:
                             explore_name = explore.get('name')
                             try:
-                                explore_response = self.session.get(
-                                    f"{self.api_url}/lookml_models/{model_name}/explores/{explore_name}"
-                                )
-                                explore_response.raise_for_status()
-                                explore_details = explore_response.json()
+                                explore_entry = self.get_explore(model_name, explore_name).result()
+                                if explore_entry['error']:
+                                    raise Exception(explore_entry['error'])
+                                explore_details = explore_entry['data']
                                 
                                 explore_errors = explore_details.get('errors', [])
                                 if explore_errors:
@@ -233,6 +265,20 @@ class LookerDataTestRunner:
                     
                     test_results = []
                     
+                    # Start the model lookups for every test at once, each explore
+                    # once its model is found; anything already fetched by model
+                    # validation is reused
+                    with self.metadata_lock:
+                        requested = set(self.metadata_cache)
+                    for test in lookml_tests:
+                        if test.get('model_name') and test.get('explore_name'):
+                            for path in (f"/lookml_models/{test['model_name']}",
+                                         self.explore_path(test['model_name'], test['explore_name'])):
+                                if path in requested:
+                                    self.metadata_cache_hits += 1
+                                requested.add(path)
+                            self.request_explore(test['model_name'], test['explore_name'])
+                    
                     # Validate each test definition
                     for test in lookml_tests:
                         test_name = test.get('name', 'Unknown')
@@ -262,17 +308,17 @@ class LookerDataTestRunner:
                             # Try to validate model and explore existence
                             if test.get('model_name') and test.get('explore_name'):
                                 try:
-                                    model_response = self.session.get(
-                                        f"{self.api_url}/lookml_models/{test['model_name']}"
-                                    )
-                                    if model_response.status_code == 200:
+                                    model_entry = self.get_model(test['model_name']).result()
+                                    if model_entry['status_code'] is None:
+                                        raise Exception(model_entry['error'])
+                                    if model_entry['status_code'] == 200:
                                         print(f"  Model '{test['model_name']}' exists")
                                         
                                         # Check if explore exists in model
-                                        explore_response = self.session.get(
-                                            f"{self.api_url}/lookml_models/{test['model_name']}/explores/{test['explore_name']}"
-                                        )
-                                        if explore_response.status_code == 200:
+                                        explore_entry = self.get_explore(test['model_name'], test['explore_name']).result()
+                                        if explore_entry['status_code'] is None:
+                                            raise Exception(explore_entry['error'])
+                                        if explore_entry['status_code'] == 200:
                                             print(f"  Explore '{test['explore_name']}' exists in model '{test['model_name']}'")
                                             test_info['message'] = 'Test definition and dependencies are valid'
                                         else:
@@ -347,6 +393,9 @@ class LookerDataTestRunner:
         
         summary = self.test_results['summary']
         
+        print(f"\nModel/explore metadata: {summary['metadata_requests']} API requests, "
+              f"{summary['metadata_cache_hits']} LookML test lookups served from the run cache")
+        
         # Model validation summary
         if summary['total_models'] > 0:
             print(f"\nModel Validation:")
@@ -389,15 +438,28 @@ class LookerDataTestRunner:
             print("Failed to authenticate with Looker")
             return False
         
-        # Run model validation
-        print(f"\n1. Running model validation...")
-        model_validation = self.run_model_validation(project_name)
-        self.test_results['model_validation'] = model_validation
+        # The model list, project validation and test listing are independent: issue them together
+        self.client.prefetch([
+            "/lookml_models",
+            f"/projects/{project_name}/validate",
+            f"/projects/{project_name}/lookml_tests"
+        ])
+        
+        try:
+            # Run model validation
+            print(f"\n1. Running model validation...")
+            model_validation = self.run_model_validation(project_name)
+            self.test_results['model_validation'] = model_validation
+            
+            # Run data tests
+            print(f"\n2. Running LookML tests...")
+            data_tests = self.run_data_tests_validation(project_name)
+            self.test_results['data_tests'] = data_tests
+        finally:
+            self.executor.shutdown(wait=True)
         
-        # Run data tests
-        print(f"\n2. Running LookML tests...")
-        data_tests = self.run_data_tests_validation(project_name)
-        self.test_results['data_tests'] = data_tests
+        self.test_results['summary']['metadata_requests'] = len(self.metadata_cache)
+        self.test_results['summary']['metadata_cache_hits'] = self.metadata_cache_hits
         
         # Generate summary
         self.generate_summary(model_validation, data_tests)
@@ -425,12 +487,13 @@ def main():
     parser.add_argument('--project-name', required=True, help='Name of the LookML project to test')
     parser.add_argument('--config-file', default='looker.ini', help='Looker configuration file')
     parser.add_argument('--output-file', default='data_tests_results.json', help='Output file for results')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent model/explore metadata requests (default: 8)')
     
     args = parser.parse_args()
     
     print(f"Starting LookML data tests for project: {args.project_name}")
     
-    runner = LookerDataTestRunner(args.config_file)
+    runner = LookerDataTestRunner(args.config_file, max_workers=args.workers)
     success = runner.run_tests(args.project_name)
     runner.save_results(args.output_file)
     
@@ -4,24 +4,392 @@ Custom LookML Linter
 Enforces coding standards and best practices
 """
 
+import itertools
 import json
 import sys
 import argparse
+import bisect
+import contextlib
+import multiprocessing
 import os
 import re
+import subprocess
 import yaml
-from typing import Dict, List, Any, Tuple
-from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from lookml_cache import cached_findings, content_digest, default_cache, fingerprint
+from lookml_parser import PARSER_VERSION, Node, ParsedFile, parse_file, prefetch_parsed
+
+
+LINTABLE_EXTENSIONS = ('.lookml', '.lkml', '.model', '.view', '.explore', '.dashboard')
+
+# Below this many files per worker, process start-up costs more than it saves
+MIN_FILES_PER_JOB = 8
+
+# Node types whose names must be snake_case
+SNAKE_CASE_TYPES = {'view', 'dimension', 'measure'}
+
+PII_NAME_PATTERN = r'email|ssn|phone|address|first_name|last_name|full_name'
+SECRET_PATTERN = r'(?:password|secret|key)\s*[=:]\s*["\'][^"\']+["\']'
+
+
+HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def changed_line_ranges(diff_base: str, file_paths: List[str]) -> Optional[Dict[str, List[Tuple[int, int]]]]:
+    """
+    Changed (first, last) line ranges per file in the working tree relative to
+    diff_base, keyed by real path, from `git diff --unified=0`. Tracked files
+    without changes map to an empty list; files missing from the result are not
+    tracked (e.g. untracked). Returns None when git cannot produce the diff.
+    """
+    if not file_paths:
+        return {}  # `git diff`/`git ls-files` without paths would cover the whole repository
+    try:
+        toplevel = subprocess.run(['git', 'rev-parse', '--show-toplevel'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        diff = subprocess.run(['git', 'diff', '--unified=0', '--no-color', '--no-ext-diff', diff_base, '--']
+                              + file_paths, capture_output=True, text=True, check=True).stdout
+        tracked = subprocess.run(['git', 'ls-files', '-z', '--'] + file_paths, capture_output=True,
+                                 text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠️ Could not diff against {diff_base} ({e}); linting whole files")
+        return None
+    
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith('diff --git '):
+            current = None
+        elif line.startswith('+++ '):
+            target = line[4:]
+            current = None if target == '/dev/null' else os.path.realpath(os.path.join(toplevel, target[2:]))
+            if current:
+                ranges.setdefault(current, [])
+        elif current and line.startswith('@@'):
+            m = HUNK_RE.match(line)
+            if not m:
+                continue
+            first = int(m.group(1))
+            count = int(m.group(2)) if m.group(2) is not None else 1
+            if count == 0:
+                # Pure deletion after line `first`: touch the lines on both sides of the gap
+                ranges[current].append((max(1, first), first + 1))
+            else:
+                ranges[current].append((first, first + count - 1))
+    
+    # Tracked files without hunks are unchanged
+    for path in tracked.split('\0'):
+        if path:
+            ranges.setdefault(os.path.realpath(path), [])
+    return ranges
+
+
+class ChangedRegions:
+    """
+    Changed line ranges of one file mapped onto its block tree. A block is
+    touched when a changed line falls inside it but outside all of its child
+    blocks, so editing one dimension touches that dimension, not its view.
+    Touched blocks are always re-linted in diff mode.
+    """
+    
+    def __init__(self, parsed: ParsedFile, line_ranges: List[Tuple[int, int]]):
+        self.parsed = parsed
+        self.text_length = len(parsed.text)
+        line_count = len(parsed.line_starts)
+        self.ranges: List[Tuple[int, int]] = []  # sorted, [start, end) character offsets
+        for first, last in sorted(line_ranges):
+            start = parsed.offset_of(first)
+            end = parsed.offset_of(last + 1) if last < line_count else self.text_length
+            self.ranges.append((start, max(end, start + 1)))
+        self.range_ends = [end for _, end in self.ranges]
+    
+    def touches(self, node: Node) -> bool:
+        node_end = node.end if node.end >= 0 else self.text_length
+        i = bisect.bisect_right(self.range_ends, node.start)
+        while i < len(self.ranges) and self.ranges[i][0] < node_end:
+            start = max(self.ranges[i][0], node.start)
+            end = min(self.ranges[i][1], node_end)
+            if not self._covered_by_children(start, end, node.children):
+                return True
+            i += 1
+        return False
+    
+    @staticmethod
+    def _covered_by_children(start: int, end: int, children: List[Node]) -> bool:
+        pos = start
+        for child in children:
+            if child.end <= pos:
+                continue
+            if child.start > pos:
+                return False
+            pos = child.end
+            if pos >= end:
+                return True
+        return pos >= end
+
+
+
+def block_key(parsed: ParsedFile, node: Node) -> str:
+    """Content hash of a block: its type and its full text, nested blocks included"""
+    end = node.end if node.end >= 0 else len(parsed.text)
+    return content_digest(f"{node.type}\0{parsed.text[node.start:end]}".encode('utf-8'))
+
+
+class LintContext:
+    """Per-file state shared by the rules while the tree is visited"""
+    
+    def __init__(self, file_path: str, parsed: ParsedFile):
+        self.file_path = file_path
+        self.parsed = parsed
+        self.text = parsed.text
+        self.findings: List[Dict[str, Any]] = []
+        self.offsets: List[int] = []  # character offset of each finding
+        self.state: Dict[str, Any] = {}  # per-rule scratch space, keyed by rule name
+    
+    def report(self, rule: 'LintRule', offset: int, message: str) -> None:
+        self.add(offset, rule.severity, rule.name, message)
+    
+    def add(self, offset: int, severity: str, rule_name: str, message: str) -> None:
+        line, column = self.parsed.position(offset)
+        self.findings.append({
+            'file': self.file_path,
+            'line': line,
+            'column': column,
+            'severity': severity,
+            'rule': rule_name,
+            'message': message
+        })
+        self.offsets.append(offset)
+
+
+class LintRule:
+    """
+    A rule visited once per matching node. node_types limits the nodes it is
+    dispatched to (None = every node, including the file root); finish() runs
+    after the whole tree has been visited. What visit() reports must depend only
+    on the node's own text, so it can be cached per block. A rule that needs the
+    whole file sets file_scope, is visited on every node even when cached
+    findings are replayed, and reports only from finish().
+    """
+    
+    name = 'rule'
+    severity = 'warning'
+    node_types: Optional[Set[str]] = None
+    file_scope = False
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        pass
+    
+    def finish(self, ctx: LintContext) -> None:
+        pass
+
+
+class RequiredFieldsRule(LintRule):
+    name = 'mandatory_fields'
+    severity = 'error'
+    
+    def __init__(self, node_type: str, required_fields: List[str]):
+        self.node_types = {node_type}
+        self.required_fields = list(required_fields)
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        for required_field in self.required_fields:
+            if not node.has(required_field):
+                ctx.report(self, node.start, f"{node.type} '{node.name}' missing required field '{required_field}'")
+
+
+class SnakeCaseRule(LintRule):
+    name = 'snake_case'
+    node_types = SNAKE_CASE_TYPES
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        if node.name and node.name != node.name.lower():
+            ctx.report(self, node.start, f"{node.type} '{node.name}' should use snake_case naming")
+
+
+class BooleanPrefixRule(LintRule):
+    name = 'boolean_prefix'
+    node_types = {'dimension'}
+    
+    def __init__(self, boolean_prefixes: List[str]):
+        self.boolean_prefixes = list(boolean_prefixes)
+        self.prefix_tuple = tuple(boolean_prefixes)
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        if node.get('type') == 'yesno' and not (node.name or '').startswith(self.prefix_tuple):
+            ctx.report(self, node.start,
+                       f"Boolean dimension '{node.name}' should start with one of: {self.boolean_prefixes}")
+
+
+class SelectStarRule(LintRule):
+    name = 'select_star'
+    select_star_re = re.compile(r'SELECT\s+\*', re.IGNORECASE)
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        for param in node.params:
+            if param.kind != 'sql':
+                continue
+            match = self.select_star_re.search(ctx.text, param.start, param.end)
+            if match:
+                ctx.report(self, match.start(), "Avoid using SELECT * for performance reasons")
+
+
+class NestedQueryRule(LintRule):
+    name = 'nested_queries'
+    nested_query_re = re.compile(r'\(\s*SELECT', re.IGNORECASE)
+    
+    def __init__(self, max_nested: int):
+        self.max_nested = max_nested
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        for param in node.params:
+            if param.kind != 'sql':
+                continue
+            nested_count = sum(1 for _ in self.nested_query_re.finditer(ctx.text, param.start, param.end))
+            if nested_count > self.max_nested:
+                ctx.report(self, param.start, f"High nesting level ({nested_count}) may impact performance")
+
+
+class HardcodedSecretRule(LintRule):
+    name = 'hardcoded_secret'
+    severity = 'error'
+    secret_re = re.compile(SECRET_PATTERN, re.IGNORECASE)
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        for param in node.params:
+            match = self.secret_re.search(ctx.text, param.start, param.end)
+            if match:
+                ctx.report(self, match.start(), "Potential hardcoded secret detected")
+
+
+class PIIAccessFilterRule(LintRule):
+    """PII dimensions are reported unless an explore in the same file declares an access_filter"""
+    
+    name = 'pii_access_filter'
+    node_types = {'dimension', 'dimension_group', 'access_filter'}
+    file_scope = True
+    pii_re = re.compile(PII_NAME_PATTERN, re.IGNORECASE)
+    
+    def visit(self, ctx: LintContext, node: Node) -> None:
+        state = ctx.state.setdefault(self.name, {'protected': False, 'fields': []})
+        if node.type == 'access_filter':
+            state['protected'] = True
+        elif node.name and self.pii_re.search(node.name):
+            state['fields'].append(node)
+    
+    def finish(self, ctx: LintContext) -> None:
+        state = ctx.state.get(self.name)
+        if not state or state['protected']:
+            return
+        for node in state['fields']:
+            ctx.report(self, node.start, f"PII field '{node.name}' detected without access_filter protection")
+
+
+class RulePlan:
+    """
+    The rules from linting-rules.yaml compiled once per linter into a
+    node type -> rules dispatch table, so each file is visited once and every
+    rule only sees the constructs it describes
+    """
+    
+    def __init__(self, rules: Dict[str, Any]):
+        mandatory_rules = rules.get('mandatory_fields') or {}
+        naming_rules = rules.get('naming_conventions') or {}
+        perf_rules = rules.get('performance_rules') or {}
+        security_rules = rules.get('security_rules') or {}
+        
+        self.rules: List[LintRule] = []
+        for node_type, required_fields in mandatory_rules.items():
+            if required_fields:
+                self.rules.append(RequiredFieldsRule(node_type, required_fields))
+        if naming_rules.get('use_snake_case', False):
+            self.rules.append(SnakeCaseRule())
+        if naming_rules.get('boolean_prefixes'):
+            self.rules.append(BooleanPrefixRule(naming_rules['boolean_prefixes']))
+        if perf_rules.get('avoid_select_star', False):
+            self.rules.append(SelectStarRule())
+        self.rules.append(NestedQueryRule(perf_rules.get('limit_nested_queries', 3)))
+        if security_rules.get('no_hardcoded_secrets', False):
+            self.rules.append(HardcodedSecretRule())
+        if security_rules.get('require_access_filters_for_pii', True):
+            self.rules.append(PIIAccessFilterRule())
+        
+        self.any_node_rules = [rule for rule in self.rules if rule.node_types is None]
+        self.dispatch: Dict[str, List[LintRule]] = {}
+        for rule in self.rules:
+            for node_type in rule.node_types or ():
+                self.dispatch.setdefault(node_type, []).append(rule)
+    
+    def rules_for(self, node_type: str) -> List[LintRule]:
+        typed = self.dispatch.get(node_type)
+        if not typed:
+            return self.any_node_rules
+        return typed + self.any_node_rules
+    
+    def run(self, file_path: str, parsed: ParsedFile, blocks: Optional[Dict[str, List]] = None,
+            known_blocks: Optional[Dict[str, List]] = None,
+            regions: Optional[ChangedRegions] = None) -> List[Dict[str, Any]]:
+        """
+        Visit every node once and return findings by position. When `blocks`
+        is given it is filled with each block's content hash -> the findings of
+        its own visit, as [offset from block start, severity, rule, message].
+        A block found in known_blocks and not touched by regions is not
+        visited again: its stored findings are replayed at its new position,
+        so the result is the same as a full visit.
+        """
+        ctx = LintContext(file_path, parsed)
+        for node in itertools.chain([parsed.root], parsed.walk()):
+            key = None
+            if blocks is not None and node is not parsed.root:
+                key = block_key(parsed, node)
+            stored = None
+            if key is not None and known_blocks and not (regions and regions.touches(node)):
+                stored = known_blocks.get(key)
+            
+            mark = len(ctx.findings)
+            for rule in self.rules_for(node.type):
+                if stored is None or rule.file_scope:
+                    rule.visit(ctx, node)
+            if stored is not None:
+                for relative, severity, rule_name, message in stored:
+                    ctx.add(node.start + relative, severity, rule_name, message)
+            if key is not None:
+                blocks[key] = [[offset - node.start, f['severity'], f['rule'], f['message']]
+                               for f, offset in zip(ctx.findings[mark:], ctx.offsets[mark:])]
+        for rule in self.rules:
+            rule.finish(ctx)
+        ctx.findings.sort(key=lambda f: (f['line'], f['column']))
+        return ctx.findings
+
+
+def format_finding(finding: Dict[str, Any]) -> str:
+    return f"{finding['file']}:{finding['line']}:{finding['column']}: {finding['message']}"
+
+
+def split_findings(findings: List[Dict[str, Any]]) -> Dict[str, List]:
+    return {
+        'errors': [format_finding(f) for f in findings if f['severity'] == 'error'],
+        'warnings': [format_finding(f) for f in findings if f['severity'] == 'warning'],
+        'findings': findings
+    }
 
 
 class LookMLLinter:
-    def __init__(self, rules_file: str = '.github/config/linting-rules.yaml'):
+    def __init__(self, rules_file: str = '.github/config/linting-rules.yaml',
+                 changed_lines: Optional[Dict[str, List[Tuple[int, int]]]] = None):
         self.rules_file = rules_file
+        self.changed_lines = changed_lines  # real path -> changed line ranges; None = lint whole files
         self.rules = self.load_rules()
+        self.plan = RulePlan(self.rules)
+        self.cache = default_cache(PARSER_VERSION)
+        self.rules_fingerprint = self.compute_rules_fingerprint()
         self.results = {
             'errors': [],
             'warnings': [],
             'info': [],
+            'findings': [],  # structured errors/warnings: file, line, column, severity, rule, message
             'files_processed': []
         }
     
@@ -64,6 +432,12 @@ class LookMLLinter:
             print(f"❌ Error loading rules file: {e}")
             return default_rules
     
+    def compute_rules_fingerprint(self) -> str:
+        """Cached findings are only reused for the same rules and linter code"""
+        with open(__file__, 'rb') as f:
+            linter_digest = content_digest(f.read())
+        return fingerprint([self.rules, linter_digest])
+    
     def lint_file(self, file_path: str) -> None:
         """Lint a single LookML file"""
         if not os.path.exists(file_path):
@@ -73,115 +447,97 @@ class LookMLLinter:
         self.results['files_processed'].append(file_path)
         print(f"🔍 Linting file: {file_path}")
         
+        line_ranges = None
+        if self.changed_lines is not None:
+            line_ranges = self.changed_lines.get(os.path.realpath(file_path))
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            parsed = parse_file(file_path)
             
-            self.check_mandatory_fields(file_path, content)
-            self.check_naming_conventions(file_path, content)
-            self.check_performance_rules(file_path, content)
-            self.check_security_rules(file_path, content)
+            if line_ranges:
+                findings = self.run_incremental(file_path, parsed, line_ranges)
+            else:
+                # Unchanged relative to the diff base, untracked, or not in diff mode
+                findings = cached_findings(
+                    self.cache, f"lint:{self.rules_fingerprint}", parsed,
+                    lambda: self.run_checks(file_path, parsed)
+                )
+            self.results['errors'].extend(findings['errors'])
+            self.results['warnings'].extend(findings['warnings'])
+            self.results['findings'].extend(findings['findings'])
             
         except Exception as e:
             self.results['errors'].append(f"Error processing {file_path}: {e}")
     
-    def check_mandatory_fields(self, file_path: str, content: str) -> None:
-        """Check for mandatory fields in dimensions, measures, etc."""
-        mandatory_rules = self.rules.get('mandatory_fields', {})
-        
-        for block_type, required_fields in mandatory_rules.items():
-            # Find all blocks of this type
-            pattern = rf'{block_type}:\s*(\w+)\s*\{{([^{{}}]*(?:\{{[^{{}}]*\}}[^{{}}]*)*)\}}'
-            matches = re.finditer(pattern, content, re.DOTALL | re.MULTILINE)
-            
-            for match in matches:
-                block_name = match.group(1)
-                block_content = match.group(2)
-                
-                for required_field in required_fields:
-                    field_pattern = rf'{required_field}:\s*["\']?[^"\'\n]+["\']?'
-                    if not re.search(field_pattern, block_content):
-                        error_msg = f"{file_path}: {block_type} '{block_name}' missing required field '{required_field}'"
-                        self.results['errors'].append(error_msg)
-    
-    def check_naming_conventions(self, file_path: str, content: str) -> None:
-        """Check naming convention rules"""
-        naming_rules = self.rules.get('naming_conventions', {})
-        
-        if naming_rules.get('use_snake_case', False):
-            # Check for non-snake_case names
-            patterns = [
-                (r'dimension:\s*([a-zA-Z][a-zA-Z0-9]*[A-Z][a-zA-Z0-9]*)', 'dimension'),
-                (r'measure:\s*([a-zA-Z][a-zA-Z0-9]*[A-Z][a-zA-Z0-9]*)', 'measure'),
-                (r'view:\s*([a-zA-Z][a-zA-Z0-9]*[A-Z][a-zA-Z0-9]*)', 'view')
-            ]
-            
-            for pattern, element_type in patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    name = match.group(1)
-                    warning_msg = f"{file_path}: {element_type} '{name}' should use snake_case naming"
-                    self.results['warnings'].append(warning_msg)
-        
-        # Check boolean naming conventions
-        boolean_prefixes = naming_rules.get('boolean_prefixes', [])
-        if boolean_prefixes:
-            boolean_pattern = r'dimension:\s*(\w+)\s*\{[^}]*type:\s*yesno'
-            matches = re.finditer(boolean_pattern, content, re.DOTALL)
-            
-            for match in matches:
-                dim_name = match.group(1)
-                if not any(dim_name.startswith(prefix) for prefix in boolean_prefixes):
-                    warning_msg = f"{file_path}: Boolean dimension '{dim_name}' should start with one of: {boolean_prefixes}"
-                    self.results['warnings'].append(warning_msg)
-    
-    def check_performance_rules(self, file_path: str, content: str) -> None:
-        """Check performance-related rules"""
-        perf_rules = self.rules.get('performance_rules', {})
-        
-        if perf_rules.get('avoid_select_star', False):
-            if re.search(r'SELECT\s+\*', content, re.IGNORECASE):
-                warning_msg = f"{file_path}: Avoid using SELECT * for performance reasons"
-                self.results['warnings'].append(warning_msg)
-        
-        # Check for nested query depth
-        max_nested = perf_rules.get('limit_nested_queries', 3)
-        nested_count = len(re.findall(r'\(SELECT', content, re.IGNORECASE))
-        if nested_count > max_nested:
-            warning_msg = f"{file_path}: High nesting level ({nested_count}) may impact performance"
-            self.results['warnings'].append(warning_msg)
-    
-    def check_security_rules(self, file_path: str, content: str) -> None:
-        """Check security-related rules"""
-        security_rules = self.rules.get('security_rules', {})
-        
-        if security_rules.get('no_hardcoded_secrets', False):
-            # Look for potential hardcoded secrets
-            secret_patterns = [
-                r'password\s*[=:]\s*["\'][^"\']+["\']',
-                r'secret\s*[=:]\s*["\'][^"\']+["\']',
-                r'key\s*[=:]\s*["\'][^"\']+["\']'
-            ]
-            
-            for pattern in secret_patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    error_msg = f"{file_path}: Potential hardcoded secret detected"
-                    self.results['errors'].append(error_msg)
+    def blocks_key(self, parsed: ParsedFile) -> str:
+        """Cache key of the per-block findings last recorded for a file path"""
+        return content_digest(f"lint-blocks:{self.rules_fingerprint}\0{parsed.path}".encode('utf-8'))
+    
+    def run_checks(self, file_path: str, parsed: ParsedFile,
+                   regions: Optional[ChangedRegions] = None) -> Dict[str, List]:
+        """
+        Run every rule against one file and return only that file's findings.
+        With a cache, findings are also recorded per block (see RulePlan.run),
+        and blocks whose content matches the last recorded version of this
+        file and that regions does not touch reuse those findings.
+        """
+        if not self.cache:
+            return split_findings(self.plan.run(file_path, parsed))
+        known_blocks = None
+        if regions is not None:
+            entry = self.cache.load_entry('lint-blocks', self.blocks_key(parsed))
+            known_blocks = entry['value'] if entry else None
+        blocks: Dict[str, List] = {}
+        findings = self.plan.run(file_path, parsed, blocks, known_blocks, regions)
+        self.cache.store_entry('lint-blocks', self.blocks_key(parsed), blocks)
+        return split_findings(findings)
+    
+    def run_incremental(self, file_path: str, parsed: ParsedFile,
+                        line_ranges: List[Tuple[int, int]]) -> Dict[str, List]:
+        """
+        Findings of a file changed since the diff base, identical to a full
+        run: blocks touched by the changed lines are re-linted, and untouched
+        blocks replay the findings cached for their content.
+        """
+        return cached_findings(
+            self.cache, f"lint:{self.rules_fingerprint}", parsed,
+            lambda: self.run_checks(file_path, parsed, ChangedRegions(parsed, line_ranges))
+        )
+
+    def lint_files(self, file_paths: List[str], jobs: int = 1) -> None:
+        """
+        Lint files in order. With jobs > 1 the files are split into contiguous
+        shards linted by a process pool; shard results are merged in input
+        order, so linting_results.json is identical to a sequential run.
+        """
+        jobs = min(jobs, len(file_paths) // MIN_FILES_PER_JOB)
+        if jobs <= 1:
+            # Files are read ahead on threads while earlier ones are linted
+            prefetched = prefetch_parsed(file_paths)
+            for file_path in file_paths:
+                next(prefetched)
+                self.lint_file(file_path)
+            return
         
-        # Check for PII fields without access filters
-        pii_patterns = [
-            r'dimension:\s*\w*(email|ssn|phone|address)\w*',
-            r'dimension:\s*\w*(first_name|last_name|full_name)\w*'
-        ]
+        shard_count = jobs * 4  # smaller shards even out slow files
+        shard_size = -(-len(file_paths) // shard_count)
+        shards = [file_paths[i:i + shard_size] for i in range(0, len(file_paths), shard_size)]
+        print(f"Linting {len(file_paths)} files in {len(shards)} shards across {jobs} processes")
         
-        for pattern in pii_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                # Check if there's an access_filter in the same explore
-                if not re.search(r'access_filter:', content):
-                    warning_msg = f"{file_path}: PII field detected without access_filter protection"
-                    self.results['warnings'].append(warning_msg)
-    
+        # fork keeps this module importable in the workers when it is loaded by lookml-pipeline.py
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_init_worker,
+                                 initargs=(self.rules_file, self.changed_lines)) as pool:
+            for shard_results, cache_stats in pool.map(_lint_shard, shards):
+                for file_path in shard_results['files_processed']:
+                    print(f"🔍 Linting file: {file_path}")
+                for key, values in shard_results.items():
+                    self.results[key].extend(values)
+                if self.cache and cache_stats:
+                    self.cache.hits += cache_stats[0]
+                    self.cache.misses += cache_stats[1]
+
     def generate_summary(self) -> str:
         """Generate a summary of linting results"""
         total_files = len(self.results['files_processed'])
@@ -217,11 +573,39 @@ class LookMLLinter:
             print(f"❌ Failed to save results: {e}")
 
 
+# Per-process linter used by lint_files() workers
+_worker_linter: Optional[LookMLLinter] = None
+
+
+def _init_worker(rules_file: str, changed_lines: Optional[Dict[str, List[Tuple[int, int]]]]) -> None:
+    global _worker_linter
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _worker_linter = LookMLLinter(rules_file, changed_lines)
+
+
+def _lint_shard(file_paths: List[str]) -> Tuple[Dict[str, List], Optional[Tuple[int, int]]]:
+    """Lint one shard and return its results plus the parse cache hits/misses it caused"""
+    linter = _worker_linter
+    linter.results = {key: [] for key in linter.results}
+    cache_before = (linter.cache.hits, linter.cache.misses) if linter.cache else None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        linter.lint_files(file_paths)
+    cache_stats = None
+    if linter.cache:
+        cache_stats = (linter.cache.hits - cache_before[0], linter.cache.misses - cache_before[1])
+    return linter.results, cache_stats
+
+
 def main():
     parser = argparse.ArgumentParser(description='Lint LookML files for coding standards')
     parser.add_argument('--files', required=True, help='Space-separated list of files to lint')
     parser.add_argument('--rules-file', default='.github/config/linting-rules.yaml', help='Linting rules configuration file')
     parser.add_argument('--output-file', default='linting_results.json', help='Output file for results')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Lint files in this many processes (default: 1, 0 = one per CPU)')
+    parser.add_argument('--diff-base', default='',
+                        help='Git ref to diff against; only blocks touched by the changed lines are re-linted, '
+                             'findings of untouched blocks come from the cache')
     
     args = parser.parse_args()
     
@@ -229,13 +613,21 @@ def main():
     
     print(f"🚀 Starting LookML linting for {len(files_to_lint)} files")
     
-    linter = LookMLLinter(args.rules_file)
+    lintable = [f for f in files_to_lint if f.endswith(LINTABLE_EXTENSIONS) or f == 'manifest.lkml']
+    
+    changed_lines = None
+    if args.diff_base:
+        changed_lines = changed_line_ranges(args.diff_base, [f for f in lintable if os.path.exists(f)])
+        if changed_lines is not None:
+            hunks = sum(len(r) for r in changed_lines.values())
+            print(f"Incremental linting against {args.diff_base}: {hunks} changed hunk(s) in {len(changed_lines)} file(s)")
     
-    for file_path in files_to_lint:
-        if file_path.endswith(('.lookml', '.lkml', '.model', '.view', '.explore', '.dashboard')) or file_path == 'manifest.lkml':
-            linter.lint_file(file_path)
+    linter = LookMLLinter(args.rules_file, changed_lines)
+    linter.lint_files(lintable, jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1))
     
     print(linter.generate_summary())
+    if linter.cache:
+        print(linter.cache.summary())
     linter.save_results(args.output_file)
     
     # Exit with error code if there are errors
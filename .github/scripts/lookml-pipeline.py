@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+LookML Validation Pipeline Orchestrator
+Runs every validation and audit script in a single process, sharing one
+file discovery pass, one parsed project model and one authenticated Looker
+session. Each check still writes its usual JSON file, so report-generator.py
+and check-results.py work unchanged.
+
+Usage:
+  python lookml-pipeline.py --project-name="bi_sandbox" --files="views/a.view.lkml ..."
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Set
+
+from lookml_index import discover_project_files, project_index
+from lookml_parser import clear_memo
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Checks whose failure fails the pipeline (mirrors continue-on-error in the workflow)
+BLOCKING_CHECKS = {'syntax', 'linting', 'sql_execution'}
+
+ALL_CHECKS = [
+    'syntax',
+    'primary_keys',
+    'orphaned_views',
+    'joins',
+    'dashboard_queries',
+    'dashboard_filters',
+    'linting',
+    'sql_execution',
+    'data_tests',
+    'content',
+]
+
+API_CHECKS = {'syntax', 'sql_execution', 'data_tests', 'content'}
+
+# Result file of each model-scoped audit and its summary with no violations,
+# written (marked skipped) when the audit has no files in scope
+SCOPED_AUDIT_RESULTS = {
+    'lookml-audit.py': ('primary_key_results.json', {
+        'views_missing_primary_key': 0,
+        'total_views_checked': 0,
+        'missing_primary_keys': []
+    }),
+    'lookml-audit-join.py': ('join_relationship_results.json', {
+        'joins_with_invalid_relationship': 0,
+        'total_joins_checked': 0,
+        'violations': []
+    }),
+    'lookml-audit-cnt-query.py': ('query_limit_results.json', {
+        'dashboards_exceeding_query_limit': 0,
+        'total_dashboards_checked': 0,
+        'violations': [],
+        'estimated_distinct_queries': 0,
+        'tiles_on_fanout_joins': 0,
+        'dashboard_load': [],
+        'errors': []
+    }),
+    'lookml-audit-dashboard-filters.py': ('dashboard_filters_results.json', {
+        'dashboards_missing_filters': 0,
+        'total_dashboards_checked': 0,
+        'violations': []
+    }),
+}
+
+
+def load_script(filename: str):
+    """Import a hyphenated script from .github/scripts as a module"""
+    module_name = filename[:-3].replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def view_files(files: List[str], project_root: str) -> List[str]:
+    """Same selection as lookml-audit.py: view files under <root>/views/"""
+    views_dir = os.path.join(project_root, 'views') + os.sep
+    return [f for f in files if f.endswith(('.view.lkml', '.view')) and f.startswith(views_dir)]
+
+
+def explore_files(files: List[str]) -> List[str]:
+    """Same selection as lookml-audit-join.py: model/explore files"""
+    return [f for f in files
+            if f.endswith(('.model.lkml', '.explore.lkml')) or 'explore' in f.lower()]
+
+
+def dashboard_files(files: List[str]) -> List[str]:
+    """Dashboard files as discovered by the dashboard audits"""
+    selected = []
+    for f in files:
+        parent = os.path.basename(os.path.dirname(f))
+        if (f.endswith(('.dashboard.lookml', '.dashboard.lkml'))
+                or os.path.basename(f).startswith('dashboard')
+                or parent in ('dashboards', 'Dashboards')):
+            selected.append(f)
+    return selected
+
+
+def run_script_main(filename: str, argv: List[str]) -> int:
+    """Call a script's main() in-process with the given arguments; returns its exit code"""
+    module = load_script(filename)
+    saved_argv = sys.argv
+    sys.argv = [filename] + argv
+    try:
+        module.main()
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.argv = saved_argv
+
+
+class LookMLPipeline:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.project_root = args.project_root
+        self.changed_files = args.files.split() if args.files else []
+        self.project_files: List[str] = []
+        self.audit_files: List[str] = []  # project files loaded by some model (see scope_to_models)
+        self.client = None
+        self.index = None
+        self.results: Dict[str, Dict] = {}
+        self.skipped: Set[str] = set()  # checks with no files in scope
+        self.phases: Dict[str, float] = {}  # seconds per step of run(), checks included
+        self.current_phase = None
+
+    # ------------------------------------------------------------------
+    # Shared state
+    # ------------------------------------------------------------------
+
+    def api_client(self):
+        """One authenticated Looker client for every API check"""
+        if self.client is None:
+            from looker_api_client import DEFAULT_POOL_SIZE, LookerAPIClient
+            self.client = LookerAPIClient(self.args.config_file,
+                                          pool_size=max(DEFAULT_POOL_SIZE, self.args.sql_workers))
+        return self.client
+
+    # ------------------------------------------------------------------
+    # API checks
+    # ------------------------------------------------------------------
+
+    def prefetch_api(self, checks: List[str]) -> None:
+        """Log in once, then issue the independent read-only calls of all API checks concurrently"""
+        project = self.args.project_name
+        paths = []
+        if 'syntax' in checks:
+            paths += ['/projects', f'/projects/{project}/validate']
+        if 'sql_execution' in checks:
+            paths += ['/connections']
+        if 'data_tests' in checks:
+            paths += ['/user', '/lookml_models', f'/projects/{project}/validate', f'/projects/{project}/lookml_tests']
+        if 'content' in checks:
+            paths += ['/content_validation']
+
+        client = self.api_client()
+        if paths and client.authenticate():
+            start = time.perf_counter()
+            client.prefetch(paths)
+            print(f"Prefetched {len(set(paths))} Looker API endpoints concurrently in {time.perf_counter() - start:.2f}s")
+
+    def check_syntax(self) -> bool:
+        module = load_script('looker-validator.py')
+        validator = module.LookerValidator(self.args.config_file, client=self.api_client())
+        result = validator.validate_project(self.args.project_name)
+        validator.save_results('validation_results.json')
+        return result.get('success', False)
+
+    def check_sql_execution(self) -> bool:
+        module = load_script('sql-execution-validator.py')
+        validator = module.SQLExecutionValidator(self.args.config_file, client=self.api_client(),
+                                                 max_workers=self.args.sql_workers,
+                                                 validation_mode=self.args.sql_mode,
+                                                 estimate_bytes=self.args.sql_estimate_bytes,
+                                                 cache_ttl=self.args.sql_cache_ttl,
+                                                 max_rows=self.args.sql_max_rows)
+        success = validator.run_sql_execution_tests(self.changed_files)
+        validator.print_summary()
+        validator.save_results('sql_validation_results.json')
+        return success
+
+    def check_data_tests(self) -> bool:
+        module = load_script('lookml-data-tests.py')
+        runner = module.LookerDataTestRunner(self.args.config_file, client=self.api_client())
+        success = runner.run_tests(self.args.project_name)
+        runner.save_results('data_tests_results.json')
+        return success
+
+    def check_content(self) -> bool:
+        module = load_script('lookml-content-validator.py')
+        validator = module.LookerContentValidator(self.args.config_file, client=self.api_client())
+        success = validator.run_content_validation(self.args.folder_name)
+        validator.print_summary()
+        validator.save_results('content_validation_results.json')
+        return success
+
+    # ------------------------------------------------------------------
+    # Local audits (run through each script's own main())
+    # ------------------------------------------------------------------
+
+    def run_scoped_audit(self, name: str, script: str, files: List[str]) -> bool:
+        """
+        Run an audit script on its model-scoped files. With none in scope the
+        check is skipped (without --files the script would audit the whole
+        project) and an empty result file marked as skipped is written instead,
+        so no stale results from an earlier run are reported.
+        """
+        if not files:
+            print(f"No files in scope for {script}; skipping")
+            output_file, summary = SCOPED_AUDIT_RESULTS[script]
+            with open(output_file, 'w') as f:
+                json.dump(dict(summary, skipped=True), f, indent=2)
+            self.skipped.add(name)
+            return True
+        return run_script_main(script, ['--project-name', self.project_root, '--files', ' '.join(files)]) == 0
+
+    def check_primary_keys(self) -> bool:
+        return self.run_scoped_audit('primary_keys', 'lookml-audit.py',
+                                     view_files(self.audit_files, self.project_root))
+
+    def check_orphaned_views(self) -> bool:
+        return run_script_main('lookml-audit-explore.py', [
+            '--files', ' '.join(self.audit_files),
+            '--project-root', self.project_root
+        ]) == 0
+
+    def check_joins(self) -> bool:
+        return self.run_scoped_audit('joins', 'lookml-audit-join.py', explore_files(self.audit_files))
+
+    def check_dashboard_queries(self) -> bool:
+        return self.run_scoped_audit('dashboard_queries', 'lookml-audit-cnt-query.py',
+                                     dashboard_files(self.audit_files))
+
+    def check_dashboard_filters(self) -> bool:
+        return self.run_scoped_audit('dashboard_filters', 'lookml-audit-dashboard-filters.py',
+                                     dashboard_files(self.audit_files))
+
+    def check_linting(self) -> bool:
+        return run_script_main('lookml-linter.py', [
+            '--files', ' '.join(self.changed_files),
+            '--rules-file', self.args.rules_file,
+            '--jobs', str(self.args.lint_jobs),
+            '--diff-base', self.args.lint_diff_base
+        ]) == 0
+
+    # ------------------------------------------------------------------
+
+    def scope_to_models(self, files: List[str]) -> List[str]:
+        """Drop files no model includes (directly or transitively), printing per-model file counts"""
+        for line in self.index.model_report():
+            print(line)
+        if self.args.include_unreachable:
+            return list(files)
+        scoped = [f for f in files if self.index.is_reachable(f)]
+        skipped = sorted(set(files) - set(scoped))
+        if skipped:
+            print(f"Skipping {len(skipped)} file(s) not loaded by any model in the audits:")
+            for f in skipped:
+                print(f"  {f}")
+        return scoped
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time one step of run() into self.phases; current_phase names the step in progress"""
+        self.current_phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+            self.current_phase = None
+
+    def run(self, checks: List[str]) -> bool:
+        start = time.perf_counter()
+        with self.phase('discover'):
+            self.project_files = discover_project_files(self.project_root)
+            print(f"Discovered {len(self.project_files)} LookML files under '{self.project_root}'")
+        with self.phase('index'):
+            self.index = project_index(self.project_root, files=self.project_files)
+            self.audit_files = self.scope_to_models(self.project_files)
+            print(self.index.summary())
+            for key, reason in self.index.failures().items():
+                print(f"::warning file={key},title=Unindexed LookML File::{reason}")
+
+        if any(name in API_CHECKS for name in checks):
+            with self.phase('prefetch'):
+                self.prefetch_api(checks)
+
+        for name in checks:
+            print(f"\n{'#' * 70}")
+            print(f"# Check: {name}")
+            print(f"{'#' * 70}")
+            with self.phase(name):
+                try:
+                    passed = getattr(self, f'check_{name}')()
+                except Exception as e:
+                    print(f"Check '{name}' crashed: {e}")
+                    passed = False
+            self.results[name] = {
+                'passed': bool(passed),
+                'blocking': name in BLOCKING_CHECKS,
+                'skipped': name in self.skipped,
+                'seconds': self.phases[name]
+            }
+
+        with self.phase('save'):
+            self.index.save()
+        clear_memo()  # the parsed trees are not needed once every check has run
+        self.print_summary(time.perf_counter() - start)
+        return all(r['passed'] for name, r in self.results.items() if r['blocking'])
+
+    def print_summary(self, total_seconds: float) -> None:
+        print(f"\n{'=' * 70}")
+        print("LOOKML PIPELINE SUMMARY")
+        print(f"{'=' * 70}")
+        for name, result in self.results.items():
+            if result['skipped']:
+                status = 'SKIP'
+            else:
+                status = 'PASS' if result['passed'] else ('FAIL' if result['blocking'] else 'WARN')
+            print(f"  {status:<5} {name:<20} {result['seconds']:7.2f}s")
+        print(f"Total: {total_seconds:.2f}s")
+        if any(name in API_CHECKS for name in self.results):
+            from looker_rate_limiter import shared_limiter
+            print(shared_limiter().summary())
+            latency = self.api_client().latency_summary()
+            if latency['requests']:
+                print(f"API latency: {latency['requests']} request(s), median {latency['median_seconds']:.2f}s, "
+                      f"p95 {latency['p95_seconds']:.2f}s, max {latency['max_seconds']:.2f}s")
+                for endpoint in latency['slowest_endpoints']:
+                    print(f"  {endpoint['max_seconds']:6.2f}s  {endpoint['endpoint']} (x{endpoint['calls']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run all LookML validation checks in one process')
+    parser.add_argument('--project-name', required=True, help='Looker project name (for API checks)')
+    parser.add_argument('--project-root', default='.', help='Project root directory (default: current directory)')
+    parser.add_argument('--files', default='', help='Space-separated list of changed files (linting and SQL checks)')
+    parser.add_argument('--folder-name', default='BI Sandbox', help='Folder name for content validation')
+    parser.add_argument('--config-file', default='looker.ini', help='Looker configuration file')
+    parser.add_argument('--sql-workers', type=int, default=4, help='Maximum SQL Runner queries in flight (default: 4)')
+    parser.add_argument('--sql-mode', choices=['execute', 'plan'], default='execute',
+                        help="SQL validation mode: 'execute' runs queries in full, 'plan' only compiles them (default: execute)")
+    parser.add_argument('--sql-estimate-bytes', action='store_true', help='Report estimated bytes scanned per SQL query')
+    parser.add_argument('--sql-max-rows', type=int, default=1000, help='Stop reading each SQL result after this many rows (default: 1000)')
+    parser.add_argument('--sql-cache-ttl', type=float, default=6 * 3600,
+                        help='Seconds to reuse cached outcomes of identical SQL (default: 21600, 0 = off)')
+    parser.add_argument('--rules-file', default='.github/config/linting-rules.yaml', help='Linting rules configuration file')
+    parser.add_argument('--lint-jobs', type=int, default=1, help='Processes used for linting (default: 1, 0 = one per CPU)')
+    parser.add_argument('--lint-diff-base', default='',
+                        help='Git ref to diff against; only lint blocks touched by the diff, reusing cached '
+                             'findings for the rest (same output as a full lint)')
+    parser.add_argument('--include-unreachable', action='store_true',
+                        help='Also audit files that no model includes (default: audits only see files reachable from a model)')
+    parser.add_argument('--checks', help=f"Comma-separated subset of checks to run (default: all). Available: {', '.join(ALL_CHECKS)}")
+    parser.add_argument('--skip-api', action='store_true', help='Only run checks that do not call the Looker API')
+
+    args = parser.parse_args()
+
+    checks = ALL_CHECKS
+    if args.checks:
+        checks = [c.strip() for c in args.checks.split(',') if c.strip()]
+        unknown = [c for c in checks if c not in ALL_CHECKS]
+        if unknown:
+            parser.error(f"unknown check(s): {', '.join(unknown)}")
+    if args.skip_api:
+        checks = [c for c in checks if c not in API_CHECKS]
+
+    pipeline = LookMLPipeline(args)
+    success = pipeline.run(checks)
+
+    if success:
+        print("All blocking checks passed!")
+        sys.exit(0)
+    else:
+        print("One or more blocking checks failed!")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
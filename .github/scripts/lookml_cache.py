@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Persistent LookML Parse Cache
+Content-addressed on-disk cache (sha256 of file bytes) for parse trees and
+per-rule findings, so unchanged files cost only a read and a hash. Also holds
+time-limited entries such as SQL execution outcomes
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, List, Optional
+
+
+CACHE_DIR_ENV = 'LOOKML_CACHE_DIR'
+
+
+def content_digest(data: bytes) -> str:
+    """Return the cache key for a file's raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint(obj: Any) -> str:
+    """Stable short hash of a JSON-serializable config (e.g. linting rules)"""
+    payload = json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class ParseCache:
+    """Stores pickled parse trees and JSON findings under a cache directory"""
+
+    def __init__(self, cache_dir: str, version: str):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind: str, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, self.version, kind, key[:2], f"{key}.{ext}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_tree(self, digest: str) -> Optional[Any]:
+        """Return the cached parse result for a content digest, or None"""
+        path = self._path('trees', digest, 'pkl')
+        try:
+            with open(path, 'rb') as f:
+                tree = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Corrupt or written by an incompatible version: drop it and re-parse
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        self.hits += 1
+        return tree
+
+    def store_tree(self, digest: str, tree: Any) -> None:
+        self._write(self._path('trees', digest, 'pkl'), pickle.dumps(tree, pickle.HIGHEST_PROTOCOL))
+
+    def _findings_key(self, rule: str, file_path: str, digest: str) -> str:
+        return content_digest(f"{rule}\0{file_path}\0{digest}".encode('utf-8'))
+
+    def load_findings(self, rule: str, file_path: str, digest: str) -> Optional[Any]:
+        """Return cached findings of `rule` for this exact file content, or None"""
+        path = self._path('findings', self._findings_key(rule, file_path, digest), 'json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_findings(self, rule: str, file_path: str, digest: str, findings: Any) -> None:
+        path = self._path('findings', self._findings_key(rule, file_path, digest), 'json')
+        self._write(path, json.dumps(findings).encode('utf-8'))
+
+    def load_entry(self, kind: str, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Return a JSON entry stored under `kind`, or None if missing or older than ttl seconds"""
+        path = self._path(kind, key, 'json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if ttl is not None and time.time() - entry.get('stored_at', 0) > ttl:
+            return None
+        return entry
+
+    def store_entry(self, kind: str, key: str, value: Any) -> None:
+        entry = {'stored_at': time.time(), 'value': value}
+        self._write(self._path(kind, key, 'json'), json.dumps(entry, default=str).encode('utf-8'))
+
+    def summary(self) -> str:
+        return f"Parse cache ({self.cache_dir}): {self.hits} hit(s), {self.misses} miss(es)"
+
+
+_default_caches = {}
+
+
+def default_cache(version: str) -> Optional[ParseCache]:
+    """Cache configured through $LOOKML_CACHE_DIR, or None when caching is off"""
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    key = (cache_dir, version)
+    if key not in _default_caches:
+        _default_caches[key] = ParseCache(cache_dir, version)
+    return _default_caches[key]
+
+
+def cached_findings(cache: Optional[ParseCache], rule: str, parsed: Any, compute) -> List[Any]:
+    """Return findings for a parsed file, reusing the cache when content is unchanged"""
+    digest = getattr(parsed, 'digest', None)
+    if cache is None or digest is None:
+        return compute()
+    findings = cache.load_findings(rule, parsed.path, digest)
+    if findings is None:
+        findings = compute()
+        cache.store_findings(rule, parsed.path, digest, findings)
+    return findings
@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Project Symbol Index
+One table of every view (file/line/fields), field, explore (base view, joins,
+model, connection) and model (connection, reachable files) in a LookML project,
+built from the shared parser and queried by the audits with dictionary lookups.
+Includes are resolved transitively from each model, across wildcards and
+`//project` includes of local_dependency/remote_dependency projects checked out
+under imported_projects/ or a directory on $LOOKML_DEPENDENCY_PATH.
+Per-file entries are persisted in $LOOKML_CACHE_DIR and reused while the file's
+size/mtime or content hash is unchanged, so later runs only re-index edits.
+"""
+
+import argparse
+import os
+import posixpath
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from lookml_cache import content_digest, default_cache
+from lookml_parser import PARSER_VERSION, ParsedFile, map_file, parse_file, read_files
+
+
+# Bump whenever the entry layout changes
+INDEX_VERSION = f'index-1-{PARSER_VERSION}'
+
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.lookml-cache'}
+
+FIELD_TYPES = ('dimension', 'dimension_group', 'measure', 'filter', 'parameter')
+
+LOOKML_EXTENSIONS = ('.lkml', '.lookml')
+
+# Where Looker's IDE places dependency projects inside a project
+IMPORTED_PROJECTS_DIR = 'imported_projects'
+
+
+class IgnoreRules:
+    """
+    Patterns from one .gitignore: globs with `*`, `?`, `[...]` and `**`,
+    `/`-anchored paths, trailing `/` for directories only and `!` negation
+    """
+
+    def __init__(self, base: str, lines: List[str]):
+        self.base = base  # directory of the .gitignore, relative to the walk root ('' or 'dir/')
+        self.rules = []
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            line = line.replace('\\', '')
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line  # a leading or inner '/' anchors to the .gitignore's directory
+            line = line.lstrip('/')
+            self.rules.append((self._regex(line, anchored), negate, dir_only))
+
+    @staticmethod
+    def _regex(pattern: str, anchored: bool) -> re.Pattern:
+        out = [] if anchored else ['(?:.*/)?']
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                out.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                out.append('[^/]')
+                i += 1
+            elif pattern[i] == '[' and ']' in pattern[i + 1:]:
+                end = pattern.index(']', i + 1)
+                body = pattern[i + 1:end]
+                out.append('[' + ('^' + body[1:] if body.startswith('!') else body) + ']')
+                i = end + 1
+            else:
+                out.append(re.escape(pattern[i]))
+                i += 1
+        return re.compile(''.join(out) + r'\Z')
+
+    def match(self, relpath: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a `!` rule, None if no rule applies"""
+        if not relpath.startswith(self.base):
+            return None
+        local = relpath[len(self.base):]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if (is_dir or not dir_only) and regex.match(local):
+                result = not negate
+        return result
+
+
+def load_ignore_rules(dirpath: str, base: str) -> Optional[IgnoreRules]:
+    try:
+        with open(os.path.join(dirpath, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+            return IgnoreRules(base, f.readlines())
+    except OSError:
+        return None
+
+
+def is_ignored(rules: List[IgnoreRules], relpath: str, is_dir: bool) -> bool:
+    """Deeper .gitignore files and later lines override earlier ones, as in git"""
+    ignored = False
+    for ruleset in rules:
+        result = ruleset.match(relpath, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+def discover_project_files(project_root: str, extensions: tuple = LOOKML_EXTENSIONS) -> List[str]:
+    """
+    Single os.scandir walk of the project returning every LookML file, sorted.
+    Skips SKIP_DIRS, imported dependency projects and whatever the project's
+    .gitignore files exclude.
+    """
+    found = []
+    stack = [(project_root, '', [])]
+    while stack:
+        dirpath, base, rules = stack.pop()
+        ignore = load_ignore_rules(dirpath, base)
+        if ignore:
+            rules = rules + [ignore]
+        try:
+            with os.scandir(dirpath) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+        for entry in entries:
+            relpath = base + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIRS or entry.name == IMPORTED_PROJECTS_DIR:
+                    continue
+                if not is_ignored(rules, relpath, True):
+                    stack.append((os.path.join(dirpath, entry.name), relpath + '/', rules))
+            elif entry.name.endswith(extensions) and not is_ignored(rules, relpath, False):
+                found.append(os.path.join(dirpath, entry.name))
+    return sorted(found)
+
+
+def model_name(path: str) -> Optional[str]:
+    base = os.path.basename(path)
+    for suffix in ('.model.lkml', '.model'):
+        if base.endswith(suffix):
+            return base[:-len(suffix)]
+    return None
+
+
+def include_regex(pattern: str) -> re.Pattern:
+    """
+    Regex for a local include: pattern relative to the project root. `*` stays
+    within a directory, `**/` spans directories, and a pattern without a LookML
+    extension also matches the file with `.lkml`/`.lookml` appended.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    suffix = '' if pattern.endswith(LOOKML_EXTENSIONS) else r'(?:\.lkml|\.lookml)?'
+    return re.compile(''.join(out) + suffix + r'\Z')
+
+
+def extract_symbols(parsed: ParsedFile) -> Dict[str, Any]:
+    """Per-file index entry: the symbols declared in one parsed file"""
+    views = []
+    for view in parsed.views:
+        fields = []
+        for node in view.children:
+            if node.type in FIELD_TYPES and node.name:
+                fields.append({'name': node.name, 'kind': node.type, 'type': node.get('type'),
+                               'line': parsed.line_of(node.start)})
+        views.append({
+            'name': view.name,
+            'line': parsed.line_of(view.start),
+            'derived_table': view.first('derived_table') is not None,
+            'sql_table_name': view.get('sql_table_name'),
+            'extends': [item for p in view.all('extends') for item in p.items],
+            'fields': fields
+        })
+
+    explores = []
+    for explore in parsed.explores:
+        explicit_view = explore.get('from') or explore.get('view_name')
+        joins = []
+        for join in explore.blocks('join'):
+            relationship = join.get('relationship')
+            joins.append({
+                'name': join.name,
+                'view': join.get('from') or join.name,  # a join's from: names the real view
+                'relationship': relationship.lower() if relationship else None,
+                'line': parsed.line_of(join.start)
+            })
+        explores.append({
+            'name': explore.name,
+            'line': parsed.line_of(explore.start),
+            'explicit_view': explicit_view,
+            'base_view': explicit_view or explore.name,
+            'joins': joins
+        })
+
+    return {
+        'views': views,
+        'explores': explores,
+        'includes': [p.value for p in parsed.all('include')],
+        'connection': parsed.get('connection'),
+        'errors': list(parsed.errors)
+    }
+
+
+def failed_entry(error: Exception) -> Dict[str, Any]:
+    """Entry for a file that could not be read or parsed: no symbols, just the reason"""
+    reason = f"{type(error).__name__}: {error}"
+    return {'views': [], 'explores': [], 'includes': [], 'connection': None,
+            'errors': [reason], 'failed': reason}
+
+
+class ProjectIndex:
+    """
+    Symbol table for one project root. File paths are stored relative to it;
+    files of dependency projects are stored as `//project/path`, the form
+    includes use for them.
+    """
+
+    def __init__(self, project_root: str = '.'):
+        self.project_root = os.path.abspath(project_root)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.cache = default_cache(INDEX_VERSION)
+        self.cache_key = content_digest(self.project_root.encode('utf-8'))
+        self.persisted: Dict[str, Dict[str, Any]] = {}
+        if self.cache:
+            stored = self.cache.load_entry('index', self.cache_key)
+            if stored:
+                self.persisted = stored['value'].get('entries', {})
+        self.changed = False
+        self.discovered = False  # every file under the root has been added
+        self.reused = 0
+        self.indexed = 0
+        self._maps: Optional[Dict[str, Dict]] = None
+        self._dependency_files: Dict[str, Optional[List[str]]] = {}
+        self._include_matches: Dict[str, List[str]] = {}
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def relpath(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.project_root).replace(os.sep, '/')
+
+    def add_files(self, paths: List[str]) -> None:
+        """
+        Index files; those whose size/mtime changed are read ahead on reader
+        threads. A file that can't be read or parsed gets a failed entry (see
+        failures()) and the rest are still indexed.
+        """
+        changed = []
+        for path in paths:
+            key = self.relpath(path)
+            if key in self.entries:
+                continue
+            previous = self.persisted.get(key)
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if previous and st and previous.get('stamp') == [st.st_mtime_ns, st.st_size]:
+                self.file_symbols(path, key)
+            else:
+                changed.append((path, key))
+
+        for (path, key), (_, source) in zip(changed, read_files([path for path, _ in changed])):
+            if isinstance(source, OSError):
+                self.entries[key] = failed_entry(source)
+            else:
+                self.entries[key] = self._load_entry(path, key, source)
+            self._maps = None
+
+    def discover(self) -> None:
+        """Index every LookML file under the root (once)"""
+        if not self.discovered:
+            self.add_files(discover_project_files(self.project_root))
+            self.discovered = True
+
+    def file_symbols(self, path: str, key: Optional[str] = None) -> Dict[str, Any]:
+        """Index entry for a file, indexing it on first use; check entry['failed'] for unreadable files"""
+        key = key or self.relpath(path)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self._load_entry(path, key)
+            self.entries[key] = entry
+            self._maps = None
+        return entry
+
+    def _load_entry(self, path: str, key: str,
+                    source: Optional[Tuple[os.stat_result, bytes]] = None) -> Dict[str, Any]:
+        try:
+            st = source[0] if source else os.stat(path)
+            stamp = [st.st_mtime_ns, st.st_size]
+            previous = self.persisted.get(key)
+            if previous and previous.get('stamp') == stamp:
+                self.reused += 1
+                return previous
+
+            if source:
+                digest = content_digest(source[1])
+            else:
+                with map_file(path) as data:
+                    digest = content_digest(data)
+            if previous and previous.get('digest') == digest:
+                # Same content with a new mtime (e.g. a fresh checkout)
+                previous['stamp'] = stamp
+                self.reused += 1
+                self.changed = True
+                return previous
+
+            entry = extract_symbols(parse_file(path, source=source))
+        except Exception as e:  # unreadable, not UTF-8, ...: only this file is affected
+            return failed_entry(e)
+        entry['stamp'] = stamp
+        entry['digest'] = digest
+        self.indexed += 1
+        self.changed = True
+        return entry
+
+    def save(self) -> None:
+        """Persist the entries indexed so far (no-op without $LOOKML_CACHE_DIR or changes)"""
+        if not self.cache or not self.changed:
+            return
+        # After a full discovery, entries of deleted files are dropped;
+        # failed files are retried on the next run
+        merged = {} if self.discovered else dict(self.persisted)
+        merged.update((key, entry) for key, entry in self.entries.items() if not entry.get('failed'))
+        self.cache.store_entry('index', self.cache_key, {'entries': merged})
+        self.persisted = merged
+        self.changed = False
+
+    def summary(self) -> str:
+        failed = len(self.failures())
+        return (f"Symbol index: {len(self.entries)} file(s), {self.indexed} indexed, {self.reused} reused"
+                + (f", {failed} unreadable" if failed else ''))
+
+    def failures(self) -> Dict[str, str]:
+        """Files that could not be indexed, keyed like entries, with the reason"""
+        return {key: entry['failed'] for key, entry in sorted(self.entries.items()) if entry.get('failed')}
+
+    # ------------------------------------------------------------------
+    # Include resolution
+    # ------------------------------------------------------------------
+
+    def dependency_dir(self, project: str) -> Optional[str]:
+        search = [os.path.join(self.project_root, IMPORTED_PROJECTS_DIR)]
+        search += [d for d in os.environ.get('LOOKML_DEPENDENCY_PATH', '').split(os.pathsep) if d]
+        for base in search:
+            candidate = os.path.join(base, project)
+            if os.path.isdir(candidate):
+                return candidate
+        return None
+
+    def dependency_files(self, project: str) -> Optional[List[str]]:
+        """Keys of a dependency project's files, indexing them; None when it is not checked out"""
+        if project not in self._dependency_files:
+            root = self.dependency_dir(project)
+            keys = None
+            if root:
+                keys = []
+                for path in discover_project_files(root):
+                    key = f"//{project}/" + os.path.relpath(path, root).replace(os.sep, '/')
+                    self.file_symbols(path, key)
+                    keys.append(key)
+            self._dependency_files[project] = keys
+        return self._dependency_files[project]
+
+    def resolve_include(self, pattern: str, from_key: str) -> Optional[List[str]]:
+        """
+        Keys of the files an include in from_key matches. Absolute patterns
+        resolve against the including file's own project, relative ones
+        against its directory; None when the pattern names a dependency that
+        is not checked out.
+        """
+        if pattern.startswith('//'):
+            project, _, local = pattern[2:].partition('/')
+        elif from_key.startswith('//'):
+            project, _, rest = from_key[2:].partition('/')
+            local = pattern[1:] if pattern.startswith('/') else posixpath.join(posixpath.dirname(rest), pattern)
+        else:
+            project = None
+            local = pattern[1:] if pattern.startswith('/') else posixpath.join(posixpath.dirname(from_key), pattern)
+
+        if project is None:
+            candidates = [key for key in self.entries if not key.startswith('//')]
+            full = posixpath.normpath(local)
+        else:
+            candidates = self.dependency_files(project)
+            if candidates is None:
+                return None
+            full = f"//{project}/" + posixpath.normpath(local)
+
+        matches = self._include_matches.get(full)
+        if matches is None:
+            regex = include_regex(full)
+            matches = self._include_matches[full] = sorted(key for key in candidates if regex.match(key))
+        return matches
+
+    def reachable(self, model_key: str) -> Dict[str, List]:
+        """Files transitively included from a model file, and includes that resolved to nothing"""
+        seen = {model_key}
+        queue = [model_key]
+        unresolved = []
+        while queue:
+            key = queue.pop()
+            for pattern in self.entries[key]['includes']:
+                matches = self.resolve_include(pattern, key)
+                if not matches:
+                    unresolved.append({'file': key, 'include': pattern,
+                                       'reason': 'dependency not checked out' if matches is None else 'no match'})
+                    continue
+                for match in matches:
+                    if match not in seen:
+                        seen.add(match)
+                        queue.append(match)
+        return {'files': sorted(seen), 'unresolved': unresolved}
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def maps(self) -> Dict[str, Dict]:
+        """Global lookup tables over every indexed file, rebuilt only after new files are added"""
+        if self._maps is not None:
+            return self._maps
+        self.discover()
+        for key in list(self.entries):
+            if model_name(key) and not key.startswith('//'):
+                self.reachable(key)  # index the dependency files models include
+
+        views: Dict[str, Dict] = {}
+        fields: Dict[str, Dict] = {}
+        field_views: Dict[str, List[str]] = {}
+        explores: Dict[str, Dict] = {}
+        models: Dict[str, Dict] = {}
+        for path in sorted(self.entries):
+            entry = self.entries[path]
+            for view in entry['views']:
+                views.setdefault(view['name'], dict(view, file=path))
+                for field in view['fields']:
+                    fields.setdefault(f"{view['name']}.{field['name']}", dict(field, view=view['name'], file=path))
+                    field_views.setdefault(field['name'], []).append(view['name'])
+            for explore in entry['explores']:
+                explores.setdefault(explore['name'], dict(explore, file=path, models=[]))
+            name = model_name(path)
+            if name and not path.startswith('//'):
+                models[name] = dict(self.reachable(path), name=name, file=path,
+                                    connection=entry['connection'], includes=entry['includes'])
+
+        # Files each model loads, transitively (explore membership, connections, audit scope)
+        file_models: Dict[str, List[str]] = {}
+        for name, model in sorted(models.items()):
+            for path in model['files']:
+                file_models.setdefault(path, []).append(name)
+
+        for explore in explores.values():
+            explore['models'] = file_models.get(explore['file'], [])
+            first = models.get(explore['models'][0]) if explore['models'] else None
+            explore['connection'] = first['connection'] if first else None
+
+        # Explores as each model sees them: two models may define explores with the same name
+        model_explores: Dict[str, Dict[str, Dict]] = {}
+        for path in sorted(self.entries):
+            for explore in self.entries[path]['explores']:
+                for name in file_models.get(path, []):
+                    model_explores.setdefault(name, {}).setdefault(explore['name'], dict(
+                        explore, file=path, models=file_models[path], connection=models[name]['connection']))
+
+        self._maps = {'views': views, 'fields': fields, 'field_views': field_views,
+                      'explores': explores, 'model_explores': model_explores,
+                      'models': models, 'file_models': file_models}
+        return self._maps
+
+    def view(self, name: str) -> Optional[Dict]:
+        return self.maps()['views'].get(name)
+
+    def field(self, view_name: str, field_name: str) -> Optional[Dict]:
+        return self.maps()['fields'].get(f"{view_name}.{field_name}")
+
+    def views_with_field(self, field_name: str) -> List[str]:
+        return self.maps()['field_views'].get(field_name, [])
+
+    def explore(self, name: str, model: Optional[str] = None) -> Optional[Dict]:
+        """The explore `model` loads under this name; without a model, the first one defined anywhere"""
+        if model:
+            return self.maps()['model_explores'].get(model, {}).get(name)
+        return self.maps()['explores'].get(name)
+
+    def model(self, name: str) -> Optional[Dict]:
+        return self.maps()['models'].get(name)
+
+    def models_for_file(self, path: str) -> List[str]:
+        return self.maps()['file_models'].get(self.relpath(path), [])
+
+    def is_reachable(self, path: str) -> bool:
+        """True when some model loads the file (or it is the manifest), or the project has no model"""
+        maps = self.maps()
+        key = self.relpath(path)
+        return not maps['models'] or key in maps['file_models'] or key == 'manifest.lkml'
+
+    def model_report(self) -> List[str]:
+        """Per-model file counts by kind, plus includes that resolved to nothing"""
+        lines = []
+        for name, model in sorted(self.maps()['models'].items()):
+            kinds: Dict[str, int] = {}
+            for path in model['files']:
+                base = os.path.basename(path)
+                kind = base.split('.')[1] if base.count('.') >= 2 else 'other'
+                kinds[kind] = kinds.get(kind, 0) + 1
+            counts = ', '.join(f"{count} {kind}" for kind, count in sorted(kinds.items()))
+            lines.append(f"Model '{name}': {len(model['files'])} reachable file(s) ({counts})")
+            for item in model['unresolved']:
+                lines.append(f"  unresolved include \"{item['include']}\" in {item['file']} ({item['reason']})")
+        return lines
+
+    def connection_for_file(self, path: Optional[str] = None) -> Optional[str]:
+        """Connection of the model that includes the file, else of the first model declaring one"""
+        models = self.maps()['models']
+        if path:
+            for name in self.models_for_file(path):
+                if models[name]['connection']:
+                    return models[name]['connection']
+        for name in sorted(models):
+            if models[name]['connection']:
+                return models[name]['connection']
+        return None
+
+
+_indexes: Dict[str, ProjectIndex] = {}
+
+
+def project_index(project_root: str = '.', discover: bool = False,
+                  files: Optional[List[str]] = None) -> ProjectIndex:
+    """
+    Process-wide index for a project root, so every audit run by one
+    interpreter (e.g. lookml-pipeline.py) shares it. With discover=True every
+    LookML file under the root is indexed up front; pass files when that list
+    has already been discovered.
+    """
+    key = os.path.abspath(project_root)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = ProjectIndex(project_root)
+    if files is not None and not index.discovered:
+        index.add_files(files)
+        index.discovered = True
+    if discover:
+        index.discover()
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the files each LookML model loads through its includes')
+    parser.add_argument('--project-root', default='.', help='Project root directory (default: current directory)')
+    parser.add_argument('--list-files', action='store_true', help='Also list every reachable file per model')
+
+    args = parser.parse_args()
+
+    index = project_index(args.project_root, discover=True)
+    models = index.maps()['models']
+    print(index.summary())
+    for key, reason in index.failures().items():
+        print(f"::warning file={key},title=Unindexed LookML File::{reason}")
+    for line in index.model_report():
+        print(line)
+    if args.list_files:
+        for name, model in sorted(models.items()):
+            print(f"\n{name}:")
+            for path in model['files']:
+                print(f"  {path}")
+
+    unreachable = [key for key in sorted(index.entries)
+                   if not key.startswith('//') and not index.is_reachable(os.path.join(index.project_root, key))]
+    print(f"\n{len(unreachable)} file(s) not loaded by any model")
+    for path in unreachable:
+        print(f"  {path}")
+    index.save()
+
+
+if __name__ == '__main__':
+    main()
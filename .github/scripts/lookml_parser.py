@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Shared LookML Parser
+Tokenizes a LookML file once and builds a typed block tree (views, explores,
+joins, dimensions, measures, derived_table, dashboards) for the audit scripts
+"""
+
+import bisect
+import contextlib
+import itertools
+import mmap
+import os
+import re
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from lookml_cache import content_digest, default_cache
+
+
+# Bump whenever the tree layout changes so stale cache entries are ignored
+PARSER_VERSION = '3'
+
+# Parameters whose value runs until the closing ';;' (SQL, Liquid, HTML)
+SQL_LIKE_KEYS = {'html', 'expression'}
+
+_SKIP_RE = re.compile(r'(?:\s+|#[^\n]*)+')
+_KEY_RE = re.compile(r'(\+?[A-Za-z_]\w*)\s*:')
+_WS_RE = re.compile(r'\s*')
+_BARE_RE = re.compile(r'[^\s{}\[\]#"]+')
+_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"', re.DOTALL)
+_LIST_STOP_RE = re.compile(r'[\]"]')
+_JUNK_RE = re.compile(r'[^\s#{}]+|.', re.DOTALL)
+_LIST_ITEM_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|([^,\s]+)')
+_YAML_DASHBOARD_RE = re.compile(r'\s*(?:---|-\s+dashboard:)')
+
+# Reader threads used by read_files(); each keeps a few files in flight
+DEFAULT_READ_WORKERS = 8
+READ_AHEAD_PER_WORKER = 4
+
+
+def is_sql_like(key: str) -> bool:
+    """Return True if the parameter value is terminated by ';;'"""
+    return key.startswith('sql') or key in SQL_LIKE_KEYS
+
+
+class Param:
+    """
+    A single `name: value` parameter inside a block. Only the value's span is
+    stored; the value is sliced from the file text when it is read, so parsing
+    copies no SQL bodies.
+    """
+
+    __slots__ = ('name', 'kind', 'start', 'end', 'value_start', 'value_end', 'source')
+
+    def __init__(self, name: str, kind: str, start: int, end: int,
+                 value_start: int, value_end: int, source: 'ParsedFile'):
+        self.name = name
+        self.kind = kind    # 'string' | 'sql' | 'list' | 'bare'
+        self.start = start
+        self.end = end
+        self.value_start = value_start
+        self.value_end = value_end
+        self.source = source
+
+    @property
+    def value(self) -> str:
+        """Unquoted string, raw SQL, raw list body or bare token"""
+        return self.source.text[self.value_start:self.value_end]
+
+    @property
+    def items(self) -> List[str]:
+        """Split a list value into its items (quotes removed)"""
+        if self.kind != 'list':
+            return [self.value] if self.value else []
+        return [m.group(1) if m.group(1) is not None else m.group(2)
+                for m in _LIST_ITEM_RE.finditer(self.value)]
+
+    def __repr__(self) -> str:
+        return f"Param({self.name}={self.value[:40]!r})"
+
+
+class Node:
+    """A LookML block such as `view: name { ... }` or `derived_table: { ... }`"""
+
+    __slots__ = ('type', 'name', 'start', 'body_start', 'end', 'params', 'children', 'parent')
+
+    def __init__(self, type: str, name: Optional[str], start: int, body_start: int,
+                 parent: Optional['Node'] = None):
+        self.type = type
+        self.name = name
+        self.start = start            # offset of the block keyword
+        self.body_start = body_start  # offset just after '{'
+        self.end = -1                 # offset just after the closing '}'
+        self.params: List[Param] = []
+        self.children: List['Node'] = []
+        self.parent = parent
+
+    def param(self, name: str) -> Optional[Param]:
+        """Return the first parameter with this name"""
+        for p in self.params:
+            if p.name == name:
+                return p
+        return None
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Return the value of the first parameter with this name"""
+        p = self.param(name)
+        return p.value if p is not None else default
+
+    def has(self, name: str) -> bool:
+        """Return True if the parameter is present with a non-empty value"""
+        p = self.param(name)
+        return p is not None and bool(p.value.strip())
+
+    def all(self, name: str) -> List[Param]:
+        """Return every parameter with this name (e.g. repeated include:)"""
+        return [p for p in self.params if p.name == name]
+
+    def blocks(self, type: str) -> List['Node']:
+        """Return direct child blocks of the given type"""
+        return [c for c in self.children if c.type == type]
+
+    def first(self, type: str) -> Optional['Node']:
+        """Return the first direct child block of the given type"""
+        for c in self.children:
+            if c.type == type:
+                return c
+        return None
+
+    def walk(self) -> Iterator['Node']:
+        """Yield every descendant block depth-first, in source order"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self) -> str:
+        return f"Node({self.type}: {self.name})"
+
+
+class ParsedFile:
+    """Parse result for one file: the block tree plus YAML dashboards"""
+
+    def __init__(self, path: str, text: str):
+        self.path = path
+        self.text = text
+        self.root = Node('file', None, 0, 0)
+        self.errors: List[str] = []
+        self.is_yaml = _YAML_DASHBOARD_RE.match(text) is not None
+        self.dashboards: List[Dict] = []
+        self.yaml_error: Optional[str] = None
+        self.digest: Optional[str] = None  # sha256 of the file bytes when read via parse_file
+        self._line_starts: Optional[List[int]] = None
+
+    def __getstate__(self) -> Dict:
+        # The source text is re-read on every run anyway; keep cache entries small
+        state = self.__dict__.copy()
+        state['text'] = None
+        state['_line_starts'] = None
+        return state
+
+    @property
+    def nodes(self) -> List[Node]:
+        return self.root.children
+
+    @property
+    def params(self) -> List[Param]:
+        return self.root.params
+
+    @property
+    def views(self) -> List[Node]:
+        return self.root.blocks('view')
+
+    @property
+    def explores(self) -> List[Node]:
+        return self.root.blocks('explore')
+
+    def blocks(self, type: str) -> List[Node]:
+        return self.root.blocks(type)
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.root.get(name, default)
+
+    def all(self, name: str) -> List[Param]:
+        return self.root.all(name)
+
+    def walk(self) -> Iterator[Node]:
+        return self.root.walk()
+
+    @property
+    def line_starts(self) -> List[int]:
+        """Offset at which each line starts, built once per file on first use"""
+        if self._line_starts is None:
+            self._line_starts = [0] + [m.end() for m in re.finditer('\n', self.text)]
+        return self._line_starts
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number for a character offset"""
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """1-based (line, column) for a character offset"""
+        line = bisect.bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def offset_of(self, line: int, column: int = 1) -> int:
+        """Character offset of a 1-based (line, column); lines are clamped to the file"""
+        line = min(max(line, 1), len(self.line_starts))
+        return self.line_starts[line - 1] + column - 1
+
+
+class _Scanner:
+    """
+    Single forward pass over LookML text producing the block tree. Nesting is
+    tracked with an explicit stack and every regex is anchored and
+    unambiguous; the searches that can fail (a ';;' or a list's ']' that never
+    comes) remember where they failed, so even broken files parse in time
+    linear in their length.
+    """
+
+    def __init__(self, parsed: ParsedFile):
+        self.parsed = parsed
+        self.text = parsed.text
+        self.no_sql_end_from = len(self.text) + 1  # no ';;' at or after this offset
+        self.dead_list_points = set()  # offsets from which a list can be shown not to close
+
+    def run(self) -> None:
+        parsed = self.parsed
+        text = self.text
+        n = len(text)
+        stack = [parsed.root]
+        pos = 0
+
+        while True:
+            m = _SKIP_RE.match(text, pos)
+            if m:
+                pos = m.end()
+            if pos >= n:
+                break
+
+            ch = text[pos]
+            if ch == '}':
+                if len(stack) > 1:
+                    stack.pop().end = pos + 1
+                else:
+                    self.error(pos, "unmatched '}'")
+                pos += 1
+                continue
+
+            m = _KEY_RE.match(text, pos)
+            if not m:
+                pos = _JUNK_RE.match(text, pos).end()
+                continue
+
+            key = m.group(1)
+            key_start = pos
+            pos = _WS_RE.match(text, m.end()).end()
+            ch = text[pos] if pos < n else ''
+            parent = stack[-1]
+
+            if is_sql_like(key):
+                end = self.sql_end(pos)
+                if end == -1:
+                    self.error(key_start, f"'{key}' is not terminated by ';;'")
+                    end = text.find('\n', pos)
+                    end = n if end == -1 else end
+                    parent.params.append(Param(key, 'sql', key_start, end, pos, end, parsed))
+                    pos = end
+                else:
+                    parent.params.append(Param(key, 'sql', key_start, end + 2, pos, end, parsed))
+                    pos = end + 2
+            elif ch == '{':
+                node = Node(key, None, key_start, pos + 1, parent)
+                parent.children.append(node)
+                stack.append(node)
+                pos += 1
+            elif ch == '"':
+                sm = _STRING_RE.match(text, pos)
+                if sm:
+                    parent.params.append(Param(key, 'string', key_start, sm.end(), pos + 1, sm.end() - 1, parsed))
+                    pos = sm.end()
+                else:
+                    self.error(key_start, f"unterminated string for '{key}'")
+                    end = text.find('\n', pos)
+                    end = n if end == -1 else end
+                    parent.params.append(Param(key, 'string', key_start, end, pos + 1, end, parsed))
+                    pos = end
+            elif ch == '[':
+                end = self.list_end(pos + 1)
+                if end != -1:
+                    parent.params.append(Param(key, 'list', key_start, end + 1, pos + 1, end, parsed))
+                    pos = end + 1
+                else:
+                    self.error(key_start, f"unterminated list for '{key}'")
+                    pos += 1
+            else:
+                bm = _BARE_RE.match(text, pos)
+                after = bm.end() if bm else pos
+                peek = _WS_RE.match(text, after).end()
+                if after > pos and peek < n and text[peek] == '{':
+                    node = Node(key, text[pos:after], key_start, peek + 1, parent)
+                    parent.children.append(node)
+                    stack.append(node)
+                    pos = peek + 1
+                else:
+                    parent.params.append(Param(key, 'bare', key_start, after, pos, after, parsed))
+                    pos = after
+
+        for node in stack[1:]:
+            label = f"{node.type}: {node.name}" if node.name else node.type
+            self.error(node.start, f"unclosed block '{label}'")
+            node.end = n
+        self.parsed.root.end = n
+
+    def sql_end(self, pos: int) -> int:
+        """Offset of the next ';;' at or after pos, or -1"""
+        if pos >= self.no_sql_end_from:
+            return -1
+        end = self.text.find(';;', pos)
+        if end == -1:
+            self.no_sql_end_from = pos
+        return end
+
+    def list_end(self, pos: int) -> int:
+        """
+        Offset of the ']' closing a list whose body starts at pos (quoted items
+        may contain ']'), or -1. The unquoted offsets a failed scan passed
+        through are remembered, and a later scan reaching one of them stops
+        there, so repeated unterminated lists don't rescan the file.
+        """
+        text = self.text
+        visited = []
+        while pos not in self.dead_list_points:
+            visited.append(pos)
+            m = _LIST_STOP_RE.search(text, pos)
+            if m is None:
+                break
+            if m.group() == ']':
+                return m.start()
+            sm = _STRING_RE.match(text, m.start())
+            if sm is None:
+                break
+            pos = sm.end()
+        self.dead_list_points.update(visited)
+        return -1
+
+    def error(self, offset: int, message: str) -> None:
+        self.parsed.errors.append(f"line {self.parsed.line_of(offset)}: {message}")
+
+
+def _load_yaml_dashboards(parsed: ParsedFile) -> None:
+    import yaml
+
+    try:
+        data = yaml.safe_load(parsed.text)
+    except yaml.YAMLError as e:
+        parsed.yaml_error = str(e)
+        return
+
+    if isinstance(data, dict):
+        data = [data]
+    if isinstance(data, list):
+        parsed.dashboards = [d for d in data if isinstance(d, dict)]
+
+
+def parse_text(text: str, path: str = '<string>') -> ParsedFile:
+    """Parse LookML (or a YAML dashboard) from a string"""
+    parsed = ParsedFile(path, text)
+    if parsed.is_yaml:
+        _load_yaml_dashboards(parsed)
+    else:
+        _Scanner(parsed).run()
+    return parsed
+
+
+_NO_CACHE = object()
+
+# In-process memo so every audit run by one interpreter shares the same trees.
+# Least recently used trees are dropped once the memoized text passes
+# MEMO_MAX_CHARS; lookml-pipeline.py clears it after each run
+MEMO_MAX_CHARS = 256 * 1024 * 1024
+_memo: 'OrderedDict[str, tuple]' = OrderedDict()
+_memo_chars = 0
+
+
+def _remember(key: str, stamp: tuple, parsed: ParsedFile) -> None:
+    global _memo_chars
+    previous = _memo.pop(key, None)
+    if previous is not None:
+        _memo_chars -= len(previous[1].text)
+    _memo[key] = (stamp, parsed)
+    _memo_chars += len(parsed.text)
+    while _memo_chars > MEMO_MAX_CHARS and len(_memo) > 1:
+        _, (_, dropped) = _memo.popitem(last=False)
+        _memo_chars -= len(dropped.text)
+
+
+def clear_memo() -> None:
+    """Forget every memoized tree (and the file text it keeps alive)"""
+    global _memo_chars
+    _memo.clear()
+    _memo_chars = 0
+
+
+def parse_file(path: str, cache=_NO_CACHE, source: Optional[Tuple[os.stat_result, bytes]] = None) -> ParsedFile:
+    """
+    Read and parse a single file; raises OSError like open().
+    Files already parsed in this process are reused while their size and mtime
+    are unchanged. Otherwise the $LOOKML_CACHE_DIR parse cache is consulted unless
+    an explicit cache (or None) is passed. source is the (stat, data) pair
+    read_files() already fetched for the path.
+    """
+    st = source[0] if source else os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = os.path.abspath(path)
+    memo = _memo.get(key)
+    if memo is not None and memo[0] == stamp:
+        _memo.move_to_end(key)
+        parsed = memo[1]
+        parsed.path = path
+        return parsed
+
+    parsed = _read_and_parse(path, cache, source[1] if source else None)
+    _remember(key, stamp, parsed)
+    return parsed
+
+
+def read_source(path: str) -> Tuple[os.stat_result, Union[mmap.mmap, bytes]]:
+    """
+    stat and memory-map a file on a reader thread, asking the kernel to read
+    its pages ahead, so the caller decodes from the page cache without a
+    bytes copy (empty files can't be mapped and read as b'')
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return st, b''
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):  # not on Windows
+        mapped.madvise(mmap.MADV_WILLNEED)
+    return st, mapped
+
+
+def read_files(paths: Iterable[str], workers: int = DEFAULT_READ_WORKERS
+               ) -> Iterator[Tuple[str, Union[Tuple[os.stat_result, Union[mmap.mmap, bytes]], OSError]]]:
+    """
+    Yield (path, (stat, data)) in input order, data being the mapping from
+    read_source(), while a thread pool maps and reads the next files ahead, so
+    file latency (e.g. network-mounted CI workspaces) overlaps the caller's
+    parsing. A file that can't be read yields its OSError instead. At most
+    workers * READ_AHEAD_PER_WORKER files are held. Each mapping is closed
+    when the caller moves on to the next file, so data must not be kept.
+    """
+    workers = max(1, workers)
+    path_iter = iter(paths)
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lookml-read') as pool:
+        try:
+            for path in itertools.islice(path_iter, workers * READ_AHEAD_PER_WORKER):
+                in_flight.append((path, pool.submit(read_source, path)))
+            while in_flight:
+                path, future = in_flight.popleft()
+                for next_path in itertools.islice(path_iter, 1):
+                    in_flight.append((next_path, pool.submit(read_source, next_path)))
+                try:
+                    source = future.result()
+                except OSError as e:
+                    source = e
+                try:
+                    yield path, source
+                finally:
+                    _close_source(source)
+        finally:
+            # Maps read ahead but never handed out are closed once their read finishes
+            for _, future in in_flight:
+                if not future.cancel():
+                    future.add_done_callback(_close_read)
+
+
+def _close_source(source: Union[Tuple[os.stat_result, Union[mmap.mmap, bytes]], OSError]) -> None:
+    if isinstance(source, tuple) and isinstance(source[1], mmap.mmap):
+        source[1].close()
+
+
+def _close_read(future) -> None:
+    if future.exception() is None:
+        _close_source(future.result())
+
+
+def prefetch_parsed(paths: Iterable[str], workers: int = DEFAULT_READ_WORKERS) -> Iterator[str]:
+    """
+    Yield each path in order once its tree is in the in-process memo, with
+    the following files read ahead on reader threads. The caller then calls
+    parse_file(path) as usual and gets the memoized tree, or the file's own
+    error raised again.
+    """
+    for path, source in read_files(paths, workers):
+        if not isinstance(source, OSError):
+            try:
+                parse_file(path, source=source)
+            except Exception:
+                pass  # reported by the caller's own parse_file() call
+        yield path
+
+
+@contextlib.contextmanager
+def map_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Read-only view of a file's bytes, memory-mapped so hashing and decoding
+    work on the page cache instead of a bytes copy (empty files can't be mapped)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _read_and_parse(path: str, cache, data: Optional[bytes] = None) -> ParsedFile:
+    if cache is _NO_CACHE:
+        cache = default_cache(PARSER_VERSION)
+
+    if data is not None:
+        text = str(data, 'utf-8')
+        digest = content_digest(data) if cache is not None else None
+    else:
+        with map_file(path) as data:
+            text = str(data, 'utf-8')
+            digest = content_digest(data) if cache is not None else None
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+    if cache is None:
+        return parse_text(text, path)
+
+    parsed = cache.load_tree(digest)
+    if parsed is not None:
+        parsed.path = path
+        parsed.text = text
+        return parsed
+
+    parsed = parse_text(text, path)
+    parsed.digest = digest
+    cache.store_tree(digest, parsed)
+    return parsed
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Synthetic LookML Project Generator
+Writes a deterministic project of N views, M explores with K joins each,
+derived tables, Liquid-heavy labels and YAML dashboards, laid out like this
+repository (views/, explores/, models/, Dashboards/), so every audit can be
+benchmarked at 10k-100k objects. A small share of objects carries the issues
+the audits look for (missing primary keys, missing relationships, SELECT *,
+unlabeled fields, oversized dashboards), so the audits do real work.
+
+Usage:
+  python lookml_synthetic_project.py --output /tmp/synthetic --views 2000 --explores 500 --joins 4
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+
+DIMENSION_TYPES = ['string', 'number', 'date', 'yesno']
+MEASURE_TYPES = ['count', 'sum', 'average', 'count_distinct', 'max']
+RELATIONSHIPS = ['one_to_one', 'one_to_many', 'many_to_many']
+VIS_TYPES = ['looker_column', 'looker_line', 'looker_pie', 'single_value', 'looker_grid', 'looker_bar']
+
+# Share of objects generated with an audit finding
+DEFAULT_ISSUE_RATE = 0.05
+
+
+def view_name(i: int) -> str:
+    return f"synthetic_view_{i:06d}"
+
+
+def liquid_label(english: str, french: str) -> str:
+    return (f"{{% if _user_attributes['user_language'] == 'fr' %}}{french}"
+            f"{{% else %}}{english}{{% endif %}}")
+
+
+class ProjectGenerator:
+    def __init__(self, views: int = 1000, explores: int = 200, joins: int = 4,
+                 dimensions: int = 12, measures: int = 4, dashboards: int = 50,
+                 elements: int = 12, models: int = 1, derived_table_ratio: float = 0.2,
+                 liquid_ratio: float = 0.5, views_per_file: int = 1, explores_per_file: int = 50,
+                 issue_rate: float = DEFAULT_ISSUE_RATE, seed: int = 0):
+        self.views = max(1, views)
+        self.explores = max(0, explores)
+        self.joins = max(0, min(joins, self.views - 1))
+        self.dimensions = max(1, dimensions)
+        self.measures = max(0, measures)
+        self.dashboards = max(0, dashboards)
+        self.elements = max(1, elements)
+        self.models = max(1, models)
+        self.derived_table_ratio = derived_table_ratio
+        self.liquid_ratio = liquid_ratio
+        self.views_per_file = max(1, views_per_file)
+        self.explores_per_file = max(1, explores_per_file)
+        self.issue_rate = issue_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self.stats = {'files': 0, 'lines': 0, 'bytes': 0, 'views': 0, 'dimensions': 0,
+                      'measures': 0, 'derived_tables': 0, 'explores': 0, 'joins': 0,
+                      'dashboards': 0, 'dashboard_elements': 0}
+
+    def issue(self) -> bool:
+        return self.rng.random() < self.issue_rate
+
+    # ------------------------------------------------------------------
+    # LookML text
+    # ------------------------------------------------------------------
+
+    def dimension(self, view: str, index: int, primary_key: bool = False) -> List[str]:
+        rng = self.rng
+        dim_type = 'string' if primary_key else rng.choice(DIMENSION_TYPES)
+        name = f"{'id' if primary_key else f'attribute_{index:03d}'}"
+        if dim_type == 'yesno':
+            name = f"is_flag_{index:03d}" if not self.issue() else f"flag_{index:03d}"
+        if not primary_key and self.issue():
+            name = f"Attribute{index:03d}Camel"  # snake_case finding
+
+        english = name.replace('_', ' ').title()
+        lines = [f"  dimension: {name} {{"]
+        if primary_key:
+            lines.append("    primary_key: yes")
+        lines.append(f"    type: {dim_type}")
+        lines.append(f"    sql: ${{TABLE}}.{name.lower()} ;;")
+        if rng.random() < self.liquid_ratio:
+            lines.append(f"    label: \"{liquid_label(english, english + ' (fr)')}\"")
+        elif not self.issue():
+            lines.append(f"    label: \"{english}\"")
+        if not self.issue():
+            lines.append(f"    description: \"Synthetic {dim_type} attribute {index} of {view}\"")
+        if dim_type == 'string' and rng.random() < self.liquid_ratio / 4:
+            lines += [
+                "    html:",
+                "      {% if value == 'A' %}",
+                "        <span style=\"color: #1f78b4;\">{{ value }}</span>",
+                "      {% else %}",
+                "        {{ rendered_value }}",
+                "      {% endif %}",
+                "    ;;",
+            ]
+        lines.append("  }")
+        self.stats['dimensions'] += 1
+        return lines
+
+    def measure(self, view: str, index: int) -> List[str]:
+        measure_type = self.rng.choice(MEASURE_TYPES)
+        name = f"{measure_type}_{index:02d}"
+        lines = [f"  measure: {name} {{", f"    type: {measure_type}"]
+        if measure_type != 'count':
+            lines.append(f"    sql: ${{attribute_{index:03d}}} ;;")
+        lines.append(f"    label: \"{liquid_label(name.title(), name.title() + ' (fr)')}\"")
+        if not self.issue():
+            lines.append(f"    description: \"Synthetic {measure_type} measure of {view}\"")
+        lines.append("  }")
+        self.stats['measures'] += 1
+        return lines
+
+    def view(self, i: int) -> List[str]:
+        rng = self.rng
+        name = view_name(i)
+        lines = [f"view: {name} {{"]
+        if rng.random() < self.derived_table_ratio:
+            source = view_name(rng.randrange(self.views))
+            select = "*" if self.issue() else "id, attribute_001, attribute_002, updated_at"
+            lines += [
+                "  derived_table: {",
+                "    sql:",
+                f"      SELECT {select}",
+                f"      FROM `@{{SYNTHETIC_DATASET}}.{source}`",
+                "      WHERE {% condition attribute_001 %} attribute_001 {% endcondition %}",
+                "        AND updated_at >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY)",
+                "    ;;",
+                "    datagroup_trigger: synthetic_default_datagroup",
+                "  }",
+            ]
+            self.stats['derived_tables'] += 1
+        else:
+            lines.append(f"  sql_table_name: `@{{SYNTHETIC_DATASET}}.{name}` ;;")
+        lines.append("")
+
+        if not self.issue():
+            lines += self.dimension(name, 0, primary_key=True)
+            lines.append("")
+        for d in range(1, self.dimensions):
+            lines += self.dimension(name, d)
+            lines.append("")
+        for m in range(self.measures):
+            lines += self.measure(name, m + 1)
+            lines.append("")
+        lines.append("}")
+        lines.append("")
+        self.stats['views'] += 1
+        return lines
+
+    def explore(self, i: int) -> List[str]:
+        rng = self.rng
+        base = view_name(i % self.views)
+        lines = [f"explore: {base} {{" if i < self.views else f"explore: synthetic_explore_{i:06d} {{"]
+        if i >= self.views:
+            lines.append(f"  view_name: {base}")
+        lines.append(f"  label: \"{liquid_label(f'Explore {i}', f'Exploration {i}')}\"")
+        if not self.issue():
+            lines.append(f"  description: \"Synthetic explore {i} with {self.joins} joins\"")
+        lines.append("")
+
+        joined = set()
+        while len(joined) < self.joins:
+            target = rng.randrange(self.views)
+            if view_name(target) != base:
+                joined.add(target)
+        for target in sorted(joined):
+            joined_name = view_name(target)
+            lines.append(f"  join: {joined_name} {{")
+            lines.append("    type: left_outer")
+            if not self.issue():
+                relationship = rng.choice(RELATIONSHIPS) if self.issue() else 'many_to_one'
+                lines.append(f"    relationship: {relationship}")
+            lines.append(f"    sql_on: ${{{base}.id}} = ${{{joined_name}.id}} ;;")
+            lines.append("  }")
+            lines.append("")
+            self.stats['joins'] += 1
+        lines.append("}")
+        lines.append("")
+        self.stats['explores'] += 1
+        return lines
+
+    def dashboard(self, i: int) -> List[str]:
+        rng = self.rng
+        name = f"synthetic_dashboard_{i:05d}"
+        explore = view_name(rng.randrange(min(self.views, max(1, self.explores))))
+        lines = [
+            "---",
+            f"- dashboard: {name}",
+            f"  title: Synthetic Dashboard {i}",
+            "  layout: newspaper",
+            "  preferred_viewer: dashboards-next",
+            f"  description: 'Synthetic dashboard {i}'",
+            "  filters:",
+        ]
+        filter_names = []
+        for f in range(3):
+            filter_name = f"filter_{f}"
+            filter_names.append(filter_name)
+            lines += [
+                f"  - name: {filter_name}",
+                f"    title: Filter {f}",
+                "    type: field_filter",
+                "    default_value: ''",
+                "    allow_multiple_values: true",
+                "    required: false",
+                f"    model: synthetic_{i % self.models}",
+                f"    explore: {explore}",
+                f"    field: {explore}.attribute_{f + 1:03d}",
+            ]
+
+        elements = self.elements * (3 if self.issue() else 1)  # a few oversized dashboards
+        lines.append("  elements:")
+        for e in range(elements):
+            vis = rng.choice(VIS_TYPES)
+            lines += [
+                f"  - title: Element {e}",
+                f"    name: element_{e}",
+                f"    model: synthetic_{i % self.models}",
+                f"    explore: {explore}",
+                f"    type: {vis}",
+                f"    fields: [{explore}.attribute_{e % self.dimensions:03d}, {explore}.count_01]",
+                f"    sorts: [{explore}.count_01 desc]",
+                "    limit: 500",
+                "    listen:",
+            ]
+            listened = filter_names if rng.random() < 0.7 else filter_names[:1]
+            for filter_name in listened:
+                lines.append(f"      {filter_name}: {explore}.attribute_{int(filter_name[-1]) + 1:03d}")
+            lines += [
+                f"    row: {(e // 3) * 6}",
+                f"    col: {(e % 3) * 8}",
+                "    width: 8",
+                "    height: 6",
+            ]
+            self.stats['dashboard_elements'] += 1
+        lines.append("")
+        self.stats['dashboards'] += 1
+        return lines
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def write(self, path: str, lines: List[str]) -> None:
+        text = '\n'.join(lines)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.stats['files'] += 1
+        self.stats['lines'] += text.count('\n') + 1
+        self.stats['bytes'] += len(text.encode('utf-8'))
+
+    def generate(self, output_dir: str) -> Dict[str, Any]:
+        """Write the project under output_dir and return counts"""
+        self.write(os.path.join(output_dir, 'manifest.lkml'), [
+            'project_name: "synthetic"',
+            '',
+            'constant: SYNTHETIC_DATASET {',
+            '  value: "synthetic-project.synthetic_dataset"',
+            '  export: override_optional',
+            '}',
+            '',
+        ])
+
+        for start in range(0, self.views, self.views_per_file):
+            lines = []
+            for i in range(start, min(start + self.views_per_file, self.views)):
+                lines += self.view(i)
+            bucket = f"group_{start // 1000:03d}"
+            filename = view_name(start) + '.view.lkml'
+            self.write(os.path.join(output_dir, 'views', bucket, filename), lines)
+
+        explore_files = []
+        for start in range(0, self.explores, self.explores_per_file):
+            lines = ['include: "/views/**/*.view.lkml"', '']
+            for i in range(start, min(start + self.explores_per_file, self.explores)):
+                lines += self.explore(i)
+            filename = f"synthetic_{start // self.explores_per_file:04d}.explore.lkml"
+            explore_files.append(filename)
+            self.write(os.path.join(output_dir, 'explores', filename), lines)
+
+        for m in range(self.models):
+            lines = ['connection: "badal_internal_projects"', '']
+            lines += [f'include: "/explores/{f}"' for n, f in enumerate(explore_files) if n % self.models == m]
+            lines.append('include: "/Dashboards/*.dashboard.lookml"')
+            lines += ['', 'datagroup: synthetic_default_datagroup {',
+                      '  sql_trigger: SELECT CURRENT_DATE() ;;', '  max_cache_age: "24 hours"', '}', '']
+            self.write(os.path.join(output_dir, 'models', f"synthetic_{m}.model.lkml"), lines)
+
+        for d in range(self.dashboards):
+            self.write(os.path.join(output_dir, 'Dashboards', f"synthetic_dashboard_{d:05d}.dashboard.lookml"),
+                       self.dashboard(d))
+
+        return dict(self.stats)
+
+
+def generate_project(output_dir: str, **options) -> Dict[str, Any]:
+    """Generate a synthetic project; options are ProjectGenerator keyword arguments"""
+    stats = ProjectGenerator(**options).generate(output_dir)
+    with open(os.path.join(output_dir, 'synthetic_project.json'), 'w') as f:
+        json.dump({'options': options, 'stats': stats}, f, indent=2, sort_keys=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic LookML project for scaling benchmarks')
+    parser.add_argument('--output', required=True, help='Directory to write the project into')
+    parser.add_argument('--views', type=int, default=1000, help='Number of views (default: 1000)')
+    parser.add_argument('--explores', type=int, default=200, help='Number of explores (default: 200)')
+    parser.add_argument('--joins', type=int, default=4, help='Joins per explore (default: 4)')
+    parser.add_argument('--dimensions', type=int, default=12, help='Dimensions per view (default: 12)')
+    parser.add_argument('--measures', type=int, default=4, help='Measures per view (default: 4)')
+    parser.add_argument('--dashboards', type=int, default=50, help='Number of YAML dashboards (default: 50)')
+    parser.add_argument('--elements', type=int, default=12, help='Elements per dashboard (default: 12)')
+    parser.add_argument('--models', type=int, default=1, help='Number of model files (default: 1)')
+    parser.add_argument('--derived-table-ratio', type=float, default=0.2, help='Share of views built on derived tables')
+    parser.add_argument('--liquid-ratio', type=float, default=0.5, help='Share of fields with Liquid labels')
+    parser.add_argument('--views-per-file', type=int, default=1, help='Views written to each .view.lkml file')
+    parser.add_argument('--explores-per-file', type=int, default=50, help='Explores written to each .explore.lkml file')
+    parser.add_argument('--issue-rate', type=float, default=DEFAULT_ISSUE_RATE, help='Share of objects with an audit finding')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+
+    args = parser.parse_args()
+
+    options = {k: v for k, v in vars(args).items() if k != 'output'}
+    stats = generate_project(args.output, **options)
+
+    print(f"Synthetic project written to {args.output}")
+    for key, value in stats.items():
+        print(f"  {key}: {value:,}")
+
+
+if __name__ == '__main__':
+    main()
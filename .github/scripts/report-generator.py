@@ -75,6 +75,10 @@ def generate_github_summary():
             with open("query_limit_results.json") as f:
                 data = json.load(f)
                 summary_lines.append(f"- Dashboards exceeding query limit: {data.get('dashboards_exceeding_query_limit', 0)}")
+                summary_lines.append(f"- Estimated distinct dashboard queries: {data.get('estimated_distinct_queries', 0)}")
+                summary_lines.append(f"- Dashboard tiles on fan-out joins: {data.get('tiles_on_fanout_joins', 0)}")
+                if data.get('errors'):
+                    summary_lines.append(f"- Dashboard files that could not be checked: {len(data['errors'])}")
         except Exception as e:
             summary_lines.append(f"- Could not read query_limit_results.json: {e}")
     # Dashboard Filters
@@ -164,6 +168,16 @@ def generate_github_summary():
         summary_lines.append(f"- Queries tested: {sql_summary.get('total_queries_tested', 0)}")
         summary_lines.append(f"- Queries passed: {sql_summary.get('queries_passed', 0)}")
         summary_lines.append(f"- Queries with execution errors: {sql_summary.get('queries_with_execution_errors', 0)}")
+        if sql_summary.get('cache_hits'):
+            summary_lines.append(f"- Reused from result cache: {sql_summary['cache_hits']}")
+        if sql_summary.get('validation_mode') == 'plan':
+            summary_lines.append("- Mode: plan only (zero-row queries, no data scanned)")
+        if sql_summary.get('estimated_bytes_scanned') is not None:
+            summary_lines.append(f"- Estimated bytes scanned by full execution: {sql_summary['estimated_bytes_scanned']:,}")
+        rate_limiting = sql_summary.get('api_rate_limiting')
+        if rate_limiting:
+            summary_lines.append(f"- Time throttled by API rate limiter: {rate_limiting.get('throttled_seconds', 0)}s ({rate_limiting.get('throttled_responses', 0)} 429/503 responses)")
+            summary_lines.append(f"- Time paced by API rate limiter: {rate_limiting.get('paced_seconds', 0)}s")
         
         if sql_summary.get('queries_with_execution_errors', 0) > 0:
             summary_lines.append("- **SQL Execution Errors:**")
@@ -342,6 +356,10 @@ def generate_pr_comment():
             with open("query_limit_results.json") as f:
                 data = json.load(f)
                 comment_lines.append(f"- Dashboards exceeding query limit: {data.get('dashboards_exceeding_query_limit', 0)}")
+                comment_lines.append(f"- Estimated distinct dashboard queries: {data.get('estimated_distinct_queries', 0)}")
+                comment_lines.append(f"- Dashboard tiles on fan-out joins: {data.get('tiles_on_fanout_joins', 0)}")
+                if data.get('errors'):
+                    comment_lines.append(f"- Dashboard files that could not be checked: {len(data['errors'])}")
         except Exception as e:
             comment_lines.append(f"- Could not read query_limit_results.json: {e}")
     # Dashboard Filters
@@ -7,29 +7,83 @@ Tests actual SQL execution against database connections using proper Looker SQL
 import json
 import sys
 import argparse
-import configparser
 import requests
 import os
 import re
-import glob
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from looker_api_client import DEFAULT_POOL_SIZE, LookerAPIClient
+from lookml_cache import default_cache, fingerprint
+from lookml_index import project_index
+from lookml_parser import Node, ParsedFile, parse_file
+
+
+VALIDATION_MODES = ['execute', 'plan']
+
+# Zero-row wrappers used by --mode plan: the warehouse must compile and plan the
+# query (catching syntax and schema errors) but has no rows to scan or return.
+# Keyed by dialect prefix (Looker names versions, e.g. mssql_2008, oracle_adwc);
+# the query sits on its own lines so a trailing -- comment cannot swallow the wrapper
+ZERO_ROW_TEMPLATES = {
+    'mssql': 'SELECT TOP 0 * FROM (\n{sql}\n) AS lookml_validation',
+    'azure_sql_dw': 'SELECT TOP 0 * FROM (\n{sql}\n) AS lookml_validation',
+    'oracle': 'SELECT * FROM (\n{sql}\n) lookml_validation WHERE 1 = 0',
+}
+DEFAULT_ZERO_ROW_TEMPLATE = 'SELECT * FROM (\n{sql}\n) AS lookml_validation LIMIT 0'
+
+# Namespace for SQL outcomes in the $LOOKML_CACHE_DIR cache
+SQL_RESULT_CACHE_VERSION = 'sql-results-2'
+
+# Only definitive outcomes are cached: 200 results and the 4xx bodies Looker
+# returns for SQL it rejects. Auth, missing-object, timeout and throttling
+# responses (and transport failures, which carry no status) are transient
+UNCACHED_STATUSES = {401, 403, 404, 408, 429}
+
+# Outcome fields worth replaying on a cache hit (never row data)
+CACHED_RESULT_FIELDS = ['success', 'status_code', 'errors', 'warnings', 'error_details',
+                        'validation_mode', 'estimated_bytes_scanned']
+
+CONSTANT_REF_RE = re.compile(r'@\{(\w+)\}')
+
+# Result streaming: bytes per read and the cap on non-JSON bodies kept for error reporting
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_RAW_RESPONSE_CHARS = 64 * 1024
+
+
+def is_cacheable_outcome(result: Dict[str, Any]) -> bool:
+    """True for SQL outcomes that will not change on a retry (see UNCACHED_STATUSES)"""
+    status_code = result.get('status_code')
+    if status_code == 200:
+        return True
+    return status_code is not None and 400 <= status_code < 500 and status_code not in UNCACHED_STATUSES
+
+
+def format_bytes(num_bytes: Optional[int]) -> str:
+    """Human readable byte count"""
+    if num_bytes is None:
+        return 'unknown'
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    size = float(num_bytes)
+    for unit in ['KB', 'MB', 'GB']:
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} TB"
 
 
 class SQLExecutionValidator:
-    def __init__(self, config_file: str = 'looker.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file)
-        
-        # Looker connection details
-        self.base_url = self.config['Looker']['base_url'].rstrip('/')
-        self.client_id = self.config['Looker']['client_id']
-        self.client_secret = self.config['Looker']['client_secret']
-        self.api_version = self.config.get('Looker', 'api_version', fallback='4.0')
-        
-        self.api_url = f"{self.base_url}/api/{self.api_version}"
-        self.session = requests.Session()
+    def __init__(self, config_file: str = 'looker.ini', client: Optional[LookerAPIClient] = None, max_workers: int = 4,
+                 validation_mode: str = 'execute', estimate_bytes: bool = False,
+                 cache_ttl: float = 6 * 3600, max_rows: int = 1000, sample_rows: int = 5):
+        # Shared authenticated session (pooled, rate limited, token reused across the job)
+        self.client = client or LookerAPIClient(config_file, pool_size=max(DEFAULT_POOL_SIZE, max_workers))
+        self.api_url = self.client.api_url
+        self.session = self.client.session
         self.access_token = None
         
         # Get available connections
@@ -37,6 +91,23 @@ class SQLExecutionValidator:
         self.default_connection = None
         self.current_file_path = None
         
+        # Bounded concurrency for SQL Runner round trips
+        self.max_workers = max(1, max_workers)
+        
+        # 'execute' runs the SQL as written; 'plan' wraps it to return zero rows
+        self.validation_mode = validation_mode
+        self.estimate_bytes = estimate_bytes
+        self.bigquery_clients = {}
+        
+        # Outcomes of identical SQL are reused for cache_ttl seconds (0 disables)
+        self.cache_ttl = cache_ttl
+        self.result_cache = default_cache(SQL_RESULT_CACHE_VERSION) if cache_ttl > 0 else None
+        self.project_constants: Dict[str, str] = {}
+        
+        # Results are streamed: stop after max_rows, keep only sample_rows rows
+        self.max_rows = max(1, max_rows)
+        self.sample_rows = max(0, sample_rows)
+        
         self.validation_results = {
             'sql_executions': [],
             'summary': {
@@ -45,7 +116,10 @@ class SQLExecutionValidator:
                 'queries_with_execution_errors': 0,
                 'queries_passed': 0,
                 'files_processed': 0,
-                'connections_used': []
+                'connections_used': [],
+                'validation_mode': validation_mode,
+                'estimated_bytes_scanned': None,
+                'cache_hits': 0
             },
             'errors': [],
             'warnings': [],
@@ -54,36 +128,13 @@ class SQLExecutionValidator:
     
     def authenticate(self) -> bool:
         """Authenticate with Looker API and get access token"""
-        login_url = f"{self.api_url}/login"
-        
-        login_data = {
-            'client_id': self.client_id,
-            'client_secret': self.client_secret
-        }
-        
-        try:
-            print("Authenticating with Looker API...")
-            response = self.session.post(login_url, data=login_data)
-            response.raise_for_status()
-            
-            auth_data = response.json()
-            self.access_token = auth_data.get('access_token')
-            
-            if not self.access_token:
-                print("Failed to obtain access token")
-                return False
-                
-            self.session.headers.update({
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/json'
-            })
-            
-            print("Successfully authenticated with Looker API")
-            return True
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Authentication failed: {e}")
+        print("Authenticating with Looker API...")
+        if not self.client.authenticate():
             return False
+        self.access_token = self.client.access_token
+        
+        print("Successfully authenticated with Looker API")
+        return True
     
     def get_connections(self) -> Dict[str, Dict[str, Any]]:
         """Get available database connections from Looker"""
@@ -102,7 +153,8 @@ class SQLExecutionValidator:
                         'name': conn['name'],
                         'dialect': conn.get('dialect', {}).get('name', 'unknown'),
                         'database': conn.get('database', 'unknown'),
-                        'host': conn.get('host', 'unknown')
+                        'host': conn.get('host', 'unknown'),
+                        'max_connections': conn.get('max_connections')
                     }
             
             print(f"Found {len(connections)} available connections:")
@@ -173,10 +225,14 @@ class SQLExecutionValidator:
             print(f"Exception creating query: {e}")
             return None
     
-    def run_sql_query(self, query_slug: str, result_format: str = 'json') -> Dict[str, Any]:
+    def run_sql_query(self, query_slug: str, result_format: str = 'json',
+                      sample_size: Optional[int] = None) -> Dict[str, Any]:
         """
         Step 2: Run the SQL Runner Query using correct API workflow
+        The result is streamed and reading stops after max_rows rows.
         """
+        if sample_size is None:
+            sample_size = self.sample_rows
         try:
             print(f"Running SQL query with slug: {query_slug}")
             
@@ -184,114 +240,105 @@ class SQLExecutionValidator:
             run_url = f"{self.api_url}/sql_queries/{query_slug}/run/{result_format}"
             
             start_time = datetime.now()
-            response = self.session.post(run_url)
-            end_time = datetime.now()
-            execution_time = (end_time - start_time).total_seconds()
-            
-            result = {
-                'success': response.status_code == 200,
-                'status_code': response.status_code,
-                'execution_time_seconds': execution_time,
-                'query_slug': query_slug,
-                'timestamp': start_time.isoformat(),
-                'result_format': result_format,
-                'errors': [],
-                'warnings': []
-            }
-            
-            if response.status_code == 200:
-                # Status 200 - but check content for actual errors
-                try:
-                    if result_format == 'json':
-                        query_result = response.json()
+            response = self.session.post(run_url, stream=True)
+            try:
+                result = {
+                    'success': response.status_code == 200,
+                    'status_code': response.status_code,
+                    'execution_time_seconds': None,
+                    'query_slug': query_slug,
+                    'timestamp': start_time.isoformat(),
+                    'result_format': result_format,
+                    'errors': [],
+                    'warnings': []
+                }
+                
+                if response.status_code == 200:
+                    # Status 200 - but check content for actual errors
+                    try:
+                        if result_format == 'json':
+                            # Only row counts, column names and a small sample are kept
+                            result.update(self.read_json_result(response, sample_size))
+                            
+                            print(f"Query executed successfully!")
+                            print(f"Returned {result.get('row_count', 0)}"
+                                  f"{'+' if result.get('truncated') else ''} rows")
+                            
+                        else:
+                            result['raw_response'] = response.text[:MAX_RAW_RESPONSE_CHARS]
+                            print(f"Query executed successfully in {result_format} format")
+                    
+                    except json.JSONDecodeError as e:
+                        # Non-JSON response on 200 - could still be an error
+                        response_text = e.doc
+                        result['raw_response'] = response_text
+                        
+                        print(f"Non-JSON response received: {response_text[:200]}...")
                         
-                        # Handle different response formats
-                        if isinstance(query_result, list):
-                            result.update({
-                                'data': query_result,
-                                'row_count': len(query_result),
-                                'truncated': False
-                            })
-                        elif isinstance(query_result, dict):
-                            result.update({
-                                'data': query_result.get('data', []),
-                                'fields': query_result.get('fields', []),
-                                'row_count': len(query_result.get('data', [])),
-                                'truncated': query_result.get('truncated', False),
-                                'query_id': query_result.get('query_id')
-                            })
+                        # Check if the response contains error indicators even with 200 status
+                        error_indicators = [
+                            'error', 'exception', 'syntax', 'failed', 'invalid',
+                            'bqsqlexception', 'query execution failed', 'parse error',
+                            'expected', 'unexpected', 'malformed'
+                        ]
                         
-                        print(f"Query executed successfully!")
-                        print(f"Execution time: {execution_time:.2f} seconds")
-                        print(f"Returned {result.get('row_count', 0)} rows")
+                        response_lower = response_text.lower()
+                        found_errors = [indicator for indicator in error_indicators if indicator in response_lower]
                         
-                    else:
-                        result['raw_response'] = response.text
-                        print(f"Query executed successfully in {result_format} format")
+                        if found_errors:
+                            # This is actually an error disguised as success
+                            result['success'] = False
+                            
+                            # Extract the actual error message
+                            if 'syntax error' in response_lower:
+                                result['errors'].append(f"Syntax Error: {response_text}")
+                                print(f"Syntax Error detected: {response_text[:200]}")
+                            elif 'query execution failed' in response_lower:
+                                result['errors'].append(f"Execution Error: {response_text}")
+                                print(f"Execution Error detected: {response_text[:200]}")
+                            else:
+                                result['errors'].append(f"SQL Error: {response_text}")
+                                print(f"SQL Error detected: {response_text[:200]}")
+                        else:
+                            print(f"Query executed successfully (non-JSON response)")
                 
-                except json.JSONDecodeError:
-                    # Non-JSON response on 200 - could still be an error
-                    response_text = response.text
-                    result['raw_response'] = response_text
-                    
-                    print(f"Non-JSON response received: {response_text[:200]}...")
-                    
-                    # Check if the response contains error indicators even with 200 status
-                    error_indicators = [
-                        'error', 'exception', 'syntax', 'failed', 'invalid',
-                        'bqsqlexception', 'query execution failed', 'parse error',
-                        'expected', 'unexpected', 'malformed'
-                    ]
-                    
-                    response_lower = response_text.lower()
-                    found_errors = [indicator for indicator in error_indicators if indicator in response_lower]
-                    
-                    if found_errors:
-                        # This is actually an error disguised as success
-                        result['success'] = False
+                else:
+                    # Non-200 status codes
+                    try:
+                        error_data = response.json()
+                        error_message = error_data.get('message', 'Unknown error')
                         
-                        # Extract the actual error message
-                        if 'syntax error' in response_lower:
-                            result['errors'].append(f"Syntax Error: {response_text}")
-                            print(f"Syntax Error detected: {response_text[:200]}")
-                        elif 'query execution failed' in response_lower:
-                            result['errors'].append(f"Execution Error: {response_text}")
-                            print(f"Execution Error detected: {response_text[:200]}")
+                        # Parse specific error types for better reporting
+                        if any(keyword in error_message.lower() for keyword in ['syntax', 'parse', 'invalid']):
+                            result['errors'].append(f"Syntax Error: {error_message}")
+                            print(f"Syntax Error: {error_message}")
+                        elif any(keyword in error_message.lower() for keyword in ['not exist', 'not found', 'unknown']):
+                            result['errors'].append(f"Schema Error: {error_message}")
+                            print(f"Schema Error: {error_message}")
+                        elif any(keyword in error_message.lower() for keyword in ['permission', 'access', 'denied']):
+                            result['errors'].append(f"Permission Error: {error_message}")
+                            print(f"Permission Error: {error_message}")
                         else:
-                            result['errors'].append(f"SQL Error: {response_text}")
-                            print(f"SQL Error detected: {response_text[:200]}")
-                    else:
-                        print(f"Query executed successfully (non-JSON response)")
-            
-            else:
-                # Non-200 status codes
-                try:
-                    error_data = response.json()
-                    error_message = error_data.get('message', 'Unknown error')
-                    
-                    # Parse specific error types for better reporting
-                    if any(keyword in error_message.lower() for keyword in ['syntax', 'parse', 'invalid']):
-                        result['errors'].append(f"Syntax Error: {error_message}")
-                        print(f"Syntax Error: {error_message}")
-                    elif any(keyword in error_message.lower() for keyword in ['not exist', 'not found', 'unknown']):
-                        result['errors'].append(f"Schema Error: {error_message}")
-                        print(f"Schema Error: {error_message}")
-                    elif any(keyword in error_message.lower() for keyword in ['permission', 'access', 'denied']):
-                        result['errors'].append(f"Permission Error: {error_message}")
-                        print(f"Permission Error: {error_message}")
-                    else:
-                        result['errors'].append(f"Execution Error: {error_message}")
-                        print(f"Execution Error: {error_message}")
-                    
-                    # Include full error details for debugging
-                    result['error_details'] = error_data
-                    
-                except json.JSONDecodeError:
-                    # Non-JSON error response
-                    error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                    result['errors'].append(error_msg)
-                    print(f"{error_msg}")
-            
+                            result['errors'].append(f"Execution Error: {error_message}")
+                            print(f"Execution Error: {error_message}")
+                        
+                        # Include full error details for debugging
+                        result['error_details'] = error_data
+                        
+                    except json.JSONDecodeError:
+                        # Non-JSON error response
+                        error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
+                        result['errors'].append(error_msg)
+                        print(f"{error_msg}")
+            finally:
+                # Also releases the pooled connection when reading the body fails
+                response.close()
+            
+            # Stop the clock once the capped rows have been read, not at the headers
+            execution_time = (datetime.now() - start_time).total_seconds()
+            result['execution_time_seconds'] = execution_time
+            if result['success'] and 'row_count' in result:
+                print(f"Execution time: {execution_time:.2f} seconds")
             return result
             
         except Exception as e:
@@ -305,6 +352,95 @@ class SQLExecutionValidator:
             print(f"Exception running query: {e}")
             return error_result
     
+    def read_json_result(self, response: requests.Response, sample_size: int) -> Dict[str, Any]:
+        """
+        Incrementally decode a JSON array of rows, stopping after max_rows.
+        Raises json.JSONDecodeError (with the text read so far as .doc) for non-JSON bodies.
+        """
+        decoder = json.JSONDecoder()
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True)
+        buffer = ''
+        pos = 0
+        
+        def read_more() -> bool:
+            nonlocal buffer, pos
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            # Drop what has been decoded already so the buffer stays small
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+        
+        def next_char() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not read_more():
+                    return ''
+        
+        first = next_char()
+        if first == '{':
+            # Object response ({"data": [...], "fields": [...]}): no row boundary to stop at
+            while read_more():
+                pass
+            query_result = json.loads(buffer[pos:])
+            rows = query_result.get('data', [])
+            columns = [f.get('name') for f in query_result.get('fields', []) if isinstance(f, dict)]
+            return {
+                'row_count': len(rows),
+                'columns': columns,
+                'sample_rows': rows[:sample_size],
+                'truncated': bool(query_result.get('truncated', False)),
+                'query_id': query_result.get('query_id')
+            }
+        if first != '[':
+            # Error page or plain text: keep a bounded prefix for error reporting
+            while len(buffer) < MAX_RAW_RESPONSE_CHARS and read_more():
+                pass
+            raise json.JSONDecodeError("Expected a JSON array of rows", buffer[pos:pos + MAX_RAW_RESPONSE_CHARS], 0)
+        
+        pos += 1
+        row_count = 0
+        sample_rows = []
+        columns: List[str] = []
+        truncated = False
+        
+        while True:
+            ch = next_char()
+            if ch == ',':
+                pos += 1
+                continue
+            if ch in (']', ''):
+                break
+            if row_count >= self.max_rows:
+                truncated = True
+                break
+            try:
+                row, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not read_more():
+                    raise
+                continue
+            pos = end
+            if row_count == 0 and isinstance(row, dict):
+                columns = list(row.keys())
+            if len(sample_rows) < sample_size:
+                sample_rows.append(row)
+            row_count += 1
+        
+        return {
+            'row_count': row_count,
+            'columns': columns,
+            'sample_rows': sample_rows,
+            'truncated': truncated
+        }
+    
     def execute_sql_complete_workflow(self, sql: str, connection_name: str) -> Dict[str, Any]:
         """
         Complete two-step workflow: Create and run SQL query
@@ -312,21 +448,102 @@ class SQLExecutionValidator:
         print(f"Executing SQL query on connection: {connection_name}")
         print(f"Query preview: {sql[:100]}{'...' if len(sql) > 100 else ''}")
         
+        sql_to_run = sql
+        if self.validation_mode == 'plan':
+            dialect = self.connections.get(connection_name, {}).get('dialect', 'unknown')
+            sql_to_run = self.zero_row_sql(sql, dialect)
+        
         # Step 1: Create the query
-        query_slug = self.create_sql_query(sql, connection_name)
+        query_slug = self.create_sql_query(sql_to_run, connection_name)
         if not query_slug:
             return {
                 'success': False,
                 'errors': ['Failed to create SQL query'],
                 'timestamp': datetime.now().isoformat(),
-                'connection_name': connection_name
+                'connection_name': connection_name,
+                'validation_mode': self.validation_mode
             }
         
         # Step 2: Run the query
         result = self.run_sql_query(query_slug, 'json')
         result['connection_name'] = connection_name
+        result['validation_mode'] = self.validation_mode
+        
+        if self.estimate_bytes and result.get('success'):
+            result['estimated_bytes_scanned'] = self.estimate_bytes_scanned(sql, connection_name)
         return result
     
+    def zero_row_sql(self, sql: str, dialect: str) -> str:
+        """Wrap a query so the warehouse compiles and plans it but returns no rows"""
+        sql = sql.strip().rstrip(';').strip()
+        for prefix, template in ZERO_ROW_TEMPLATES.items():
+            if dialect.startswith(prefix):
+                return template.format(sql=sql)
+        return DEFAULT_ZERO_ROW_TEMPLATE.format(sql=sql)
+    
+    def estimate_bytes_scanned(self, sql: str, connection_name: str) -> Optional[int]:
+        """
+        Estimate the bytes a full execution of the query would scan.
+        BigQuery uses a dry-run job (needs google-cloud-bigquery and credentials),
+        Snowflake uses EXPLAIN through SQL Runner; other dialects are not supported.
+        """
+        info = self.connections.get(connection_name, {})
+        dialect = info.get('dialect', 'unknown')
+        sql = sql.strip().rstrip(';').strip()
+        
+        if dialect.startswith('bigquery'):
+            estimate = self.estimate_bigquery_bytes(sql, info)
+        elif dialect == 'snowflake':
+            estimate = self.estimate_snowflake_bytes(sql, connection_name)
+        else:
+            print(f"   Byte estimates are not available for dialect '{dialect}'")
+            return None
+        
+        if estimate is not None:
+            print(f"   Estimated bytes scanned: {format_bytes(estimate)}")
+        return estimate
+    
+    def estimate_bigquery_bytes(self, sql: str, connection_info: Dict[str, Any]) -> Optional[int]:
+        """Dry-run the query directly against BigQuery"""
+        try:
+            from google.cloud import bigquery
+        except ImportError:
+            print("   google-cloud-bigquery is not installed; skipping byte estimate")
+            return None
+        
+        # For BigQuery connections Looker's 'host' is the billing project
+        project = connection_info.get('host')
+        project = None if project in (None, '', 'unknown') else project
+        try:
+            client = self.bigquery_clients.get(project)
+            if client is None:
+                client = self.bigquery_clients[project] = bigquery.Client(project=project)
+            job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+            job = client.query(sql, job_config=job_config)
+            return job.total_bytes_processed
+        except Exception as e:
+            print(f"   BigQuery dry run failed: {e}")
+            return None
+    
+    def estimate_snowflake_bytes(self, sql: str, connection_name: str) -> Optional[int]:
+        """Read bytesAssigned from the GlobalStats row of a tabular EXPLAIN"""
+        query_slug = self.create_sql_query(f"EXPLAIN USING TABULAR {sql}", connection_name)
+        if not query_slug:
+            return None
+        
+        result = self.run_sql_query(query_slug, 'json', sample_size=self.max_rows)
+        for row in result.get('sample_rows', []):
+            if not isinstance(row, dict):
+                continue
+            values = {str(k).lower(): v for k, v in row.items()}
+            if str(values.get('operation', '')).lower() == 'globalstats':
+                try:
+                    return int(values.get('bytesassigned'))
+                except (TypeError, ValueError):
+                    return None
+        print("   No GlobalStats row in EXPLAIN output")
+        return None
+    
     def extract_sql_from_lookml_files(self, file_paths: List[str]) -> List[Dict[str, Any]]:
         """Extract SQL queries from LookML files - updated to track current file"""
         sql_queries = []
@@ -345,14 +562,13 @@ class SQLExecutionValidator:
             print(f"Extracting SQL from: {file_path}")
             
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                parsed = parse_file(file_path)
                 
                 # Extract SQL from different LookML contexts
                 file_queries = []
                 
                 # Extract from derived tables (most important for validation)
-                file_queries.extend(self.extract_derived_table_sql(content, file_path))
+                file_queries.extend(self.extract_derived_table_sql(parsed))
                 
                 sql_queries.extend(file_queries)
                 
@@ -367,52 +583,30 @@ class SQLExecutionValidator:
         self.validation_results['summary']['total_queries_found'] = len(sql_queries)
         return sql_queries
     
-    def extract_derived_table_sql(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_derived_table_sql(self, parsed: ParsedFile) -> List[Dict[str, Any]]:
         """Extract SQL from derived tables - fixed for multiline SQL"""
         sql_queries = []
+        file_path = parsed.path
         
         print(f"   Extracting from: {file_path}")
         
-        # More robust view pattern that handles your formatting
-        view_pattern = r'view:\s*(\w+)\s*\{'
-        view_matches = re.finditer(view_pattern, content)
-        
-        for view_match in view_matches:
-            view_name = view_match.group(1)
+        for view in parsed.views:
+            view_name = view.name
             print(f"   Found view: {view_name}")
             
-            # Find the view content by matching braces
-            view_start = view_match.end() - 1  # Position of opening brace
-            view_content = self.extract_balanced_braces(content, view_start)
-            
-            if not view_content:
-                print(f"   Could not extract content for view: {view_name}")
-                continue
-                
             # Look for derived_table within the view
-            derived_pattern = r'derived_table:\s*\{'
-            derived_match = re.search(derived_pattern, view_content)
+            derived_table = view.first('derived_table')
             
-            if derived_match:
+            if derived_table:
                 print(f"   Found derived_table in: {view_name}")
                 
-                # Extract derived_table content
-                derived_start = derived_match.end() - 1
-                derived_content = self.extract_balanced_braces(view_content, derived_start)
-                
-                if not derived_content:
-                    print(f"   Could not extract derived_table content")
-                    continue
-                
-                print(f"   Derived table content preview: {derived_content[:100]}...")
-                
                 # Extract SQL from derived_table - handle multiline format
-                sql_content = self.extract_multiline_sql(derived_content)
+                sql_content = self.extract_multiline_sql(derived_table)
                 
                 if sql_content:
                     print(f"   Extracted SQL: {sql_content[:100]}...")
                     
-                    connection_name = self.detect_connection_for_sql(derived_content, sql_content)
+                    connection_name = self.detect_connection_for_sql(derived_table, sql_content)
                     
                     sql_queries.append({
                         'type': 'derived_table',
@@ -420,7 +614,7 @@ class SQLExecutionValidator:
                         'file_path': file_path,
                         'sql_content': sql_content,
                         'connection_name': connection_name,
-                        'line_number': content[:view_match.start()].count('\n') + 1,
+                        'line_number': parsed.line_of(view.start),
                         'context': f"view: {view_name} > derived_table"
                     })
                     
@@ -432,51 +626,27 @@ class SQLExecutionValidator:
         
         return sql_queries
     
-    def extract_balanced_braces(self, content: str, start_pos: int) -> str:
-        """Extract content between balanced braces starting at start_pos"""
-        if start_pos >= len(content) or content[start_pos] != '{':
-            return ""
-        
-        brace_count = 0
-        i = start_pos
-        
-        while i < len(content):
-            char = content[i]
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    # Found matching closing brace
-                    return content[start_pos + 1:i].strip()
-            i += 1
-        
-        # Braces not balanced, return rest of content
-        return content[start_pos + 1:].strip()
-    
-    def extract_multiline_sql(self, derived_content: str) -> str:
+    def extract_multiline_sql(self, derived_table: Node) -> str:
         """Extract SQL from derived_table content, handling multiline format"""
         
-        # Look for sql: followed by content until ;;
-        # This handles your multiline format:
+        # The parser keeps everything between sql: and ;; verbatim,
+        # so multiline SQL arrives intact:
         # sql: select
         #      primary_type
         #      count(*) as cnt
         #      ...
         #      ;;
         
-        sql_pattern = r'sql:\s*(.*?);;'
-        match = re.search(sql_pattern, derived_content, re.DOTALL)
+        sql_raw = derived_table.get('sql')
         
-        if match:
-            sql_raw = match.group(1)
+        if sql_raw:
             print(f"   Raw SQL found: {repr(sql_raw[:100])}")
             
             # Clean up the SQL
             sql_cleaned = self.clean_multiline_sql(sql_raw)
             return sql_cleaned
         
-        print(f"   No SQL pattern matched in: {derived_content[:100]}")
+        print(f"   No sql: parameter in derived_table")
         return ""
     
     def clean_multiline_sql(self, sql_raw: str) -> str:
@@ -499,13 +669,12 @@ class SQLExecutionValidator:
         print(f"   Cleaned SQL: {sql_cleaned}")
         return sql_cleaned
     
-    def detect_connection_for_sql(self, derived_content: str, sql_content: str) -> str:
+    def detect_connection_for_sql(self, derived_table: Node, sql_content: str) -> str:
         """Try to detect which connection to use for SQL execution"""
         
         # First, look for connection in derived_table itself
-        connection_match = re.search(r'connection:\s*"([^"]+)"', derived_content)
-        if connection_match:
-            conn_name = connection_match.group(1)
+        conn_name = derived_table.get('connection')
+        if conn_name:
             if conn_name in self.connections:
                 print(f"   Using connection from derived_table: {conn_name}")
                 return conn_name
@@ -522,61 +691,113 @@ class SQLExecutionValidator:
         return fallback
     
     def find_model_connection(self) -> Optional[str]:
-        """Find and read connection from model files"""
-        
-        # Look for common model file patterns
-        model_patterns = [
-            '*.model.lkml',
-            '*.model', 
-            'bi_sandbox.model.lkml',  # Based on your screenshot
-            'models/*.model.lkml',
-            'models/*.model'
-        ]
-        
-        for pattern in model_patterns:
-            model_files = glob.glob(pattern)
-            for model_file in model_files:
-                print(f"   Checking model file: {model_file}")
-                
-                try:
-                    with open(model_file, 'r', encoding='utf-8') as f:
-                        model_content = f.read()
-                    
-                    # Extract connection from model file
-                    connection_match = re.search(r'connection:\s*"([^"]+)"', model_content)
-                    if connection_match:
-                        conn_name = connection_match.group(1)
-                        print(f"   Found connection in {model_file}: {conn_name}")
-                        return conn_name
-                
-                except Exception as e:
-                    print(f"   Error reading {model_file}: {e}")
-                    continue
-        
-        # Also check if there's a model file in the same directory as the view
-        if self.current_file_path:
-            view_dir = os.path.dirname(self.current_file_path)
-            model_files_in_dir = glob.glob(os.path.join(view_dir, '*.model*'))
-            
-            for model_file in model_files_in_dir:
-                print(f"   Checking nearby model file: {model_file}")
-                try:
-                    with open(model_file, 'r', encoding='utf-8') as f:
-                        model_content = f.read()
-                    
-                    connection_match = re.search(r'connection:\s*"([^"]+)"', model_content)
-                    if connection_match:
-                        conn_name = connection_match.group(1)
-                        print(f"   Found connection in {model_file}: {conn_name}")
-                        return conn_name
-                
-                except Exception as e:
-                    print(f"   Error reading {model_file}: {e}")
-                    continue
+        """Connection of the model that includes the current file, from the project symbol index"""
+        index = project_index('.', discover=True)
+        models = index.models_for_file(self.current_file_path) if self.current_file_path else []
+        if models:
+            print(f"   Included by model(s): {', '.join(models)}")
+        
+        conn_name = index.connection_for_file(self.current_file_path)
+        if conn_name:
+            print(f"   Found model connection: {conn_name}")
+            return conn_name
         
         print(f"   No model file with connection found")
         return None
     
+    def connection_limit(self, connection_name: str) -> int:
+        """Maximum in-flight queries for a connection (its max_connections, capped by workers)"""
+        limit = self.max_workers
+        max_connections = self.connections.get(connection_name, {}).get('max_connections')
+        if isinstance(max_connections, int) and max_connections > 0:
+            limit = min(limit, max_connections)
+        return limit
+    
+    def load_project_constants(self, manifest_path: str = 'manifest.lkml') -> Dict[str, str]:
+        """Read constant: values from the project manifest"""
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            manifest = parse_file(manifest_path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Could not read {manifest_path}: {e}")
+            return {}
+        return {c.name: c.get('value', '') for c in manifest.blocks('constant')}
+    
+    def result_cache_key(self, sql_query: Dict[str, Any]) -> str:
+        """Key on the cleaned SQL, its connection and the constants it references"""
+        sql = sql_query['sql_content']
+        constants = {name: self.project_constants.get(name)
+                     for name in sorted(set(CONSTANT_REF_RE.findall(sql)))}
+        return fingerprint([sql, sql_query['connection_name'], constants,
+                            self.validation_mode, self.estimate_bytes])
+    
+    def execute_query_task(self, sql_query: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the two-step workflow for one extracted query, reusing a cached outcome if fresh"""
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache_key(sql_query)
+            entry = self.result_cache.load_entry('sql', cache_key, ttl=self.cache_ttl)
+            if entry is not None:
+                result = dict(entry['value'])
+                result.update({
+                    'connection_name': sql_query['connection_name'],
+                    'cache_hit': True,
+                    'cached_at': datetime.fromtimestamp(entry['stored_at']).isoformat(),
+                    'timestamp': datetime.now().isoformat()
+                })
+                return result
+        
+        # Pacing and 429/503 back-off are handled by the session's rate limiter
+        result = self.execute_sql_complete_workflow(
+            sql_query['sql_content'],
+            sql_query['connection_name']
+        )
+        result['cache_hit'] = False
+        
+        if cache_key is not None and is_cacheable_outcome(result):
+            outcome = {k: result[k] for k in CACHED_RESULT_FIELDS if k in result}
+            self.result_cache.store_entry('sql', cache_key, outcome)
+        return result
+    
+    def execute_queries(self, sql_queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute queries with up to max_workers in flight and never more than
+        connection_limit() per connection. Results are returned in input order.
+        """
+        if self.max_workers == 1 or len(sql_queries) <= 1:
+            return [self.execute_query_task(q) for q in sql_queries]
+        
+        pending: Dict[str, deque] = {}
+        for index, sql_query in enumerate(sql_queries):
+            pending.setdefault(sql_query['connection_name'], deque()).append(index)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sql_queries)
+        in_flight = {}
+        active = {name: 0 for name in pending}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or in_flight:
+                # Only submit work a connection can accept, so a saturated
+                # connection never ties up workers other connections could use
+                for name in list(pending):
+                    queue = pending[name]
+                    while queue and len(in_flight) < self.max_workers and active[name] < self.connection_limit(name):
+                        index = queue.popleft()
+                        future = executor.submit(self.execute_query_task, sql_queries[index])
+                        in_flight[future] = (index, name)
+                        active[name] += 1
+                    if not queue:
+                        del pending[name]
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, name = in_flight.pop(future)
+                    active[name] -= 1
+                    results[index] = future.result()
+        
+        return results
+    
     def run_sql_execution_tests(self, file_paths: List[str]) -> bool:
         """Main function to run SQL execution tests"""
         print("=" * 60)
@@ -602,24 +823,26 @@ class SQLExecutionValidator:
             print("No SQL queries found for execution testing")
             return True
         
-        print(f"\nTesting {len(sql_queries)} SQL queries for execution...")
+        self.project_constants = self.load_project_constants()
+        
+        print(f"\nTesting {len(sql_queries)} SQL queries for execution (workers: {self.max_workers})...")
+        
+        # Execute the two-step workflow for every query; results keep input order
+        execution_results = self.execute_queries(sql_queries)
         
-        # Execute each SQL query using two-step workflow
-        for i, sql_query in enumerate(sql_queries, 1):
+        for i, (sql_query, execution_result) in enumerate(zip(sql_queries, execution_results), 1):
             print(f"\n[{i}/{len(sql_queries)}] {sql_query['file_path']}:{sql_query['line_number']}")
             print(f"Context: {sql_query['context']}")
-            
-            # Execute using correct two-step API workflow
-            execution_result = self.execute_sql_complete_workflow(
-                sql_query['sql_content'], 
-                sql_query['connection_name']
-            )
+            print(f"Result: {'passed' if execution_result['success'] else 'FAILED'}"
+                  f"{' (cached)' if execution_result.get('cache_hit') else ''}")
             
             # Add query info to result
             execution_result['query_info'] = sql_query
             
             self.validation_results['sql_executions'].append(execution_result)
             self.validation_results['summary']['total_queries_tested'] += 1
+            if execution_result.get('cache_hit'):
+                self.validation_results['summary']['cache_hits'] += 1
             
             # Track results
             if execution_result['success']:
@@ -631,9 +854,14 @@ class SQLExecutionValidator:
                 for error in execution_result.get('errors', []):
                     error_msg = f"{sql_query['file_path']}:{sql_query['line_number']} - {error}"
                     self.validation_results['errors'].append(error_msg)
-            
-            # Small delay to be respectful to API
-            time.sleep(0.3)
+        
+        if self.estimate_bytes:
+            estimates = [r.get('estimated_bytes_scanned') for r in execution_results]
+            estimates = [e for e in estimates if e is not None]
+            if estimates:
+                self.validation_results['summary']['estimated_bytes_scanned'] = sum(estimates)
+        
+        self.validation_results['summary']['api_rate_limiting'] = self.session.limiter.stats()
         
         return self.validation_results['summary']['queries_with_execution_errors'] == 0
     
@@ -650,6 +878,12 @@ class SQLExecutionValidator:
         print(f"Queries passed: {summary['queries_passed']}")
         print(f"Queries with execution errors: {summary['queries_with_execution_errors']}")
         print(f"Connections available: {', '.join(summary['connections_used'])}")
+        print(f"Validation mode: {summary['validation_mode']}")
+        if self.result_cache is not None:
+            print(f"Result cache hits: {summary['cache_hits']} (TTL {self.cache_ttl:.0f}s)")
+        if self.estimate_bytes:
+            print(f"Estimated bytes scanned: {format_bytes(summary['estimated_bytes_scanned'])}")
+        print(self.session.limiter.summary())
         
         if summary['queries_with_execution_errors'] == 0:
             print("\nAll SQL queries executed successfully!")
@@ -677,6 +911,15 @@ def main():
     parser.add_argument('--files', required=True, help='Space-separated list of files to test')
     parser.add_argument('--config-file', default='looker.ini', help='Looker configuration file')
     parser.add_argument('--output-file', default='sql_validation_results.json', help='Output file for results')
+    parser.add_argument('--workers', type=int, default=4, help='Maximum SQL Runner queries in flight (default: 4, 1 = sequential)')
+    parser.add_argument('--mode', choices=VALIDATION_MODES, default='execute',
+                        help="'execute' runs each query in full; 'plan' wraps it to return zero rows so only compilation/planning is checked (default: execute)")
+    parser.add_argument('--estimate-bytes', action='store_true',
+                        help='Report estimated bytes scanned per query (BigQuery dry run, Snowflake EXPLAIN)')
+    parser.add_argument('--max-rows', type=int, default=1000, help='Stop reading each result after this many rows (default: 1000)')
+    parser.add_argument('--sample-rows', type=int, default=5, help='Rows kept per query in the results file (default: 5)')
+    parser.add_argument('--cache-ttl', type=float, default=6 * 3600,
+                        help='Seconds to reuse the outcome of identical SQL from $LOOKML_CACHE_DIR (default: 21600, 0 = off)')
     
     args = parser.parse_args()
     
@@ -685,7 +928,10 @@ def main():
     print(f"Starting SQL execution testing for {len(files_to_test)} files")
     print("Using correct two-step Looker SQL Runner API workflow")
     
-    validator = SQLExecutionValidator(args.config_file)
+    validator = SQLExecutionValidator(args.config_file, max_workers=args.workers,
+                                      validation_mode=args.mode, estimate_bytes=args.estimate_bytes,
+                                      cache_ttl=args.cache_ttl, max_rows=args.max_rows,
+                                      sample_rows=args.sample_rows)
     success = validator.run_sql_execution_tests(files_to_test)
     validator.print_summary()
     validator.save_results(args.output_file)
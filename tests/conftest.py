@@ -0,0 +1,42 @@
+"""
+Shared setup for the tests of the modules in .github/scripts. The parser and
+index tests run against this repository's own LookML files.
+"""
+
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, '.github', 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+
+from lookml_index import discover_project_files  # noqa: E402
+from lookml_parser import clear_memo  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch):
+    """No test reads or writes a developer's $LOOKML_CACHE_DIR or sees another test's parse memo"""
+    monkeypatch.delenv('LOOKML_CACHE_DIR', raising=False)
+    clear_memo()
+    yield
+    clear_memo()
+
+
+@pytest.fixture(scope='session')
+def repo_files():
+    """Every LookML file of the repository, relative to its root"""
+    files = [os.path.relpath(f, REPO_ROOT).replace(os.sep, '/') for f in discover_project_files(REPO_ROOT)]
+    assert files, 'no LookML files found in the repository'
+    return sorted(files)
+
+
+def tree_dump(parsed):
+    """Everything the parser produced for a file, as plain comparable data"""
+    def dump(node):
+        return (node.type, node.name, node.start, node.body_start, node.end,
+                [(p.name, p.kind, p.start, p.end, p.value) for p in node.params],
+                [dump(child) for child in node.children])
+    return dump(parsed.root), list(parsed.errors), parsed.is_yaml, parsed.dashboards, parsed.yaml_error
@@ -0,0 +1,90 @@
+"""Round-trip tests for lookml_cache.py and its use by the parser"""
+
+import glob
+import os
+import time
+
+from conftest import REPO_ROOT, tree_dump
+from lookml_cache import ParseCache, cached_findings, content_digest
+from lookml_parser import PARSER_VERSION, clear_memo, parse_file
+
+ORDERS_VIEW = os.path.join(REPO_ROOT, 'views', 'general_views', 'orders.view.lkml')
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return content_digest(f.read())
+
+
+def test_parse_tree_round_trip(tmp_path):
+    cache = ParseCache(str(tmp_path), PARSER_VERSION)
+    fresh = parse_file(ORDERS_VIEW, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert fresh.digest == file_digest(ORDERS_VIEW)
+
+    clear_memo()
+    cached = parse_file(ORDERS_VIEW, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cached is not fresh
+    assert cached.text == fresh.text
+    assert tree_dump(cached) == tree_dump(fresh)
+    assert tree_dump(cached) == tree_dump(parse_file(ORDERS_VIEW, cache=None))
+
+
+def test_corrupt_tree_is_a_miss_and_removed(tmp_path):
+    cache = ParseCache(str(tmp_path), PARSER_VERSION)
+    parse_file(ORDERS_VIEW, cache=cache)
+    [tree_path] = glob.glob(os.path.join(str(tmp_path), PARSER_VERSION, 'trees', '*', '*.pkl'))
+    with open(tree_path, 'wb') as f:
+        f.write(b'not a pickle')
+
+    assert cache.load_tree(file_digest(ORDERS_VIEW)) is None
+    assert not os.path.exists(tree_path)
+
+    clear_memo()
+    parsed = parse_file(ORDERS_VIEW, cache=cache)
+    assert tree_dump(parsed) == tree_dump(parse_file(ORDERS_VIEW, cache=None))
+    assert os.path.exists(tree_path)
+
+
+def test_findings_round_trip(tmp_path):
+    cache = ParseCache(str(tmp_path), 'test')
+    findings = [[3, 'warning', 'rule_a', 'message'], [7, 'error', 'rule_a', 'other']]
+    cache.store_findings('rule_a', 'views/a.view.lkml', 'd1', findings)
+    assert cache.load_findings('rule_a', 'views/a.view.lkml', 'd1') == findings
+    # Keyed by rule, path and content
+    assert cache.load_findings('rule_b', 'views/a.view.lkml', 'd1') is None
+    assert cache.load_findings('rule_a', 'views/b.view.lkml', 'd1') is None
+    assert cache.load_findings('rule_a', 'views/a.view.lkml', 'd2') is None
+
+
+def test_cached_findings_computes_once(tmp_path):
+    cache = ParseCache(str(tmp_path), 'test')
+    parsed = parse_file(ORDERS_VIEW, cache=ParseCache(str(tmp_path), PARSER_VERSION))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [[0, 'warning', 'rule_a', 'message']]
+
+    first = cached_findings(cache, 'rule_a', parsed, compute)
+    second = cached_findings(cache, 'rule_a', parsed, compute)
+    assert first == second == [[0, 'warning', 'rule_a', 'message']]
+    assert len(calls) == 1
+
+    # Without a cache every call computes
+    cached_findings(None, 'rule_a', parsed, compute)
+    assert len(calls) == 2
+
+
+def test_entry_ttl(tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path), 'test')
+    assert cache.load_entry('sql', 'key') is None
+    cache.store_entry('sql', 'key', {'rows': 3})
+    assert cache.load_entry('sql', 'key')['value'] == {'rows': 3}
+    assert cache.load_entry('sql', 'key', ttl=60)['value'] == {'rows': 3}
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert cache.load_entry('sql', 'key', ttl=60) is None
+    assert cache.load_entry('sql', 'key')['value'] == {'rows': 3}
@@ -0,0 +1,98 @@
+"""Regression tests for lookml_index.py: the repository's own project plus small generated ones"""
+
+import os
+
+from conftest import REPO_ROOT
+from lookml_index import ProjectIndex
+
+
+def write_project(root, files):
+    for relpath, text in files.items():
+        path = os.path.join(str(root), relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+TWO_MODELS = {
+    'views/orders.view.lkml': 'view: orders {\n  dimension: id {\n    type: number\n    sql: ${TABLE}.id ;;\n  }\n}\n',
+    'views/returns.view.lkml': 'view: returns {\n  dimension: id {\n    type: number\n    sql: ${TABLE}.id ;;\n  }\n}\n',
+    'models/sales.model.lkml': 'connection: "sales_db"\ninclude: "/views/orders.view"\n'
+                               'explore: orders {}\n',
+    'models/support.model.lkml': 'connection: "support_db"\ninclude: "/views/returns.view"\n'
+                                 'explore: orders {\n  from: returns\n}\n',
+}
+
+
+def test_repo_index(repo_files):
+    index = ProjectIndex(REPO_ROOT)
+    index.discover()
+    assert sorted(index.entries) == repo_files
+    assert index.failures() == {}
+
+    assert index.model('bi_sandbox')['connection'] == 'badal_internal_projects'
+    assert index.connection_for_file(os.path.join(REPO_ROOT, 'views/general_views/orders.view.lkml')) \
+        == 'badal_internal_projects'
+
+    explore = index.explore('org_a_data_all_dep')
+    assert explore['file'] == 'explores/case_21.explore.lkml'
+    assert index.explore('org_a_data_all_dep', model='bi_sandbox')['file'] == explore['file']
+    assert index.explore('org_a_data_all_dep', model='no_such_model') is None
+
+    field = index.field('orders', 'id')
+    assert (field['kind'], field['type'], field['line']) == ('dimension', 'number', 5)
+    assert 'orders' in index.views_with_field('id')
+
+    for relpath in ('views/case_21/case21_dep_a_data.view.lkml', 'views/general_views/orders.view.lkml'):
+        assert index.is_reachable(os.path.join(REPO_ROOT, relpath)), relpath
+        assert index.models_for_file(os.path.join(REPO_ROOT, relpath)) == ['bi_sandbox'], relpath
+
+
+def test_explore_lookup_by_model(tmp_path):
+    write_project(tmp_path, TWO_MODELS)
+    index = ProjectIndex(str(tmp_path))
+    index.discover()
+
+    assert index.explore('orders', model='sales')['file'] == 'models/sales.model.lkml'
+    assert index.explore('orders', model='support')['file'] == 'models/support.model.lkml'
+    assert index.models_for_file(str(tmp_path / 'views/orders.view.lkml')) == ['sales']
+    assert index.models_for_file(str(tmp_path / 'views/returns.view.lkml')) == ['support']
+    assert index.connection_for_file(str(tmp_path / 'views/returns.view.lkml')) == 'support_db'
+
+
+def test_index_persists_between_runs(tmp_path, monkeypatch):
+    project = tmp_path / 'project'
+    write_project(project, TWO_MODELS)
+    monkeypatch.setenv('LOOKML_CACHE_DIR', str(tmp_path / 'cache'))
+
+    first = ProjectIndex(str(project))
+    first.discover()
+    first.save()
+    assert (first.indexed, first.reused) == (len(TWO_MODELS), 0)
+
+    second = ProjectIndex(str(project))
+    second.discover()
+    assert (second.indexed, second.reused) == (0, len(TWO_MODELS))
+    assert second.entries == first.entries
+
+    # An edited file is re-indexed, the others are still reused
+    write_project(project, {'views/orders.view.lkml': 'view: orders {\n  dimension: total {}\n}\n'})
+    third = ProjectIndex(str(project))
+    third.discover()
+    assert (third.indexed, third.reused) == (1, len(TWO_MODELS) - 1)
+    assert third.field('orders', 'total') is not None
+    assert third.field('orders', 'id') is None
+
+
+def test_unreadable_file_is_reported_not_fatal(tmp_path):
+    write_project(tmp_path, TWO_MODELS)
+    (tmp_path / 'views' / 'broken.view.lkml').write_bytes(b'view: broken {\n  label: "\xff\xfe"\n}\n')
+    index = ProjectIndex(str(tmp_path))
+    index.discover()
+
+    failures = index.failures()
+    assert list(failures) == ['views/broken.view.lkml']
+    assert failures['views/broken.view.lkml'].startswith('UnicodeDecodeError')
+    assert index.view('orders') is not None and index.view('returns') is not None
+    assert index.indexed == len(TWO_MODELS)
+    assert '1 unreadable' in index.summary()
@@ -0,0 +1,123 @@
+"""Regression tests for lookml_parser.py, run against the repository's LookML files"""
+
+import os
+
+from conftest import REPO_ROOT, tree_dump
+from lookml_parser import clear_memo, parse_file, parse_text, prefetch_parsed, read_files
+
+
+def repo_path(relpath):
+    return os.path.join(REPO_ROOT, relpath)
+
+
+def test_every_repo_file_parses_cleanly(repo_files):
+    for relpath in repo_files:
+        parsed = parse_file(repo_path(relpath))
+        assert parsed.errors == [], relpath
+        if parsed.is_yaml:
+            assert parsed.yaml_error is None, relpath
+            assert parsed.dashboards, relpath
+        else:
+            assert parsed.nodes or parsed.params, relpath
+
+
+def test_blocks_nest_inside_their_parents(repo_files):
+    for relpath in repo_files:
+        parsed = parse_file(repo_path(relpath))
+        for node in parsed.walk():
+            assert parsed.text[node.body_start - 1] == '{', (relpath, node)
+            assert parsed.text[node.end - 1] == '}', (relpath, node)
+            parent = node.parent
+            if parent is not parsed.root:
+                assert parent.body_start <= node.start and node.end <= parent.end, (relpath, node)
+            for param in node.params:
+                assert node.body_start <= param.start < param.end <= node.end, (relpath, node, param)
+            starts = [child.start for child in node.children]
+            assert starts == sorted(starts), (relpath, node)
+
+
+def test_parse_file_matches_parse_text(repo_files):
+    for relpath in repo_files:
+        with open(repo_path(relpath), encoding='utf-8') as f:
+            text = f.read()
+        assert tree_dump(parse_file(repo_path(relpath), cache=None)) == tree_dump(parse_text(text, relpath)), relpath
+
+
+def test_read_ahead_matches_direct_parse(repo_files):
+    paths = [repo_path(relpath) for relpath in repo_files]
+    direct = [tree_dump(parse_file(path, cache=None)) for path in paths]
+
+    sources = [(path, source[0].st_size) for path, source in read_files(paths)]
+    assert sources == [(path, os.path.getsize(path)) for path in paths]
+
+    clear_memo()
+    assert list(prefetch_parsed(paths)) == paths
+    assert [tree_dump(parse_file(path)) for path in paths] == direct
+
+
+def test_view_fields():
+    parsed = parse_file(repo_path('views/general_views/orders.view.lkml'))
+    [view] = parsed.views
+    assert view.name == 'orders'
+    assert view.get('sql_table_name').strip() == 'public.orders'
+
+    pk = next(d for d in view.blocks('dimension') if d.name == 'id')
+    assert pk.get('primary_key') == 'yes'
+    assert pk.get('type') == 'number'
+    assert pk.param('sql').kind == 'sql'
+    assert pk.get('sql').strip() == '${TABLE}.id'
+
+    created = view.first('dimension_group')
+    assert created.name == 'created'
+    assert created.param('timeframes').items == ['raw', 'time', 'date', 'week', 'month', 'quarter', 'year']
+
+
+def test_explore_file():
+    parsed = parse_file(repo_path('explores/case_21.explore.lkml'))
+    assert [p.value for p in parsed.all('include')] == ['/views/case_21/**/*.view']
+    assert [e.name for e in parsed.explores] == ['org_a_data_all_dep', 'case21_dep_a_data', 'case21_dep_b_data']
+    assert parsed.get('persist_with') == 'lf_case21_dep_all_default_datagroup'
+
+    # Liquid inside a SQL parameter is kept verbatim up to the closing ;;
+    where = parsed.explores[0].param('sql_always_where')
+    assert where.kind == 'sql'
+    assert "{% if _user_attributes['dep_user_access'] == \"Basic\" %}" in where.value
+    assert where.value.strip().endswith('{% endif %}')
+
+
+def test_model_file():
+    parsed = parse_file(repo_path('models/bi_sandbox.model.lkml'))
+    assert parsed.get('connection') == 'badal_internal_projects'
+    includes = [p.value for p in parsed.all('include')]
+    assert includes[:3] == ['/explores/case_21.explore', '/explores/general_views.explore',
+                            '/explores/training_content.explore']
+    assert '//dbt-internal-framework/views/dlp/*.view.lkml' in includes
+    assert parsed.explores == []  # the sample explore is commented out
+
+
+def test_yaml_dashboard():
+    parsed = parse_file(repo_path('Dashboards/netflix_base.dashboard.lookml'))
+    assert parsed.is_yaml
+    [dashboard] = parsed.dashboards
+    assert dashboard['dashboard'] == 'netflix_base'
+    element = dashboard['elements'][0]
+    assert element['model'] == 'bi_sandbox'
+    assert element['explore'] == 'v_netflix_titles_enriched'
+
+
+def test_positions_round_trip():
+    parsed = parse_file(repo_path('views/general_views/orders.view.lkml'))
+    for node in parsed.walk():
+        line, column = parsed.position(node.start)
+        assert parsed.offset_of(line, column) == node.start
+        assert parsed.line_of(node.start) == line
+
+
+def test_crlf_files_parse_like_lf(tmp_path):
+    with open(repo_path('views/general_views/orders.view.lkml'), 'rb') as f:
+        data = f.read()
+    lf = tmp_path / 'lf.view.lkml'
+    crlf = tmp_path / 'crlf.view.lkml'
+    lf.write_bytes(data)
+    crlf.write_bytes(data.replace(b'\n', b'\r\n'))
+    assert tree_dump(parse_file(str(crlf))) == tree_dump(parse_file(str(lf)))